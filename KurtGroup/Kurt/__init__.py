@@ -3,7 +3,15 @@ import os, sys
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 
+# The modules import each other by their plain names, e.g. extraction_log. Where to log is kept in extraction_log, so it is the same module when imported as KurtGroup.Kurt.extraction_log
+import extraction_log
+sys.modules[f'{__name__}.extraction_log'] = extraction_log
+
 from . import chemical_information
+from . import extraction_cache
+from . import extraction_specs
+from . import follow
+from . import output_file
 from . import output_processing
 from . import structures
 from . import xyz
\ No newline at end of file
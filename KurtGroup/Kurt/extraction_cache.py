@@ -0,0 +1,220 @@
+import os
+import pickle
+import sqlite3
+import hashlib
+from typing import Dict, Iterable, List, Union
+
+# Default location of the cache database
+DEFAULT_CACHE_FILE = 'collect_data_cache.sqlite'
+
+# Modules deciding what is extracted from an output file. Any change to these invalidates everything in the cache
+PARSER_MODULES = ('chemical_information.py', 'extraction_specs.py', 'output_file.py', 'output_processing.py')
+
+# Amount of bytes read at a time when hashing a file
+HASH_BLOCK_SIZE = 1024**2
+
+_parser_version = None
+
+def ParserVersion() -> str:
+    """Gives a version of the parsing code, which changes whenever one of PARSER_MODULES is changed
+
+    Returns:
+        (str): Hash of the source code of PARSER_MODULES
+    """
+    global _parser_version
+    if _parser_version is None:
+        directory = os.path.dirname(os.path.realpath(__file__))
+        digest = hashlib.blake2b(digest_size=16)
+        for module in PARSER_MODULES:
+            with open(os.path.join(directory, module), 'rb') as file:
+                digest.update(file.read())
+        _parser_version = digest.hexdigest()
+    return _parser_version
+
+def FileHash(filename: str) -> str:
+    """Hashes the content of a file
+
+    Args:
+        filename (str): File to hash
+
+    Returns:
+        (str): Hash of the content of [filename]
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def SourceFiles(filenames: Iterable[Union[str, None]]) -> str:
+    """Identifies the files next to an output file its values were read from instead of the output file, e.g. a formatted checkpoint file
+
+    Cached values are only used if the same files are used again, so values are not used if the files are created, changed or deleted, or are not used because of an option such as --no-fchk or --no-property-file
+
+    Args:
+        filenames (Iterable[Union[str, None]]): The files. None for files that are not used
+
+    Returns:
+        (str): The path, size and modification time of every file. Empty if the values were read from the output file only
+    """
+    sources = []
+    for filename in filenames:
+        if filename is None:
+            continue
+        path = os.path.realpath(filename)
+        stat = os.stat(path)
+        sources.append(f'{path} {stat.st_size} {stat.st_mtime_ns}')
+    return '\n'.join(sources)
+
+
+class ExtractionCache:
+    """SQLite database of values extracted from output files, so files which have not changed are not parsed again
+
+    A file is identified by its path, size and modification time and the files next to it its values were read from, see SourceFiles, together with the version of the parsing code. If Hash is used a file whose modification time has changed but not its size, e.g. after being copied or touched, is compared by the hash of its content instead of being parsed again
+
+    Args:
+        filename (str, optional): The cache database. Defaults to DEFAULT_CACHE_FILE.
+        Hash (bool, optional): If true files are also identified by the hash of their content. Defaults to False.
+    """
+    def __init__(self, filename: str = DEFAULT_CACHE_FILE, *, Hash: bool = False) -> None:
+        self.filename = filename
+        self.hash = Hash
+        self.version = ParserVersion()
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(self.filename)
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime INTEGER,
+            hash TEXT,
+            version TEXT,
+            temperature REAL,
+            methods TEXT,
+            data BLOB,
+            sources TEXT
+        )''')
+        # Databases made before the source files were saved are given the column. Their files are extracted again, as their sources are not known
+        if 'sources' not in [column[1] for column in self.connection.execute('PRAGMA table_info(files)')]:
+            self.connection.execute('ALTER TABLE files ADD COLUMN sources TEXT')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS statistics (name TEXT PRIMARY KEY, count INTEGER)')
+        self.connection.commit()
+
+    def __enter__(self) -> 'ExtractionCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Saves the hits and misses of this session and closes the database
+        """
+        for name, count in [('hits', self.hits), ('misses', self.misses)]:
+            self.connection.execute('INSERT INTO statistics VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET count = count + excluded.count', (name, count))
+        self.connection.commit()
+        self.connection.close()
+        self.hits = self.misses = 0
+
+    def Get(self, filename: str, methods: Iterable[str], temperature: float, sources: str = '') -> Union[Dict[str, object], None]:
+        """Gives the cached values of an output file
+
+        Args:
+            filename (str): Output file
+            methods (Iterable[str]): Methods the values are needed from, e.g. ['_Energy', '_Frequencies']
+            temperature (float): Temperature the values are needed at
+            sources (str, optional): The files next to [filename] the values would be read from, see SourceFiles. Defaults to '', which is none.
+
+        Returns:
+            (Dict[str, object], None): The values by attribute name. None if [filename] or [sources] have changed or not all [methods] were extracted at [temperature]
+        """
+        path = os.path.realpath(filename)
+        row = self.connection.execute('SELECT size, mtime, hash, version, temperature, methods, data, sources FROM files WHERE path = ?', (path,)).fetchone()
+        if row is None or not os.path.isfile(path):
+            self.misses += 1
+            return None
+
+        size, mtime, hash, version, cached_temperature, cached_methods, data, cached_sources = row
+        stat = os.stat(path)
+        if version != self.version or size != stat.st_size or cached_temperature != temperature or cached_sources != sources or not set(methods) <= set(cached_methods.split()):
+            self.misses += 1
+            return None
+
+        if mtime != stat.st_mtime_ns:
+            if not self.hash or hash is None or hash != FileHash(path):
+                self.misses += 1
+                return None
+            self.connection.execute('UPDATE files SET mtime = ? WHERE path = ?', (stat.st_mtime_ns, path))
+
+        self.hits += 1
+        return pickle.loads(data)
+
+    def Put(self, filename: str, methods: Iterable[str], temperature: float, values: Dict[str, object], sources: str = '') -> None:
+        """Saves the values extracted from an output file
+
+        Values already cached for the same version of the file are kept, so requesting other values later adds to them
+
+        Args:
+            filename (str): Output file
+            methods (Iterable[str]): Methods the values were extracted with
+            temperature (float): Temperature the values were extracted at
+            values (Dict[str, object]): The values by attribute name
+            sources (str, optional): The files next to [filename] the values were read from, see SourceFiles. Defaults to '', which is none.
+        """
+        path = os.path.realpath(filename)
+        stat = os.stat(path)
+        methods = set(methods)
+
+        row = self.connection.execute('SELECT size, mtime, version, temperature, sources, methods, data FROM files WHERE path = ?', (path,)).fetchone()
+        if row is not None and row[:5] == (stat.st_size, stat.st_mtime_ns, self.version, temperature, sources):
+            methods |= set(row[5].split())
+            values = {**pickle.loads(row[6]), **values}
+
+        hash = FileHash(path) if self.hash else None
+        self.connection.execute('INSERT OR REPLACE INTO files (path, size, mtime, hash, version, temperature, methods, data, sources) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (path, stat.st_size, stat.st_mtime_ns, hash, self.version, temperature, ' '.join(sorted(methods)), pickle.dumps(values), sources))
+        self.connection.commit()
+
+    def Invalidate(self, filenames: List[str] = None, *, Stale: bool = False) -> int:
+        """Removes files from the cache
+
+        Args:
+            filenames (List[str], optional): Output files to remove. Defaults to None, which removes all files, or only the stale ones if Stale is true.
+            Stale (bool, optional): If true only files that no longer exist, have changed or were extracted by another version of the parsing code are removed. Defaults to False.
+
+        Returns:
+            (int): Amount of files removed
+        """
+        if filenames is not None:
+            paths = [os.path.realpath(filename) for filename in filenames]
+        else:
+            paths = [path for path, in self.connection.execute('SELECT path FROM files')]
+
+        if Stale:
+            stale = []
+            for path, size, mtime, version in self.connection.execute('SELECT path, size, mtime, version FROM files'):
+                if path not in paths:
+                    continue
+                if version != self.version or not os.path.isfile(path) or (os.stat(path).st_size, os.stat(path).st_mtime_ns) != (size, mtime):
+                    stale.append(path)
+            paths = stale
+
+        removed = 0
+        for path in paths:
+            removed += self.connection.execute('DELETE FROM files WHERE path = ?', (path,)).rowcount
+        self.connection.commit()
+        return removed
+
+    def Statistics(self) -> Dict[str, int]:
+        """Gives statistics of the cache
+
+        Returns:
+            (Dict[str, int]): The amount of files in the cache, how many were extracted by the current version of the parsing code, the size of the database in bytes and the total amount of hits and misses
+        """
+        statistics = dict()
+        statistics['files'], = self.connection.execute('SELECT COUNT(*) FROM files').fetchone()
+        statistics['current version'], = self.connection.execute('SELECT COUNT(*) FROM files WHERE version = ?', (self.version,)).fetchone()
+        statistics['size (bytes)'] = os.path.getsize(self.filename)
+        counts = dict(self.connection.execute('SELECT name, count FROM statistics'))
+        statistics['hits'] = counts.get('hits', 0) + self.hits
+        statistics['misses'] = counts.get('misses', 0) + self.misses
+        return statistics
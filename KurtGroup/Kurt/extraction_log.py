@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import atexit
+import threading
+import multiprocessing
+from typing import Dict, List, Tuple, Union
+
+# Default location of the log file, which is appended to
+DEFAULT_LOG_FILE = 'collect_data.log'
+
+# Amount of records kept in memory before they are written to the log file
+LOG_BATCH_SIZE = 256
+
+# Kinds of records. Records of the same kind and subject are counted together in the summary of a log, e.g. 12 files with missing frequencies
+MISSING = 'missing'
+SKIPPED = 'skipped'
+SAVED = 'saved'
+UNKNOWN_FORMAT = 'unknown format'
+NOT_IMPLEMENTED = 'not implemented'
+SOURCE = 'source'
+WARNING = 'warning'
+FAILED = 'failed'
+MESSAGE = 'message'
+
+# Where the records of this process are sent. Either a LogWriter or the queue of a LogWriter in another process, see UseQueue
+_sink = None
+_default = None
+
+
+class LogWriter:
+    """Writes log records to a log file in batches, so the file is not opened for every message
+
+    Records are written as the plain messages or as JSON lines. Records from worker processes are sent to the writer of the main process through the queue given by Queue, and only the main process writes to the file. This keeps lines of different processes from being interleaved
+
+    While the writer is used as a context manager every record logged in the process is sent to it, see Log
+
+    Args:
+        filename (str, optional): The log file, which is appended to. Defaults to DEFAULT_LOG_FILE.
+        Json (bool, optional): If true every record is written as a line of JSON instead of only its message. Defaults to False.
+        Summary (bool, optional): If true the amount of files of every kind and subject of record is written when the writer is closed, e.g. 'missing frequencies: 12 files'. Defaults to False.
+    """
+    def __init__(self, filename: str = DEFAULT_LOG_FILE, *, Json: bool = False, Summary: bool = False) -> None:
+        self.filename = filename
+        self.json = Json
+        self.summary = Summary
+        self.buffer = []
+        # The files of every kind and subject of record, used for the summary
+        self.counts = dict()
+        self.lock = threading.Lock()
+        self.queue = None
+        self.listener = None
+        self.previous = None
+
+    def __enter__(self) -> 'LogWriter':
+        global _sink
+        self.previous = _sink
+        _sink = self
+        return self
+
+    def __exit__(self, *args) -> None:
+        global _sink
+        _sink = self.previous
+        self.close()
+
+    def put(self, record: dict) -> None:
+        """Adds a record to the log. The records are written when LOG_BATCH_SIZE of them have been added, and when the writer is flushed or closed
+
+        Args:
+            record (dict): The record, see Record
+        """
+        with self.lock:
+            self.buffer.append(record)
+            if self.summary and record['kind'] != MESSAGE:
+                self.counts.setdefault((record['kind'], record['subject']), set()).add(record['file'])
+            full = len(self.buffer) >= LOG_BATCH_SIZE
+        if full:
+            self.Flush()
+
+    def Flush(self) -> None:
+        """Writes the records added since the last time the writer was flushed
+        """
+        with self.lock:
+            records, self.buffer = self.buffer, []
+        if len(records) == 0:
+            return
+        with open(self.filename, "a") as logfile:
+            logfile.write(''.join(self.Format(record) for record in records))
+
+    def Format(self, record: dict) -> str:
+        if self.json:
+            return json.dumps(record) + '\n'
+        return record['message'] + '\n'
+
+    def Summary(self) -> List[Tuple[str, str, int]]:
+        """Gives the amount of files of every kind and subject of record added to the writer
+
+        Returns:
+            (List[Tuple[str, str, int]]): The kind, subject and amount of files, with the most common first
+        """
+        with self.lock:
+            counts = [(kind, subject, len(files)) for (kind, subject), files in self.counts.items()]
+        return sorted(counts, key=lambda count: -count[2])
+
+    def Queue(self) -> multiprocessing.Queue:
+        """Gives a queue worker processes can send records to this writer through, see UseQueue. The records are received by a thread of this process until the writer is closed
+
+        Returns:
+            (multiprocessing.Queue): Queue to give to the worker processes
+        """
+        if self.queue is None:
+            self.queue = multiprocessing.Queue()
+            self.listener = threading.Thread(target=self._Listen, daemon=True)
+            self.listener.start()
+        return self.queue
+
+    def _Listen(self) -> None:
+        for record in iter(self.queue.get, None):
+            self.put(record)
+
+    def close(self) -> None:
+        """Receives the records left in the queue, writes all records and the summary, if any, to the log file
+        """
+        if self.queue is not None:
+            self.queue.put(None)
+            self.listener.join()
+            self.queue.close()
+            self.queue = self.listener = None
+        if self.summary:
+            for kind, subject, count in self.Summary():
+                name = kind if subject is None else f'{kind} {subject}'
+                self.buffer.append(Record(f"{name}: {count} {'file' if count == 1 else 'files'}", 'summary', name, count=count))
+            self.counts = dict()
+        self.Flush()
+
+
+def Record(message: str, kind: str = MESSAGE, subject: str = None, file: str = None, **fields) -> Dict[str, Union[str, int, float]]:
+    """Creates a log record
+
+    Args:
+        message (str): The message written to the log file
+        kind (str, optional): Kind of record, e.g. MISSING. Defaults to MESSAGE.
+        subject (str, optional): What the record is about, e.g. 'frequencies'. Defaults to None.
+        file (str, optional): The output file the record is about. Defaults to None.
+        fields: Other values saved in the record when it is written as JSON
+
+    Returns:
+        (Dict[str, Union[str, int, float]]): The record
+    """
+    return {'kind': kind, 'subject': subject, 'file': None if file is None else str(file), 'message': message, 'pid': os.getpid(), 'time': time.time(), **fields}
+
+def Log(message: str, kind: str = MESSAGE, subject: str = None, file: str = None) -> None:
+    """Logs a message. It is sent to the LogWriter used as a context manager, or to the queue given to UseQueue in worker processes
+
+    If neither is used the records are written to DEFAULT_LOG_FILE in batches and when the process exits
+
+    Args:
+        message (str): The message written to the log file
+        kind (str, optional): Kind of record, e.g. MISSING. Defaults to MESSAGE.
+        subject (str, optional): What the record is about, e.g. 'frequencies'. Defaults to None.
+        file (str, optional): The output file the record is about. Defaults to None.
+    """
+    sink = _sink if _sink is not None else Writer()
+    sink.put(Record(message, kind, subject, file))
+
+def Writer() -> LogWriter:
+    """Gives the LogWriter records logged in this process are written by. If no LogWriter is used as a context manager, it is one writing to DEFAULT_LOG_FILE when the process exits
+
+    Returns:
+        (LogWriter): The writer
+    """
+    global _default
+    if isinstance(_sink, LogWriter):
+        return _sink
+    if _default is None:
+        _default = LogWriter()
+        atexit.register(_default.close)
+    return _default
+
+def UseQueue(queue: multiprocessing.Queue) -> None:
+    """Sends the records logged in this process to a LogWriter of another process. Used as the initializer of worker processes, see LogWriter.Queue
+
+    Args:
+        queue (multiprocessing.Queue): Queue of the LogWriter
+    """
+    global _sink
+    _sink = queue
+
+def Flush() -> None:
+    """Writes the records logged in this process, if they are not sent to another process
+    """
+    for sink in (_sink, _default):
+        if isinstance(sink, LogWriter):
+            sink.Flush()
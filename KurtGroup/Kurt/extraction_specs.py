@@ -0,0 +1,244 @@
+import re
+import copy
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from output_file import CompilePattern, TranslatePattern
+from extraction_log import Log, MISSING
+
+OCCURRENCES = ('first', 'last', 'all')
+
+def Floats(values: list) -> list:
+    return [float(value) for value in values]
+
+def FortranFloats(values: list) -> list:
+    return [float(value.replace('D', 'E')) for value in values]
+
+def Integers(values: list) -> list:
+    return [int(value) for value in values]
+
+def Scaled(factor: float) -> Callable[[list], list]:
+    return lambda values: [float(value) * factor for value in values]
+
+def Columns(conversion: Callable[[list], list]) -> Callable[[list], list]:
+    """Conversion for specs with a single field spanning several columns, e.g. slice(2, None), giving the converted columns as one list
+    """
+    return lambda values: [conversion(values[0])]
+
+
+class ExtractionSpec:
+    """Description of where a quantity is printed in an output file
+
+    Args:
+        anchor (str): Text string marking where the quantity is printed. Written as a grep basic regular expression
+        attributes (List[str]): Names of the attributes the extracted values are saved as
+        fields (List[Tuple[int, Union[int, slice]]]): Line offset from the anchor and column (index into line.split()) of every value to read
+        conversion (Callable[[list], list], optional): Turns the read values into one value per attribute. Defaults to Floats.
+        occurrence (str, optional): Which occurences of the anchor to use. One of 'first', 'last' and 'all'. With 'all' the conversion must return lists, which are joined. Defaults to 'last'.
+        error (str, optional): If the quantity could not be found it will print 'No [error] could be found in [file]. Defaults to the attribute names.
+        default (Any, optional): Value given to all attributes if the quantity could not be found. Defaults to 'NaN'.
+    """
+    def __init__(self, anchor: str, attributes: List[str], fields: List[Tuple[int, Union[int, slice]]], conversion: Callable[[list], list] = Floats, occurrence: str = 'last', error: str = None, default: Any = 'NaN') -> None:
+        if occurrence not in OCCURRENCES:
+            raise ValueError(f'occurrence must be one of {OCCURRENCES}, not {occurrence}')
+        self.anchor = anchor
+        self.attributes = attributes
+        self.fields = fields
+        self.conversion = conversion
+        self.occurrence = occurrence
+        self.error = error if error is not None else ', '.join(attributes)
+        self.default = default
+
+        offsets = [offset for offset, _ in fields]
+        self.lookback = max(0, -min(offsets))
+        self.lookahead = max(0, max(offsets))
+
+    def Convert(self, values: list) -> list:
+        values = self.conversion(values)
+        if len(values) != len(self.attributes):
+            raise ValueError(f'Conversion for {self.anchor} gave {len(values)} values for {len(self.attributes)} attributes')
+        return values
+
+
+class SpecParser:
+    """State machine extracting every quantity described by a set of specs while the lines of a file are fed to it in order
+
+    The lines are only looked at once, so all quantities are extracted in a single read no matter how many specs are given. Lines can be fed in several portions, e.g. as a file grows, and only lines needed by a spec are kept between them
+    """
+    def __init__(self, specs: Iterable[ExtractionSpec]) -> None:
+        self.specs = list(dict.fromkeys(specs))
+        anchors = list(dict.fromkeys(spec.anchor for spec in self.specs))
+        self.combined = re.compile('|'.join(f'(?:{TranslatePattern(anchor)})' for anchor in anchors)).search if anchors else None
+        self.matchers = [(CompilePattern(anchor), [i for i, spec in enumerate(self.specs) if spec.anchor == anchor]) for anchor in anchors]
+        self.lookback = max([spec.lookback for spec in self.specs], default=0)
+
+        # Lines before the current one that may be needed by a spec, by linenumber
+        self.recent = dict()
+        # Occurences waiting for a line further ahead, by the linenumber they are waiting for
+        self.pending = dict()
+        # Completed occurences of every spec as [linenumber of anchor, values]
+        self.found = [[] for _ in self.specs]
+        self.started = [False for _ in self.specs]
+
+    # Specs hold conversion functions which can not always be pickled, so only the progress is
+    # The parser must be given the same specs again when unpickled, see SetState
+    _state = ('recent', 'pending', 'found', 'started')
+
+    def GetState(self) -> dict:
+        """Gives the progress of the parser, which can be pickled
+
+        Returns:
+            (dict): Progress which can be given to SetState of a parser with the same specs
+        """
+        return {key: getattr(self, key) for key in self._state}
+
+    def SetState(self, state: dict) -> None:
+        for key in self._state:
+            setattr(self, key, state[key])
+
+    def _Start(self, index: int, linenumber: int) -> None:
+        spec = self.specs[index]
+        if spec.occurrence == 'first' and self.started[index]:
+            return
+        self.started[index] = True
+        occurence = [index, linenumber, [None] * len(spec.fields), len(spec.fields)]
+        for i, (offset, column) in enumerate(spec.fields):
+            if offset < 0:
+                if linenumber + offset not in self.recent:
+                    return
+                self._Capture(occurence, i, self.recent[linenumber + offset])
+            else:
+                self.pending.setdefault(linenumber + offset, []).append((occurence, i))
+
+    def _Capture(self, occurence: list, field: int, line: str) -> None:
+        index, linenumber, values, _ = occurence
+        spec = self.specs[index]
+        column = spec.fields[field][1]
+        try:
+            values[field] = line.split()[column]
+        except IndexError:
+            return
+        occurence[3] -= 1
+        if occurence[3] != 0:
+            return
+        found = self.found[index]
+        if spec.occurrence == 'all':
+            found.append([linenumber, values])
+        elif spec.occurrence == 'first' or len(found) == 0:
+            found[:] = [[linenumber, values]]
+        elif found[0][0] <= linenumber:
+            found[0] = [linenumber, values]
+
+    def Feed(self, lines: Iterable[Tuple[int, str]]) -> None:
+        """Feeds lines to the parser
+
+        Args:
+            lines (Iterable[Tuple[int, str]]): Pairs of linenumber and line in increasing order of linenumber. Lines not near an anchor may be left out
+        """
+        for linenumber, line in lines:
+            if self.combined is not None and self.combined(line) is not None:
+                for matcher, indices in self.matchers:
+                    if matcher(line):
+                        for index in indices:
+                            self._Start(index, linenumber)
+            for occurence, field in self.pending.pop(linenumber, ()):
+                self._Capture(occurence, field, line)
+            if self.lookback > 0:
+                self.recent[linenumber] = line
+                for old in [old for old in self.recent if old < linenumber - self.lookback]:
+                    del self.recent[old]
+
+    def Values(self, spec: ExtractionSpec) -> Union[list, None]:
+        """Converts the values found for [spec]
+
+        Args:
+            spec (ExtractionSpec): Spec given to the parser
+
+        Returns:
+            (list, None): One value per attribute of [spec]. None if no complete occurence was found
+        """
+        found = self.found[self.specs.index(spec)]
+        if len(found) == 0:
+            return None
+        if spec.occurrence != 'all':
+            return spec.Convert(found[0][1])
+        values = [[] for _ in spec.attributes]
+        for _, occurence in found:
+            for joined, value in zip(values, spec.Convert(occurence)):
+                joined += value
+        if all(len(value) == 0 for value in values):
+            return None
+        return values
+
+
+def NumberedLines(file, specs: Iterable[ExtractionSpec]) -> Iterator[Tuple[int, str]]:
+    """Gives the lines of [file] needed to extract [specs]
+
+    If the anchors of all specs have been indexed only the lines around their occurences are given, otherwise all lines are
+
+    Args:
+        file (OutputFile): File to take lines from
+        specs (Iterable[ExtractionSpec]): Specs the lines are needed for
+
+    Yields:
+        (Tuple[int, str]): Pairs of linenumber and line in increasing order of linenumber
+    """
+    specs = list(specs)
+    if not all(spec.anchor in file.index for spec in specs):
+        yield from enumerate(file.lines)
+        return
+    needed = set()
+    for spec in specs:
+        for linenumber in file.index[spec.anchor]:
+            needed.update(range(linenumber - spec.lookback, linenumber + spec.lookahead + 1))
+    for linenumber in sorted(needed):
+        if 0 <= linenumber < len(file.lines):
+            yield linenumber, file.lines[linenumber]
+
+def FirstFound(parser: SpecParser, alternatives: List[ExtractionSpec]) -> Tuple[ExtractionSpec, Union[list, None]]:
+    """Gives the values of the first of [alternatives] found by [parser]
+
+    Args:
+        parser (SpecParser): Parser which has been given all of [alternatives]
+        alternatives (List[ExtractionSpec]): Alternative specs for a quantity in the order they are tried
+
+    Returns:
+        (Tuple[ExtractionSpec, Union[list, None]]): The spec and its values. If none were found it is the last spec and None
+    """
+    for spec in alternatives:
+        values = parser.Values(spec)
+        if values is not None:
+            break
+    return spec, values
+
+def RunExtractionSpecs(extract, methods: Iterable[str], specs: Dict[str, List[ExtractionSpec]] = None) -> List[str]:
+    """Extracts all quantities of [methods] described by the specs of [extract] in a single pass through the file
+
+    Each method in extract.specs maps to a list of alternative specs, which are tried in order. If none of them are found the attributes are set to the default of the last alternative. If only a region of the file has been read only the first alternative is tried
+
+    Args:
+        extract: Extraction class, e.g. GaussianExtract, with the attributes specs, file and quiet
+        methods (Iterable[str]): Methods requested, e.g. ['_Energy', '_Frequencies']. Methods without specs are ignored
+        specs (Dict[str, List[ExtractionSpec]], optional): Specs to use instead of extract.specs. Defaults to None.
+
+    Returns:
+        (List[str]): The methods that were extracted
+    """
+    if specs is None:
+        specs = getattr(extract, 'specs', dict())
+    methods = [method for method in dict.fromkeys(methods) if method in specs]
+    if len(methods) == 0:
+        return methods
+    # When only a region of the file has been read, a later alternative found there may not be the one found in the whole file, e.g. SCF Done: after the zero-point energy
+    # Only the first alternative is tried then, and the whole file is read if it is not found, see OutputType._ReadPlanned
+    if extract.file.region is not None:
+        specs = {method: specs[method][:1] for method in methods}
+    parser = SpecParser(spec for method in methods for spec in specs[method])
+    parser.Feed(NumberedLines(extract.file, parser.specs))
+    for method in methods:
+        spec, values = FirstFound(parser, specs[method])
+        if values is None:
+            if not extract.quiet:
+                Log(f'No {spec.error} could be found in {extract.filename}', MISSING, spec.error, extract.filename)
+            values = [copy.copy(spec.default) for _ in spec.attributes]
+        for attribute, value in zip(spec.attributes, values):
+            setattr(extract, attribute, value)
+    return methods
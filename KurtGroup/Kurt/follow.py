@@ -0,0 +1,168 @@
+import os
+import copy
+import pickle
+from typing import Dict, List
+from extraction_specs import FirstFound, SpecParser
+from extraction_log import Log, NOT_IMPLEMENTED, UNKNOWN_FORMAT
+from output_file import OpenBinary, OpenBuffered, PeekLines
+from output_processing import DetectOutputFormat, FORMAT_DETECTION_BYTES, FORMAT_DETECTION_LINES, UnknownExtract
+
+# Amount of bytes read at a time when parsing what has been appended to a followed file
+FOLLOW_BLOCK_SIZE = 16 * 1024**2
+
+
+class FollowedFile:
+    """Extraction from an output file of a calculation that may still be running
+
+    Every update only parses the bytes appended to the file since the previous update. The byte offset and the state of the parser are kept between updates, so the cost of following a file scales with how much has been written to it and not its total size
+
+    Only quantities described by extraction specs can be followed, see extraction_specs.py
+
+    Args:
+        filename (str): Output file to follow. It does not need to exist yet
+        methods (List[str]): Methods of the extraction classes to follow, e.g. ['_Energy', '_Dipole_moments']
+        Quiet (bool, optional): If true nothing is written to collect_data.log. Defaults to False.
+    """
+    def __init__(self, filename: str, methods: List[str], *, Quiet: bool = False) -> None:
+        self.filename = filename
+        self.methods = list(methods)
+        self.quiet = Quiet
+        self.Reset()
+
+    def Reset(self) -> None:
+        """Forgets everything parsed so far. The next update will parse the file from the start
+        """
+        # The file is parsed up to this byte offset, which is always at the start of a line
+        self.offset = 0
+        self.linenumber = 0
+        self.size = 0
+        self.input = None
+        self.extract = None
+        self.followed = []
+        self.parser = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self.parser is not None:
+            state['parser'] = self.parser.GetState()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.parser is not None:
+            self.parser = self._Parser()
+            self.parser.SetState(state['parser'])
+
+    def _Parser(self) -> SpecParser:
+        return SpecParser(spec for method in self.followed for spec in self.extract.specs[method])
+
+    def _Log(self, message: str, kind: str, subject: str = None) -> None:
+        if not self.quiet:
+            Log(message, kind, subject, self.filename)
+
+    def _DetectFormat(self) -> bool:
+        with OpenBuffered(self.filename, FORMAT_DETECTION_BYTES) as file:
+            lines = PeekLines(file, FORMAT_DETECTION_BYTES, FORMAT_DETECTION_LINES)
+        extract, input = DetectOutputFormat(lines)
+
+        if extract is UnknownExtract:
+            # The program may not have written its header yet
+            if len(lines) < FORMAT_DETECTION_LINES and self.size < FORMAT_DETECTION_BYTES:
+                return False
+            self.input = input
+            self._Log(f"The output file {self.filename} is not of a known format", UNKNOWN_FORMAT)
+            return False
+
+        self.input = input
+        self.extract = extract
+        specs = getattr(extract, 'specs', dict())
+        self.followed = [method for method in self.methods if method in specs]
+        for method in self.methods:
+            if method not in specs:
+                self._Log(f'{self.filename}: {method} can not be followed for {input}', NOT_IMPLEMENTED, method)
+        self.parser = self._Parser()
+        return True
+
+    def Update(self) -> bool:
+        """Parses the lines appended to the file since the last update
+
+        If the file has become smaller it is assumed to have been replaced, e.g. by a restarted calculation, and it is parsed from the start
+
+        Returns:
+            (bool): True if any new lines were parsed
+        """
+        if not os.path.isfile(self.filename):
+            return False
+
+        size = os.path.getsize(self.filename)
+        if size < self.size:
+            self.Reset()
+        self.size = size
+
+        if self.parser is None:
+            if self.input is not None or not self._DetectFormat():
+                return False
+
+        parsed = False
+        with OpenBinary(self.filename) as file:
+            file.seek(self.offset)
+            remainder = b''
+            while True:
+                block = file.read(FOLLOW_BLOCK_SIZE)
+                if not block:
+                    break
+                block = remainder + block
+                # A line that has not been finished is left for the next update
+                end = block.rfind(b'\n') + 1
+                remainder = block[end:]
+                if end == 0:
+                    continue
+                lines = block[:end].decode('utf-8', errors='replace').replace('\r\n', '\n').split('\n')[:-1]
+                self.parser.Feed((self.linenumber + i, line + '\n') for i, line in enumerate(lines))
+                self.linenumber += len(lines)
+                self.offset += end
+                parsed = True
+        return parsed
+
+    def Values(self) -> Dict[str, object]:
+        """Gives the values of the followed quantities found so far
+
+        Returns:
+            (Dict[str, object]): The values by attribute name, e.g. {'tot_energy': -76.02}. Quantities which have not been found yet have their default value
+        """
+        values = dict()
+        if self.parser is None:
+            return values
+        for method in self.followed:
+            spec, found = FirstFound(self.parser, self.extract.specs[method])
+            if found is None:
+                found = [copy.copy(spec.default) for _ in spec.attributes]
+            values.update(zip(spec.attributes, found))
+        return values
+
+
+def LoadFollowState(filename: str) -> Dict[str, FollowedFile]:
+    """Loads followed files saved with SaveFollowState
+
+    Args:
+        filename (str): File the followed files were saved in
+
+    Returns:
+        (Dict[str, FollowedFile]): The followed files by the name of the output file. Empty if [filename] does not exist
+    """
+    if not os.path.isfile(filename):
+        return dict()
+    with open(filename, 'rb') as file:
+        return pickle.load(file)
+
+def SaveFollowState(filename: str, followed: Dict[str, FollowedFile]) -> None:
+    """Saves followed files so they can be resumed in a later run
+
+    Args:
+        filename (str): File to save the followed files in
+        followed (Dict[str, FollowedFile]): The followed files by the name of the output file
+    """
+    # Written to a temporary file first so an interrupted save does not destroy the previous state
+    with open(f'{filename}.tmp', 'wb') as file:
+        pickle.dump(followed, file)
+    os.replace(f'{filename}.tmp', filename)
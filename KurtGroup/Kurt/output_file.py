@@ -0,0 +1,1002 @@
+import io
+import os
+import json
+import copy
+import re
+import bz2
+import gzip
+import lzma
+import mmap
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterable, Iterator, List, TextIO, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Characters that make a search string a basic regular expression (as used by grep) instead of plain text
+BRE_SPECIAL_CHARACTERS = set('.*[]^$\\')
+
+# Files of at least this size (in bytes) are memory-mapped and only decoded line by line when needed
+LAZY_READING_THRESHOLD = 256 * 1024**2
+
+# Files of at least this size (in bytes) are searched for anchors by several processes at once, each searching its own range of the file
+PARALLEL_SCANNING_THRESHOLD = 1024**3
+
+# Amount of ranges per process a file is split into when searched in parallel. More ranges than processes evens out the work if the anchors are not spread evenly
+RANGES_PER_PROCESS = 4
+
+# Amount of bytes looked through at a time when locating the newlines of a memory-mapped file
+NEWLINE_CHUNK_SIZE = 64 * 1024**2
+
+# Amount of bytes read at a time when searching a file from the end
+REVERSE_BLOCK_SIZE = 64 * 1024
+
+# Magic bytes at the start of compressed files and the compression they belong to
+COMPRESSION_MAGIC_BYTES = {
+    b'\x1f\x8b': 'gzip',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+    b'BZh': 'bz2',
+}
+
+# Extensions of compressed files, which are removed when naming files made from an output file
+COMPRESSION_EXTENSIONS = ('.gz', '.xz', '.zst', '.bz2')
+
+# Compressed files are assumed to be about this many times larger when decompressed, when deciding whether to read them lazily
+COMPRESSION_RATIO = 8
+
+# Amount of bytes decompressed at a time when a compressed file is decompressed into a temporary file
+DECOMPRESSION_BLOCK_SIZE = 16 * 1024**2
+
+# Amount of bytes read from the start of a file for quantities printed near its start, e.g. the multiplicity
+HEAD_REGION_SIZE = 64 * 1024
+
+# Amount of bytes read from the end of a file for quantities printed near its end, e.g. the final energy and the CPU time
+TAIL_REGION_SIZE = 256 * 1024
+
+# Regions of a file that can be read instead of the whole file
+REGIONS = ('head', 'tail')
+
+# Translates the exponents of Fortran double precision numbers, e.g. 0.509289D+02, into ones numpy can read
+FORTRAN_EXPONENTS = bytes.maketrans(b'Dd', b'Ee')
+
+# Amount of values written per line in the arrays of Gaussian formatted checkpoint files, by the type of the array
+FCHK_VALUES_PER_LINE = {'I': 6, 'R': 5, 'C': 5, 'H': 9, 'L': 72}
+
+_compiled_patterns = dict()
+
+def Compression(filename: str) -> Union[str, None]:
+    """Determines how a file is compressed from the magic bytes at its start
+
+    Args:
+        filename (str): File to check
+
+    Returns:
+        (str, None): One of 'gzip', 'xz', 'zstd' and 'bz2'. None if the file is not compressed
+    """
+    with open(filename, "rb") as file:
+        start = file.read(max(len(magic) for magic in COMPRESSION_MAGIC_BYTES))
+    for magic, compression in COMPRESSION_MAGIC_BYTES.items():
+        if start.startswith(magic):
+            return compression
+    return None
+
+def OpenBinary(filename: str) -> BinaryIO:
+    """Opens a file for reading bytes from the start. Compressed files are decompressed while being read
+
+    Args:
+        filename (str): File to open
+
+    Returns:
+        (BinaryIO): The opened file
+    """
+    compression = Compression(filename)
+    if compression is None:
+        return open(filename, "rb")
+    elif compression == 'gzip':
+        return gzip.open(filename, "rb")
+    elif compression == 'xz':
+        return lzma.open(filename, "rb")
+    elif compression == 'bz2':
+        return bz2.open(filename, "rb")
+    if zstandard is None:
+        raise ImportError(f'The zstandard package is needed to read {filename}, which is compressed with zstd')
+    return zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+
+def OpenText(filename: str) -> TextIO:
+    """Opens a file for reading text in the same way as open(filename, "r"). Compressed files are decompressed while being read
+
+    Args:
+        filename (str): File to open
+
+    Returns:
+        (TextIO): The opened file
+    """
+    if Compression(filename) is None:
+        return open(filename, "r")
+    return io.TextIOWrapper(OpenBinary(filename))
+
+def OpenBuffered(filename: str, buffer_size: int) -> io.BufferedReader:
+    """Opens a file for reading bytes from the start with a buffer of [buffer_size] bytes, so the start of the file can be peeked at without being read again later. Compressed files are decompressed while being read
+
+    Args:
+        filename (str): File to open
+        buffer_size (int): Size of the buffer in bytes
+
+    Returns:
+        (io.BufferedReader): The opened file
+    """
+    if Compression(filename) is None:
+        return open(filename, "rb", buffering=buffer_size)
+    return io.BufferedReader(OpenBinary(filename), buffer_size)
+
+def PeekLines(stream: io.BufferedReader, size: int, count: int) -> List[str]:
+    """Gives the first lines of a file without moving the position of [stream]
+
+    Args:
+        stream (io.BufferedReader): File opened with OpenBuffered
+        size (int): At most this many bytes are looked at
+        count (int): At most this many lines are given
+
+    Returns:
+        (List[str]): The first lines of the file. The last one may not be complete
+    """
+    head = stream.peek(size)[:size].decode('utf-8', errors='replace')
+    return io.StringIO(head, newline=None).readlines()[:count]
+
+def Decompress(file: Union[str, BinaryIO]) -> BinaryIO:
+    """Decompresses a file into an anonymous temporary file, which is deleted when closed
+
+    Args:
+        file (str, BinaryIO): Compressed file, or a decompressing stream from OpenBinary which will be closed
+
+    Returns:
+        (BinaryIO): The temporary file, positioned at its start
+    """
+    copy = tempfile.TemporaryFile()
+    with (OpenBinary(file) if isinstance(file, str) else file) as stream:
+        shutil.copyfileobj(stream, copy, DECOMPRESSION_BLOCK_SIZE)
+    copy.seek(0)
+    return copy
+
+@contextmanager
+def OpenSeekable(filename: str) -> Iterator[BinaryIO]:
+    """Opens a file for reading bytes at any position. Compressed files are decompressed into a temporary file first
+
+    Args:
+        filename (str): File to open
+
+    Yields:
+        (BinaryIO): The opened file
+    """
+    if Compression(filename) is None:
+        file = open(filename, "rb")
+    else:
+        file = Decompress(filename)
+    with file:
+        yield file
+
+def StripCompressionExtension(filename: str) -> str:
+    """Removes the extension of a compressed file, e.g. water.out.gz becomes water.out
+
+    Args:
+        filename (str): Name of the file
+
+    Returns:
+        (str): The name without the compression extension. Unchanged if there is none
+    """
+    for extension in COMPRESSION_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename[:-len(extension)]
+    return filename
+
+def FileSize(filename: str) -> int:
+    """Estimates the size of a file when decompressed. This is the actual size if the file is not compressed
+
+    Args:
+        filename (str): File to check
+
+    Returns:
+        (int): Size in bytes
+    """
+    size = os.path.getsize(filename)
+    if size > 0 and Compression(filename) is not None:
+        size *= COMPRESSION_RATIO
+    return size
+
+def ParseTable(block: Union[str, bytes], columns: Union[int, slice, List[int]] = slice(None), width: int = None, dtype: type = float, fortran: bool = False) -> np.ndarray:
+    """Parses a block of whitespace separated values, e.g. coordinates or a tensor, into an array
+
+    The block is split into tokens once and all of them are converted by numpy in a single call, instead of splitting every line and converting every value in python
+
+    Args:
+        block (Union[str, bytes]): The lines of the table, e.g. from OutputFile.Block
+        columns (Union[int, slice, List[int]], optional): Columns to give. Defaults to all columns.
+        width (int, optional): Amount of values in every row of the table. A row may span several lines. Defaults to the amount of values in the first line that is not empty.
+        dtype (type, optional): Type of the values. With str the values are given as written. Defaults to float.
+        fortran (bool, optional): If true the values may be written with Fortran D exponents. Defaults to False.
+
+    Raises:
+        ValueError: If the values can not be divided into rows of [width] values or can not be converted to [dtype]
+
+    Returns:
+        (np.ndarray): The values with shape (rows, columns), or (rows,) if [columns] is an int
+    """
+    if isinstance(block, str):
+        block = block.encode('utf-8')
+    tokens = block.split()
+    if width is None:
+        width = len(block.lstrip().split(b'\n', 1)[0].split())
+    if width == 0 or len(tokens) % width != 0:
+        if len(tokens) == 0:
+            return np.empty((0,) if isinstance(columns, int) else (0, len(columns) if isinstance(columns, list) else 0), dtype=dtype)
+        raise ValueError(f'{len(tokens)} values can not be divided into rows of {width} values')
+    table = np.array(tokens).reshape(-1, width)[:, columns]
+    if dtype is str:
+        return table.astype(str)
+    if fortran:
+        table = np.array(b' '.join(table.ravel()).translate(FORTRAN_EXPONENTS).split()).reshape(table.shape)
+    return table.astype(dtype)
+
+def ReadRegion(filename: str, region: str, stream: BinaryIO = None) -> Tuple[List[str], bool]:
+    """Reads the lines in the first HEAD_REGION_SIZE or the last TAIL_REGION_SIZE bytes of a file. Lines cut by the edge of the region are left out
+
+    Args:
+        filename (str): File to read
+        region (str): Either 'head' or 'tail'
+        stream (BinaryIO, optional): Stream already opened on the file with OpenBinary or OpenBuffered, positioned at its start. It is used instead of opening the file again and is closed. Defaults to None.
+
+    Raises:
+        ValueError: If [region] is not one of REGIONS
+
+    Returns:
+        (Tuple[List[str], bool]): The lines in the region, and whether the region is the whole file
+    """
+    if region not in REGIONS:
+        raise ValueError(f'region must be one of {REGIONS}, not {region}')
+    with (OpenBinary(filename) if stream is None else stream) as file:
+        if region == 'head':
+            data = file.read(HEAD_REGION_SIZE + 1)
+            complete = len(data) <= HEAD_REGION_SIZE
+            if not complete:
+                data = data[:data.rfind(b'\n', 0, HEAD_REGION_SIZE) + 1]
+        else:
+            # The byte before the region is read as well, to know whether the first line of the region is whole
+            if Compression(filename) is None:
+                file.seek(max(0, os.fstat(file.fileno()).st_size - TAIL_REGION_SIZE - 1))
+                data = file.read()
+            else:
+                data = b''
+                for block in iter(lambda: file.read(DECOMPRESSION_BLOCK_SIZE), b''):
+                    data = (data + block)[-(TAIL_REGION_SIZE + 1):]
+            complete = len(data) <= TAIL_REGION_SIZE
+            if not complete:
+                data = data[data.find(b'\n') + 1:]
+    return io.TextIOWrapper(io.BytesIO(data)).readlines(), complete
+
+def TranslatePattern(text: str) -> str:
+    """Translates a grep basic regular expression into an equivalent python regular expression
+
+    Args:
+        text (str): Search string written as a basic regular expression
+
+    Returns:
+        (str): Python regular expression matching the same lines as grep would
+    """
+    pattern = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\' and i + 1 < len(text):
+            # In basic regular expressions the escaped versions of these are the operators
+            if text[i+1] in '(){}|+?':
+                pattern.append(text[i+1])
+            else:
+                pattern.append(re.escape(text[i+1]))
+            i += 2
+            continue
+        if char == '[':
+            end = i + 1
+            if end < len(text) and text[end] == '^':
+                end += 1
+            if end < len(text) and text[end] == ']':
+                end += 1
+            end = text.find(']', end)
+            if end != -1:
+                pattern.append(text[i:end+1].replace('\\', '\\\\'))
+                i = end + 1
+                continue
+            pattern.append(re.escape(char))
+        elif char == '*' and (i == 0 or (i == 1 and text[0] == '^')):
+            # A leading star has nothing to repeat and is therefore literal
+            pattern.append(re.escape(char))
+        elif char == '^' and i != 0:
+            pattern.append(re.escape(char))
+        elif char == '$' and i != len(text) - 1:
+            pattern.append(re.escape(char))
+        elif char in '.*^$':
+            pattern.append(char)
+        else:
+            pattern.append(re.escape(char))
+        i += 1
+    return ''.join(pattern)
+
+def CompilePattern(text: str, regex: bool = None) -> Callable[[str], bool]:
+    """Creates a function that checks whether a line contains [text]
+
+    Plain text is looked for using substring checks, which are considerably faster than regular expressions
+
+    Args:
+        text (str): Text string to look for. Written as a grep basic regular expression
+        regex (bool, optional): Whether [text] is a regular expression. Detected from the special characters in [text] if not given
+
+    Returns:
+        (Callable[[str], bool]): Function taking a line and returning whether [text] can be found in it
+    """
+    try:
+        return _compiled_patterns[(text, regex)]
+    except KeyError: ...
+    if regex is None:
+        regex = any(char in BRE_SPECIAL_CHARACTERS for char in text)
+    if regex:
+        search = re.compile(TranslatePattern(text)).search
+        matcher = lambda line: search(line) is not None
+    else:
+        matcher = lambda line: text in line
+    _compiled_patterns[(text, regex)] = matcher
+    return matcher
+
+
+def CompileBytesPattern(regex: str) -> re.Pattern:
+    """Compiles a python regular expression so it can search memory-mapped files directly
+
+    Args:
+        regex (str): Python regular expression, e.g. from TranslatePattern
+
+    Returns:
+        (re.Pattern): Compiled bytes regular expression where '.' never crosses a line break
+    """
+    try:
+        return _compiled_patterns[(regex, bytes)]
+    except KeyError: ...
+    pattern = re.compile(regex.encode(), re.MULTILINE)
+    _compiled_patterns[(regex, bytes)] = pattern
+    return pattern
+
+def _ScanRange(filename: str, regex: str, start: int, stop: int) -> List[int]:
+    """Finds the lines of a file matching [regex] in a range of bytes. Run by the processes of MappedLines.ParallelScan
+
+    Args:
+        filename (str): Uncompressed file to search
+        regex (str): Python regular expression
+        start (int): Byte offset of the start of a line, where the range begins
+        stop (int): Byte offset of the start of a line, where the range ends
+
+    Returns:
+        (List[int]): Byte offsets within the matching lines in increasing order, one per line
+    """
+    pattern = CompileBytesPattern(regex)
+    found = []
+    with open(filename, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as map:
+        position = start
+        while position < stop:
+            match = pattern.search(map, position, stop)
+            if match is None:
+                break
+            found.append(match.start())
+            # Continue from the next line, so every line is only found once
+            position = map.find(b'\n', match.start(), stop) + 1
+            if position == 0:
+                break
+    return found
+
+
+def ReadLinesBackward(filename: str, block_size: int = REVERSE_BLOCK_SIZE) -> Iterator[bytes]:
+    """Reads a file from the end in blocks of [block_size] bytes and yields its lines from the last to the first
+
+    Only the blocks needed to reach the wanted lines are read, so looking at the end of a file costs the same no matter how large the file is. Compressed files have to be decompressed first
+
+    Args:
+        filename (str): File to read
+        block_size (int, optional): Amount of bytes read at a time. Defaults to REVERSE_BLOCK_SIZE.
+
+    Yields:
+        (bytes): Lines without their line break, starting with the last line of the file
+    """
+    with OpenSeekable(filename) as file:
+        position = file.seek(0, os.SEEK_END)
+        remainder = None
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            file.seek(position)
+            block = file.read(size)
+            if remainder is None:
+                # A trailing line break does not start a new line
+                if block.endswith(b'\n'):
+                    block = block[:-1]
+            else:
+                block += remainder
+            lines = block.split(b'\n')
+            # The first line of the block may continue in the block before it
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                yield line.rstrip(b'\r')
+        if remainder is not None:
+            yield remainder.rstrip(b'\r')
+
+def SearchBackward(filename: str, text: str, block_size: int = REVERSE_BLOCK_SIZE) -> Union[Tuple[int, str], None]:
+    """Finds the last line containing [text] by reading the file from the end, stopping at the first occurence
+
+    The whole file is only read if there are no occurences of [text]
+
+    Args:
+        filename (str): File to search in
+        text (str): Text to look for. Written as a grep basic regular expression
+        block_size (int, optional): Amount of bytes read at a time. Defaults to REVERSE_BLOCK_SIZE.
+
+    Returns:
+        (Tuple[int, str], None): How many lines from the end the occurence is, counting the last line as 1, together with the line itself. None if there are no occurences
+    """
+    search = CompileBytesPattern(TranslatePattern(text)).search
+    for position, line in enumerate(ReadLinesBackward(filename, block_size), start=1):
+        if search(line) is not None:
+            return position, line.decode('utf-8', errors='replace') + '\n'
+
+
+class MappedLines:
+    """Read-only sequence of the lines in a file, backed by a memory map of the file
+
+    Only the byte offsets of the line starts are stored. A line is decoded when it is accessed, and slices are views that decode nothing until iterated over. Compressed files are decompressed into an anonymous temporary file, which is mapped instead
+    """
+    def __init__(self, filename: str, stream: BinaryIO = None) -> None:
+        self.filename = filename
+        self._map = None
+        self._offsets = None
+        self._decoded = dict()
+        # Compressed files are mapped through a decompressed temporary copy
+        self._copy = None
+        # Stream already opened on the file, which is used the first time a compressed file is decompressed
+        self._stream = stream
+
+    @staticmethod
+    def _MapFile(file: BinaryIO) -> Union[mmap.mmap, bytes]:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _Map(self) -> None:
+        stream, self._stream = self._stream, None
+        if Compression(self.filename) is None:
+            if stream is not None:
+                stream.close()
+            with open(self.filename, "rb") as file:
+                self._map = self._MapFile(file)
+        else:
+            self._copy = Decompress(self.filename if stream is None else stream)
+            self._map = self._MapFile(self._copy)
+        data = np.frombuffer(self._map, dtype=np.uint8)
+        chunks = [np.zeros(1, dtype=np.int64)]
+        for start in range(0, len(data), NEWLINE_CHUNK_SIZE):
+            chunks.append(np.flatnonzero(data[start:start+NEWLINE_CHUNK_SIZE] == ord('\n')).astype(np.int64) + start + 1)
+        del data
+        offsets = np.concatenate(chunks)
+        if offsets[-1] != len(self._map):
+            # The last line has no trailing newline
+            offsets = np.append(offsets, len(self._map))
+        self._offsets = offsets
+
+    @property
+    def map(self) -> Union[mmap.mmap, bytes]:
+        if self._map is None:
+            self._Map()
+        return self._map
+
+    @property
+    def offsets(self) -> np.ndarray:
+        if self._offsets is None:
+            self._Map()
+        return self._offsets
+
+    def close(self) -> None:
+        """Closes the memory map. It is reopened if the lines are accessed again
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._stream is not None:
+            self._stream.close()
+        if self._copy is not None:
+            self._copy.close()
+        self._map = None
+        self._offsets = None
+        self._decoded = dict()
+        self._copy = None
+        self._stream = None
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, so the file is mapped again by whoever unpickles the lines
+        return {'filename': self.filename}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['filename'])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _Line(self, linenumber: int, cache: bool = True) -> str:
+        try:
+            return self._decoded[linenumber]
+        except KeyError: ...
+        line = self.map[self.offsets[linenumber]:self.offsets[linenumber+1]].decode('utf-8', errors='replace')
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        if cache:
+            self._decoded[linenumber] = line
+        return line
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, 'LineView', List[str]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return LineView(self, start, max(start, stop))
+            return [self._Line(linenumber) for linenumber in range(start, stop, step)]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('line index out of range')
+        return self._Line(key)
+
+    def __iter__(self) -> Iterator[str]:
+        # Lines decoded while iterating are not kept, as that would end up holding the whole file in memory
+        for linenumber in range(len(self)):
+            yield self._Line(linenumber, cache=False)
+
+    def Scan(self, pattern: re.Pattern, start: int = 0, stop: int = None) -> Iterator[int]:
+        """Finds the lines matching [pattern] by searching the raw bytes of the file, without decoding any of them
+
+        Args:
+            pattern (re.Pattern): Compiled bytes regular expression, e.g. from CompileBytesPattern
+            start (int, optional): First linenumber to look in. Defaults to 0.
+            stop (int, optional): Linenumber to stop before. Defaults to the end of the file.
+
+        Yields:
+            (int): Linenumbers of the occurences in increasing order
+        """
+        offsets = self.offsets
+        stop = len(self) if stop is None else stop
+        position, end = int(offsets[start]), int(offsets[stop])
+        while position < end:
+            match = pattern.search(self.map, position, end)
+            if match is None:
+                return
+            linenumber = int(np.searchsorted(offsets, match.start(), side='right')) - 1
+            yield linenumber
+            position = int(offsets[linenumber+1])
+
+    def ParallelScan(self, regex: str, processes: int = None) -> List[int]:
+        """Finds the lines matching [regex] like Scan, but with several processes each searching a range of the file
+
+        The ranges start and end at line breaks, so no line is split between two processes. Compressed files, and files searched from a process that can not start processes of its own (e.g. one of the processes of collect_data.py), are searched by Scan instead
+
+        Args:
+            regex (str): Python regular expression, e.g. from TranslatePattern
+            processes (int, optional): Amount of processes to search with. Defaults to the amount of CPUs.
+
+        Returns:
+            (List[int]): Linenumbers of the occurences in increasing order
+        """
+        if processes is None:
+            processes = os.cpu_count() or 1
+        offsets = self.offsets
+        if processes < 2 or len(self) < 2 or Compression(self.filename) is not None or multiprocessing.current_process().daemon:
+            return list(self.Scan(CompileBytesPattern(regex)))
+
+        # Evenly sized ranges, moved to the nearest start of a line
+        boundaries = offsets[np.searchsorted(offsets, np.linspace(0, offsets[-1], processes * RANGES_PER_PROCESS + 1), side='left')]
+        boundaries = np.unique(boundaries)
+        ranges = [(self.filename, regex, int(start), int(stop)) for start, stop in zip(boundaries[:-1], boundaries[1:])]
+        with multiprocessing.Pool(min(processes, len(ranges))) as pool:
+            found = pool.starmap(_ScanRange, ranges)
+        positions = np.array([position for positions in found for position in positions], dtype=np.int64)
+        return (np.searchsorted(offsets, positions, side='right') - 1).tolist()
+
+    def ScanBackward(self, pattern: re.Pattern, block_size: int = REVERSE_BLOCK_SIZE) -> Iterator[int]:
+        """Finds the lines matching [pattern] by searching blocks of the file, starting with the block at the end
+
+        Args:
+            pattern (re.Pattern): Compiled bytes regular expression, e.g. from CompileBytesPattern
+            block_size (int, optional): Approximate amount of bytes searched at a time. Defaults to REVERSE_BLOCK_SIZE.
+
+        Yields:
+            (int): Linenumbers of the occurences in decreasing order
+        """
+        offsets = self.offsets
+        stop = len(self)
+        while stop > 0:
+            # Blocks are aligned to whole lines, so no occurence can be split between two blocks
+            start = min(int(np.searchsorted(offsets, offsets[stop] - block_size, side='left')), stop - 1)
+            yield from reversed(list(self.Scan(pattern, start, stop)))
+            stop = start
+
+
+class LineView:
+    """A range of lines in a MappedLines, decoded only when accessed
+    """
+    def __init__(self, lines: MappedLines, start: int, stop: int) -> None:
+        self.lines = lines
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, 'LineView', List[str]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return self.lines[self.start+start:self.start+stop:step]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('line index out of range')
+        return self.lines[self.start+key]
+
+    def __iter__(self) -> Iterator[str]:
+        for linenumber in range(self.start, self.stop):
+            yield self.lines[linenumber]
+
+
+class OutputFile:
+    def __init__(self, filename: str, anchors: Iterable[str] = (), lazy: bool = None, stream: BinaryIO = None, parallel: bool = None, region: str = None) -> None:
+        self.filename = filename
+        self.index = dict()
+        # Only this region of the file is read if it is not None, see ReadRegion. Linenumbers are then counted from the start of the region
+        self.region = region
+        if region is not None:
+            lazy = parallel = False
+        size = FileSize(filename) if lazy is None or parallel is None else 0
+        if lazy is None:
+            lazy = size >= LAZY_READING_THRESHOLD
+        self.lazy = lazy
+        if parallel is None:
+            parallel = size >= PARALLEL_SCANNING_THRESHOLD
+        # Only lazily read files are searched in parallel, as the processes search the file on disk
+        self.parallel = parallel and lazy
+
+        self.ReadFile(stream)
+
+        if anchors:
+            self.BuildIndex(anchors)
+
+    def ReadFile(self, stream: BinaryIO = None) -> None:
+        """Reads the lines of the file
+
+        Args:
+            stream (BinaryIO, optional): Stream already opened on the file with OpenBinary or OpenBuffered, positioned at its start. It is used instead of opening the file again and is closed. Defaults to None.
+        """
+        if self.region is not None:
+            self.lines, complete = ReadRegion(self.filename, self.region, stream)
+            if complete:
+                self.region = None
+            return
+        if self.lazy:
+            self.lines = MappedLines(self.filename, stream)
+            return
+        with (OpenText(self.filename) if stream is None else io.TextIOWrapper(stream)) as file:
+            self.lines = file.readlines()
+
+    def close(self) -> None:
+        """Releases the memory map of lazily read files. Does nothing for files read into memory
+        """
+        if self.lazy:
+            self.lines.close()
+
+    def _Scan(self, text: str) -> Iterator[int]:
+        """Goes through the file from the beginning, yielding the linenumber of every line containing [text]
+        """
+        if self.lazy:
+            yield from self._ScanRegex(TranslatePattern(text))
+            return
+        matcher = CompilePattern(text)
+        for linenumber, line in enumerate(self.lines):
+            if matcher(line):
+                yield linenumber
+
+    def _ScanRegex(self, regex: str) -> Iterator[int]:
+        """Goes through the file from the beginning, yielding the linenumber of every line matching the python regular expression [regex]
+        """
+        if self.lazy:
+            yield from self.lines.Scan(CompileBytesPattern(regex))
+            return
+        search = re.compile(regex).search
+        for linenumber, line in enumerate(self.lines):
+            if search(line) is not None:
+                yield linenumber
+
+    def BuildIndex(self, anchors: Iterable[str]) -> None:
+        """Finds the linenumbers of all occurences of every anchor in a single pass through the file
+
+        Lines are first checked against one regular expression combining all anchors, so only the few lines containing an anchor are checked against each of them. Files of at least PARALLEL_SCANNING_THRESHOLD bytes are checked by several processes at once, see MappedLines.ParallelScan
+
+        Args:
+            anchors (Iterable[str]): Text strings to find. Written as grep basic regular expressions
+        """
+        anchors = [anchor for anchor in dict.fromkeys(anchors) if anchor not in self.index]
+        if len(anchors) == 0:
+            return
+        for anchor in anchors:
+            self.index[anchor] = []
+        combined = '|'.join(f'(?:{TranslatePattern(anchor)})' for anchor in anchors)
+        matchers = [(self.index[anchor], CompilePattern(anchor)) for anchor in anchors]
+        linenumbers = self.lines.ParallelScan(combined) if self.parallel else self._ScanRegex(combined)
+        for linenumber in linenumbers:
+            line = self.lines[linenumber]
+            for linenumbers, matcher in matchers:
+                if matcher(line):
+                    linenumbers.append(linenumber)
+
+    def Block(self, start: int, stop: int) -> bytes:
+        """Gives the raw bytes of a range of lines, e.g. for ParseTable. Lazily read files are sliced directly from the memory map without decoding the lines
+
+        Args:
+            start (int): First linenumber of the block
+            stop (int): Linenumber to stop before
+
+        Returns:
+            (bytes): The lines from [start] to [stop]
+        """
+        start, stop, _ = slice(start, stop).indices(len(self.lines))
+        if stop <= start:
+            return b''
+        if self.lazy:
+            offsets = self.lines.offsets
+            return self.lines.map[offsets[start]:offsets[stop]]
+        return ''.join(self.lines[start:stop]).encode('utf-8')
+
+    def Segment(self, start: int, stop: int) -> 'OutputFile':
+        """Gives a range of lines as an OutputFile of its own, e.g. one job of an output file of chained jobs. Nothing is read again, and the anchors already indexed are taken from the index of this file
+
+        Args:
+            start (int): First linenumber of the segment
+            stop (int): Linenumber to stop before
+
+        Returns:
+            (OutputFile): The segment, where linenumbers are counted from [start]
+        """
+        segment = copy.copy(self)
+        segment.lines = self.lines[start:stop]
+        # Lines of lazily read files are decoded when accessed, so the segment does not need a memory map of its own
+        segment.lazy = segment.parallel = False
+        segment.index = {anchor: [linenumber - start for linenumber in linenumbers if start <= linenumber < stop] for anchor, linenumbers in self.index.items()}
+        return segment
+
+    def __str__(self) -> str:
+        return self.filename
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def FindFirst(self, text: str) -> Union[int, None]:
+        """Finds the linenumber of the first line containing [text]
+
+        Args:
+            text (str): Text to look for
+
+        Returns:
+            (int, None): Linenumber of first occurence. None if there are no occurences
+        """
+        if text in self.index:
+            return self.index[text][0] if self.index[text] else None
+        return next(self._Scan(text), None)
+
+    def FindLast(self, text: str) -> Union[int, None]:
+        """Finds the linenumber of the last line containing [text]
+
+        Args:
+            text (str): Text to look for
+
+        Returns:
+            (int, None): Linenumber of last occurence. None if there are no occurences
+        """
+        if text in self.index:
+            return self.index[text][-1] if self.index[text] else None
+        if self.lazy:
+            return next(self.lines.ScanBackward(CompileBytesPattern(TranslatePattern(text))), None)
+        matcher = CompilePattern(text)
+        for linenumber in range(len(self.lines) - 1, -1, -1):
+            if matcher(self.lines[linenumber]):
+                return linenumber
+
+    def FindAll(self, text: str) -> List[int]:
+        """Finds the linenumbers of all lines containing [text]
+
+        Args:
+            text (str): Text to look for
+
+        Returns:
+            (List[int]): Linenumbers of all occurences
+        """
+        if text in self.index:
+            return list(self.index[text])
+        return list(self._Scan(text))
+
+    def FindAfterLast(self, text1: str, text2: str, lines: int) -> Union[int, None]:
+        """Finds the first line containing [text2] among the last occurence of [text1] and the [lines] following it
+
+        Args:
+            text1 (str): From the last occurence of this text the search for [text2] begins
+            text2 (str): Text to look for after [text1]
+            lines (int): How many lines after [text1] to look for [text2] in
+
+        Returns:
+            (int, None): Linenumber of [text2] occurence. None if there are no occurences
+        """
+        start = self.FindLast(text1)
+        if start is None:
+            return None
+        matcher = CompilePattern(text2)
+        for linenumber in range(start, min(start + lines + 1, len(self.lines))):
+            if matcher(self.lines[linenumber]):
+                return linenumber
+
+
+class FormattedCheckpoint:
+    """Records of a Gaussian formatted checkpoint file (.fchk)
+
+    Every record starts with a line of its label, its type (I, R, C, H or L) and either its value or, after N=, the amount of values in the lines following it. When the file is read only these lines are looked at, as the lines of the values of an array are skipped using the amount of values. The values of an array are converted the first time they are asked for, with a single numpy conversion
+
+    Args:
+        filename (str): The formatted checkpoint file, which may be compressed
+    """
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        with OpenBinary(filename) as file:
+            self.lines = file.read().split(b'\n')
+
+        # Type and value of every record, or its type, first linenumber and amount of values for arrays
+        self.records = dict()
+        # The first two lines are the title and the type of job
+        linenumber = 2
+        while linenumber < len(self.lines):
+            line = self.lines[linenumber].decode('utf-8', errors='replace')
+            linenumber += 1
+            if len(line) < 44 or line[43] not in FCHK_VALUES_PER_LINE:
+                continue
+            label, type = line[:40].strip(), line[43]
+            if line[47:49] == 'N=':
+                count = int(line[49:])
+                self.records[label] = (type, linenumber, count)
+                linenumber += -(-count // FCHK_VALUES_PER_LINE[type])
+            else:
+                self.records[label] = (type, line[49:].strip())
+        self.values = dict()
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.records
+
+    def __str__(self) -> str:
+        return self.filename
+
+    def Get(self, label: str) -> Union[int, float, str, np.ndarray, None]:
+        """Gives the value of a record
+
+        Args:
+            label (str): Label of the record, e.g. 'Total Energy' or 'Cartesian Force Constants'
+
+        Returns:
+            (int, float, str, np.ndarray, None): The value of the record, with arrays of I and R records as numpy arrays. None if there is no such record
+        """
+        if label not in self.records:
+            return None
+        if label not in self.values:
+            record = self.records[label]
+            type = record[0]
+            if len(record) == 2:
+                value = record[1]
+            else:
+                _, start, count = record
+                block = b' '.join(self.lines[start:start - (-count // FCHK_VALUES_PER_LINE[type])])
+                value = block.decode('utf-8', errors='replace') if type in 'CHL' else block.split()
+            if type == 'I':
+                value = np.array(value, dtype=int) if len(record) == 3 else int(value)
+            elif type == 'R':
+                value = np.array(value, dtype=float) if len(record) == 3 else float(value.replace('D', 'E'))
+            self.values[label] = value
+        return self.values[label]
+
+
+def NormalizedKey(key: str) -> str:
+    # Keys of property files are compared without case, spaces and punctuation, as these differ between the text and JSON property files of ORCA
+    return re.sub(r'[^0-9a-z]', '', key.lower())
+
+
+class PropertyFile:
+    """Properties of an ORCA property file, either the text file ([base]_property.txt) or the JSON file ([base].property.json) of newer versions
+
+    The properties are grouped in blocks, e.g. THERMOCHEMISTRY_Energies, of keys and values. A value is a number, a string or a matrix of numbers. Blocks printed more than once, e.g. for every step of a geometry optimization, are given as printed last
+
+    Args:
+        filename (str): The property file, which may be compressed
+    """
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        # The values of every block by the normalized key, by the normalized name of the block in the order they were printed
+        self.blocks = dict()
+        with OpenText(filename) as file:
+            if StripCompressionExtension(filename).endswith('.json'):
+                self._ReadJSON(json.load(file))
+            else:
+                self._ReadText(file.read().splitlines())
+
+    def __str__(self) -> str:
+        return self.filename
+
+    def _ReadJSON(self, data: dict) -> None:
+        # Properties of every geometry are given as a list of geometries, where only the last is kept
+        geometries = data.get('Geometries', [data]) if isinstance(data, dict) else data
+        for geometry in geometries:
+            for name, block in geometry.items():
+                if isinstance(block, dict):
+                    self.blocks.pop(NormalizedKey(name), None)
+                    self.blocks[NormalizedKey(name)] = {NormalizedKey(key): np.array(value, dtype=float) if isinstance(value, list) else value for key, value in block.items()}
+
+    def _ReadText(self, lines: List[str]) -> None:
+        block = None
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            i += 1
+            # Blocks start with a line of their name and end with '$ End'
+            if line.startswith('$ ') and NormalizedKey(line[2:]) == 'end':
+                block = None
+                continue
+            if line.startswith('$ '):
+                block = dict()
+                self.blocks.pop(NormalizedKey(line[2:]), None)
+                self.blocks[NormalizedKey(line[2:])] = block
+                continue
+            if block is None or ':' not in line:
+                continue
+            key, value = line.rsplit(':', 1)
+            value = value.strip()
+            if len(value) > 0:
+                try:
+                    block[NormalizedKey(key)] = float(value) if '.' in value or 'E' in value.upper() else int(value)
+                except ValueError:
+                    block[NormalizedKey(key)] = value
+                continue
+            # Matrices are printed as rows starting with the row index, below a line of the column indices. Wide matrices are printed as several blocks of columns
+            rows = dict()
+            columns = []
+            while i < len(lines) and len(lines[i].split()) > 0:
+                words = lines[i].split()
+                if all(word.isdigit() for word in words):
+                    columns = [int(word) for word in words]
+                elif words[0].isdigit() and len(words) == len(columns) + 1:
+                    rows.setdefault(int(words[0]), dict()).update(zip(columns, [float(word) for word in words[1:]]))
+                else:
+                    break
+                i += 1
+            if len(rows) > 0:
+                block[NormalizedKey(key)] = np.array([[row[column] for column in sorted(row)] for _, row in sorted(rows.items())])
+
+    def Get(self, block: str, key: str) -> Union[int, float, str, np.ndarray, None]:
+        """Gives the value of a property
+
+        Args:
+            block (str): Name of the block, e.g. THERMOCHEMISTRY_Energies. Blocks whose names end with [block] are also used, e.g. SCF_Dipole_Moment for Dipole_Moment, where the one printed last is used
+            key (str): Key of the property in the block, e.g. 'Total Mass (AMU)'
+
+        Returns:
+            (int, float, str, np.ndarray, None): The value of the property. None if it is not in the file
+        """
+        block, key = NormalizedKey(block), NormalizedKey(key)
+        for name in reversed(list(self.blocks)):
+            if name.endswith(block) and key in self.blocks[name]:
+                return self.blocks[name][key]
+        return None
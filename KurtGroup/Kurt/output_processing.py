@@ -1,38 +1,46 @@
 
-import subprocess
+import os
+import re
+import copy
+import time
+import functools
 import numpy as np
-from typing import List
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, List, Tuple, Union
 from chemical_information import AtomicInformation
+from output_file import Compression, FormattedCheckpoint, OpenBuffered, OutputFile, ParseTable, PeekLines, PropertyFile, ReadLinesBackward, REGIONS, SearchBackward, StripCompressionExtension
+from extraction_specs import Columns, ExtractionSpec, Floats, FortranFloats, Integers, RunExtractionSpecs, Scaled
+from extraction_log import Log, MISSING, SAVED, SKIPPED, UNKNOWN_FORMAT, WARNING
 
-def Forward_search_last(file: str, text: str, error: str, quiet: bool = False) -> int:
+def _LogMissing(file: OutputFile, error: str, quiet: bool) -> str:
+    if not quiet:
+        Log(f'No {error} could be found in {file}', MISSING, error, file)
+    return 'NaN'
+
+def Forward_search_last(file: Union[str, OutputFile], text: str, error: str, quiet: bool = False) -> int:
     """Searches from the beggining of the file given to the end where it returns the linenumber of the last occurence
 
     Args:
-        file (str): The file to search in
-        text (str): The text string to search for
+        file (str, OutputFile): The file to search in. Either a filename or an already read OutputFile
+        text (str): The text string to search for. Plain text or a grep style regular expression
         error (str): If no occurences were found it will print 'No [error] could be found in [file]
         err (bool, optional): Whether or not to print error message if no occurences are found. Defaults to True.
 
     Returns:
         (int): Linenumber of last occurence
     """
-    ps1 = subprocess.run(['grep', '-nT', text, file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out = subprocess.run(['tail', '-n1'], input=ps1.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    res = out.stdout
-    if len(res) == 0:
-        if not quiet:
-            with open("collect_data.log", "a") as logfile:
-                logfile.write(f'No {error} could be found in {file}\n')
-        return 'NaN'
-    res = res.split()[0]
-    res = str(res).split(':')
-    return int(res[0].replace('b\'','').replace('\'','')) - 1
-
-def Forward_search_after_last(file: str, text1: str, text2: str, lines: int, error: str, quiet: bool = False) -> int:
+    if isinstance(file, str):
+        file = OutputFile(file)
+    linenumber = file.FindLast(text)
+    if linenumber is None:
+        return _LogMissing(file, error, quiet)
+    return linenumber
+
+def Forward_search_after_last(file: Union[str, OutputFile], text1: str, text2: str, lines: int, error: str, quiet: bool = False) -> int:
     """Searches from beggining of file for last occurence of [text1] and in the following [lines] after for [text2]
 
     Args:
-        file (str): File to search in
+        file (str, OutputFile): File to search in. Either a filename or an already read OutputFile
         text1 (str): From the last occurence of this this function will search
         text2 (str): This is what will be found in the lines following [text1]
         lines (int): How many lines after [text1] should the function search for [text2]
@@ -42,24 +50,18 @@ def Forward_search_after_last(file: str, text1: str, text2: str, lines: int, err
     Returns:
         (int): Linenumber of [text2] occurence
     """
-    ps1 = subprocess.run(['grep', '-nTA', f'{lines}', text1, file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    ps2 = subprocess.run(['tail', '-n', f'{lines + 1}'], input=ps1.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out = subprocess.run(['grep', text2], input=ps2.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    res = out.stdout
-    if len(res) == 0:
-        if not quiet:
-            with open("collect_data.log", "a") as logfile:
-                logfile.write(f'No {error} could be found in {file}\n')
-        return 'NaN'
-    res = res.split()[0]
-    res = str(res).split('-')
-    return int(res[0].replace('b\'','').replace('\'','')) - 1
-
-def Backward_search_last(file: str, text: str, filelength: int, error: str, quiet: bool = False) -> int:
+    if isinstance(file, str):
+        file = OutputFile(file)
+    linenumber = file.FindAfterLast(text1, text2, lines)
+    if linenumber is None:
+        return _LogMissing(file, error, quiet)
+    return linenumber
+
+def Backward_search_last(file: Union[str, OutputFile], text: str, filelength: int, error: str, quiet: bool = False) -> int:
     """Finds the last occurence of a text string in a file by searching from the end
 
     Args:
-        file (str): File to search in
+        file (str, OutputFile): File to search in. Either a filename or an already read OutputFile
         text (str): Text string to look for
         filelength (int): The length of the file
         error (str): If no occurences were fount it will print 'No [error] could be found in [file]
@@ -68,23 +70,23 @@ def Backward_search_last(file: str, text: str, filelength: int, error: str, quie
     Returns:
         (int): Linenumber of last occurence
     """
-    ps1 = subprocess.run(['tac', file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out = subprocess.run(['grep', '-nTm1', text], input=ps1.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    res = out.stdout
-    if len(res) == 0:
-        if not quiet:
-            with open("collect_data.log", "a") as logfile:
-                logfile.write(f'No {error} could be found in {file}\n')
-        return 'NaN'
-    res = res.split()[0]
-    res = str(res).split(':')
-    return filelength - int(res[0].replace('b\'','').replace('\'',''))
-
-def Forward_search_first(file: str, text: str, error: str, quiet: bool = False) -> int:
+    if isinstance(file, str):
+        # Only the end of the file is read, until the first occurence from the end is found
+        found = SearchBackward(file, text)
+        if found is None:
+            return _LogMissing(file, error, quiet)
+        return filelength - found[0]
+    linenumber = file.FindLast(text)
+    if linenumber is None:
+        return _LogMissing(file, error, quiet)
+    # The linenumber is counted from the end of the file, as was done when searching through the reversed file
+    return filelength - (len(file) - linenumber)
+
+def Forward_search_first(file: Union[str, OutputFile], text: str, error: str, quiet: bool = False) -> int:
     """Searches from beginning of file and finds the first occurence of [text]
 
     Args:
-        file (str): File to search in
+        file (str, OutputFile): File to search in. Either a filename or an already read OutputFile
         text (str): Text to look for
         error (str): If no occurences were found it will print 'No [error] could be found in [file]
         err (bool, optional): Whether or not to print error message if no occurences are found. Defaults to True.. Defaults to True.
@@ -92,22 +94,18 @@ def Forward_search_first(file: str, text: str, error: str, quiet: bool = False)
     Returns:
         (int): Linenumber of first occurence
     """
-    out = subprocess.run(['grep', '-nTm1', text, file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    res = out.stdout
-    if len(res) == 0:
-        if not quiet:
-            with open("collect_data.log", "a") as logfile:
-                logfile.write(f'No {error} could be found in {file}\n')
-        return 'NaN'
-    res = res.split()[0]
-    res = str(res).split(':')
-    return int(res[0].replace('b\'','').replace('\'','')) - 1
-
-def Forward_search_all(file: str, text: str, error: str, quiet: bool = False) -> list:
+    if isinstance(file, str):
+        file = OutputFile(file)
+    linenumber = file.FindFirst(text)
+    if linenumber is None:
+        return _LogMissing(file, error, quiet)
+    return linenumber
+
+def Forward_search_all(file: Union[str, OutputFile], text: str, error: str, quiet: bool = False) -> list:
     """Searches from beggining of file to end of file finding all occurences of [text]
 
     Args:
-        file (str): File to search in
+        file (str, OutputFile): File to search in. Either a filename or an already read OutputFile
         text (str): Text to look for
         error (str): If no occurences were found it will print 'No [error] could be found in [file]
         err (bool, optional): Whether or not to print error message if no occurences are found. Defaults to True.. Defaults to True.
@@ -115,16 +113,12 @@ def Forward_search_all(file: str, text: str, error: str, quiet: bool = False) ->
     Returns:
         (list): List of the linenumbers of all occurences
     """
-    ps1 = subprocess.run(['grep', '-nT', text, file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out = subprocess.run(['awk', '{print $1}'], input=ps1.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    res = out.stdout
-    if len(res) == 0:
-        if not quiet:
-            with open("collect_data.log", "a") as logfile:
-                logfile.write(f'No {error} could be found in {file}\n')
-        return 'NaN'
-    res = str(res).split('\\n')
-    return [int(val.replace('b\'','').replace('\'','').replace(':','')) - 1 for val in res[:-1]]
+    if isinstance(file, str):
+        file = OutputFile(file)
+    linenumbers = file.FindAll(text)
+    if len(linenumbers) == 0:
+        return _LogMissing(file, error, quiet)
+    return linenumbers
 
 def CheckForOnlyNans(array: list) -> bool:
     """Function for checking if an array is fille only with the value 'NaN'
@@ -149,249 +143,665 @@ def WriteToFile(filename : str, lines : list) -> None:
     with open(filename,'w') as wrt:
         wrt.writelines(lines)
 
-def GenerateXYZ(lines : list, filename : str , start : int, end : int, lab_loc : int, transform : bool = False) -> None:
+def GenerateXYZ(file : OutputFile, filename : str , start : int, end : int, lab_loc : int, transform : bool = False) -> None:
     """ Function for generating and writing out XYZ file from imput
 
     Args:
-        lines (list): Lines in an input file
+        file (OutputFile): The input file
         filename (str): Filename for geometry file
         start, end (int): Starting and ending linenumber of the final geometry in the file
         lab_loc (int): Location of label in line
         transform (bool): Transforms atomic number into label, if needed
     """
+    # The coordinates are written as they are in the input file, so they are not converted to floats
+    table = ParseTable(file.Block(start, end), [lab_loc, -3, -2, -1], dtype=str)
+    labels = table[:, 0]
+    if transform:
+        atoms = {number: AtomicInformation(int(number)).atom for number in set(labels)}
+        labels = [atoms[number] for number in labels]
     lines_to_add = []
     lines_to_add.append(str(end-(start))+ '\n')
     lines_to_add.append('\n')
-    for line in lines[start:end]:
-        words = line.split()
-        if transform:
-            atm = AtomicInformation(int(words[lab_loc]))
-            lines_to_add.append(''.join([atm.atom.ljust(2),' ',words[-3].rjust(10),' ', words[-2].rjust(15), ' ',words[-1].rjust(15) ,'\n']))
-        else:
-            lines_to_add.append(''.join([words[lab_loc].ljust(2),' ',words[-3].rjust(10),' ', words[-2].rjust(15), ' ',words[-1].rjust(15) ,'\n']))
+    for label, (x, y, z) in zip(labels, table[:, 1:]):
+        lines_to_add.append(''.join([label.ljust(2),' ',x.rjust(10),' ', y.rjust(15), ' ',z.rjust(15) ,'\n']))
     WriteToFile(filename,lines_to_add)
 
+# Formats optimization trajectories can be saved in by WriteTrajectory
+TRAJECTORY_FORMATS = ('xyz', 'npz')
 
-class OutputType:
-    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15):
-        self.filename = filename
+# Attributes set by the _Trajectory methods of the extraction classes
+TRAJECTORY_ATTRIBUTES = ['trajectory', 'trajectory_labels', 'trajectory_energies', 'trajectory_convergence', 'trajectory_converged']
 
-        with open(self.filename,'r') as read:
-            lines = read.readlines()[:100]
+# Attributes set by the _SCF_Convergence methods of the extraction classes
+SCF_ATTRIBUTES = ['scf_energies', 'scf_deltas', 'scf_iterations', 'scf_cycles']
 
-        AMS = False
-        for line in lines:
-            if "Amsterdam Modeling Suite (AMS)" in line:
-                AMS = True
+# Attributes set by the _Polarizability_Tensors methods of the extraction classes
+POLARIZABILITY_ATTRIBUTES = ['polarizability_tensors', 'polarizability_frequencies']
 
-        # The output file is determined to be of one of the following types
+# Attributes set by the _Excited_States methods of the extraction classes
+EXCITED_STATE_ATTRIBUTES = ['exc_energies', 'osc_strengths', 'transition_moments', 'exc_symmetries']
 
-        # File type = ORCA
-        if '* O   R   C   A *' in lines[4]:
-            self.extract = OrcaExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'ORCA'
+def LastBefore(occurences: List[int], steps: List[int], after: List[int] = None) -> List[Union[int, None]]:
+    """Finds the last of [occurences] before every step of an optimization
 
-        # File type = DALTON
-        elif '*************** Dalton - An Electronic Structure Program ***************' in lines[3]:
-            self.extract = DaltonExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'DALTON'
+    Args:
+        occurences (List[int]): Linenumbers in increasing order, e.g. from OutputFile.FindAll
+        steps (List[int]): Linenumbers of the steps in increasing order
+        after (List[int], optional): For every step, the linenumber the occurence must come after. Defaults to None.
 
-        # File type = GAUSSIAN
-        elif 'Gaussian, Inc.  All Rights Reserved.' in lines[6]:
-            self.extract = GaussianExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'GAUSSIAN'
+    Returns:
+        (List[Union[int, None]]): The linenumber of the occurence for every step. None where there is none
+    """
+    found = []
+    for step, index in enumerate(np.searchsorted(occurences, steps) - 1):
+        if index < 0 or (after is not None and occurences[index] < after[step]):
+            found.append(None)
+        else:
+            found.append(occurences[index])
+    return found
 
-        # File type = LSDALTON
-        elif '**********  LSDalton - An electronic structure program  **********' in lines[2]:
-            self.extract = LSDaltonExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'LSDALTON'
+def StepEnergies(file: OutputFile, steps: List[int], geometries: List[int], alternatives: List[Tuple[str, int]]) -> np.ndarray:
+    """Reads the energy of every step of an optimization, which is the last energy printed between the geometry of the step and the step
 
-        # File type = VELOXCHEM
-        elif 'VELOXCHEM' in lines[2]:
-            self.extract = VeloxExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'VELOXCHEM'
+    Args:
+        file (OutputFile): The output file
+        steps (List[int]): Linenumbers of the steps
+        geometries (List[int]): Linenumbers of the geometries of the steps
+        alternatives (List[Tuple[str, int]]): Anchor and column of the lines energies are printed in. Earlier alternatives are used over later ones, so the highest level of theory should come first
 
+    Returns:
+        (np.ndarray): The energy of every step. NaN for steps where none were found
+    """
+    energies = np.full(len(steps), np.nan)
+    for anchor, column in reversed(alternatives):
+        for step, linenumber in enumerate(LastBefore(file.FindAll(anchor), steps, geometries)):
+            if linenumber is not None:
+                energies[step] = float(file.lines[linenumber].split()[column].replace('D', 'E'))
+    return energies
 
+def ReadSCFConvergence(extract, start: str, end: str, pattern: bytes, column: int) -> None:
+    """Reads the energy of every iteration of every SCF in the file of [extract] and sets the attributes of SCF_ATTRIBUTES
 
-        # File type = AMS
-        elif AMS:
-            self.extract = AMSExtract(self.filename, Quiet=Quiet, Temperature=Temperature)
-            self.input = 'Amsterdam Modeling Suite'
+    Only the lines from the start of every SCF to the line it converged in are searched, with a single regular expression per SCF
 
+    Args:
+        extract: Extraction class, e.g. OrcaExtract, with the attributes file, lines and quiet
+        start (str): Anchor of a line before the iterations of an SCF
+        end (str): Anchor of the line the SCF is reported to have converged in, which also holds the amount of iterations
+        pattern (bytes): Regular expression matching an iteration, capturing its energy
+        column (int): Column of the amount of iterations in the line of [end]
+    """
+    ends = extract.file.FindAll(end)
+    if len(ends) == 0:
+        missing = _LogMissing(extract.file, 'SCF iterations', extract.quiet)
+        for attribute in SCF_ATTRIBUTES:
+            setattr(extract, attribute, missing)
+        return
+    # The iterations of an SCF are printed after the previous SCF has converged
+    starts = LastBefore(extract.file.FindAll(start), ends, [0] + ends[:-1])
+    extract.scf_energies = []
+    for first, last in zip(starts, ends):
+        iterations = re.findall(pattern, extract.file.Block(first, last), re.MULTILINE) if first is not None else []
+        extract.scf_energies.append(np.array(iterations).astype(float))
+    # The first iteration of every SCF has no change in energy
+    extract.scf_deltas = [np.diff(energies, prepend=np.nan) for energies in extract.scf_energies]
+    extract.scf_iterations = np.array([int(extract.lines[linenumber].split()[column]) for linenumber in ends])
+    extract.scf_cycles = int(extract.scf_iterations.sum())
+
+def ReadNormConvergence(extract) -> None:
+    """Reads the norm of the gradient and the step at every step of a geometry optimization by Dalton or LSDalton, and sets opt_convergence and opt_steps
 
-        # File type not implemented
-        else:
+    Args:
+        extract: Extraction class, e.g. DaltonExtract, with the attributes file and lines
+    """
+    steps = extract.file.FindAll('Norm of gradient')
+    extract.opt_convergence = np.full((len(steps), len(extract.convergence_criteria)), np.nan)
+    for i, linenumber in enumerate(steps):
+        extract.opt_convergence[i, 0] = float(extract.lines[linenumber].split()[-1])
+        if 'Norm of step' in extract.lines[linenumber+1]:
+            extract.opt_convergence[i, 1] = float(extract.lines[linenumber+1].split()[-1])
+    extract.opt_steps = len(steps)
+
+def WriteTrajectory(filename: str, values: Dict[str, object], format: str = 'xyz') -> str:
+    """Saves an optimization trajectory extracted by a _Trajectory method
+
+    With 'xyz' every step is a frame of a multi-frame xyz file with the energy of the step in its comment line. With 'npz' the attributes of TRAJECTORY_ATTRIBUTES are saved as arrays of a numpy archive
+
+    Args:
+        filename (str): The output file the trajectory was extracted from
+        values (Dict[str, object]): The attributes of TRAJECTORY_ATTRIBUTES
+        format (str, optional): One of TRAJECTORY_FORMATS. Defaults to 'xyz'.
+
+    Raises:
+        ValueError: If [format] is not one of TRAJECTORY_FORMATS
+
+    Returns:
+        (str): Name of the file the trajectory was saved in
+    """
+    if format not in TRAJECTORY_FORMATS:
+        raise ValueError(f'format must be one of {TRAJECTORY_FORMATS}, not {format}')
+    TrajectoryFilename = StripCompressionExtension(filename)[:-4] + f"_traj.{format}"
+    if format == 'npz':
+        np.savez(TrajectoryFilename, **{key: np.asarray(values[key]) for key in TRAJECTORY_ATTRIBUTES})
+        return TrajectoryFilename
+    labels = values['trajectory_labels']
+    lines_to_add = []
+    for step, (coordinates, energy) in enumerate(zip(values['trajectory'], values['trajectory_energies']), start=1):
+        lines_to_add.append(f'{len(labels)}\n')
+        lines_to_add.append(f'Step {step} Energy = {energy}\n')
+        for label, (x, y, z) in zip(labels, coordinates):
+            lines_to_add.append(''.join([label.ljust(2),' ', f"{x:.7f}".rjust(20),' ', f"{y:.7f}".rjust(25),' ', f"{z:.7f}".rjust(25), '\n']))
+    WriteToFile(TrajectoryFilename, lines_to_add)
+    return TrajectoryFilename
+
+def DiagonalizeTensors(tensors: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Diagonalizes stacks of symmetric 3x3 tensors, e.g. the polarizability tensors of every frequency of several files, with a single call to np.linalg.eigh
+
+    As with np.linalg.eigh only the lower triangle of every tensor is used
+
+    Args:
+        tensors (List[np.ndarray]): Stacks of tensors, each of shape (n, 3, 3). The stacks may be of different lengths
+
+    Returns:
+        (List[Tuple[np.ndarray, np.ndarray]]): The eigenvalues, of shape (n, 3), and eigenvectors, of shape (n, 3, 3), of every stack. The eigenvalues are in ascending order
+    """
+    tensors = [np.asarray(stack, dtype=float).reshape(-1, 3, 3) for stack in tensors]
+    sizes = [len(stack) for stack in tensors]
+    if sum(sizes) == 0:
+        return [(np.empty((0, 3)), np.empty((0, 3, 3))) for _ in tensors]
+    eigenvalues, eigenvectors = np.linalg.eigh(np.concatenate(tensors))
+    splits = np.cumsum(sizes)[:-1]
+    return list(zip(np.split(eigenvalues, splits), np.split(eigenvectors, splits)))
+
+# Extensions of the formatted checkpoint files looked for next to Gaussian output files, see SiblingFchk
+FCHK_EXTENSIONS = ('.fchk', '.fch')
+
+def SiblingFchk(filename: str) -> Union[str, None]:
+    """Finds the formatted checkpoint file next to a Gaussian output file, e.g. water.fchk for water.log or water.out.gz
+
+    Args:
+        filename (str): The Gaussian output file
+
+    Returns:
+        (str, None): The formatted checkpoint file. None if there is none
+    """
+    root = os.path.splitext(StripCompressionExtension(filename))[0]
+    for extension in FCHK_EXTENSIONS:
+        if os.path.isfile(root + extension):
+            return root + extension
+    return None
+
+# Names of the property files written by ORCA next to the output file, e.g. water_property.txt for water.out. Newer versions can also write the properties as JSON
+PROPERTY_FILE_SUFFIXES = ('_property.txt', '.property.json')
+
+def SiblingPropertyFile(filename: str) -> Union[str, None]:
+    """Finds the property file next to an ORCA output file, e.g. water_property.txt for water.out or water.out.gz
+
+    Property files older than the output file are not used, as they were left by an earlier calculation
+
+    Args:
+        filename (str): The ORCA output file
+
+    Returns:
+        (str, None): The property file. None if there is none newer than the output file
+    """
+    root = os.path.splitext(StripCompressionExtension(filename))[0]
+    for suffix in PROPERTY_FILE_SUFFIXES:
+        if os.path.isfile(root + suffix) and os.path.getmtime(root + suffix) >= os.path.getmtime(filename):
+            return root + suffix
+    return None
+
+def MassWeightedHessian(hessian: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """Builds the mass-weighted Hessian from the lower triangle of a Cartesian Hessian, as stored in formatted checkpoint files
+
+    Args:
+        hessian (np.ndarray): The lower triangle of the Hessian in Hartree/bohr^2, row by row
+        masses (np.ndarray): The masses of the atoms in electron masses
+
+    Returns:
+        (np.ndarray): The mass-weighted Hessian of shape (3N, 3N)
+    """
+    size = 3 * len(masses)
+    full = np.zeros((size, size))
+    full[np.tril_indices(size)] = hessian
+    full = full + full.T - np.diag(full.diagonal())
+    weights = np.repeat(1 / np.sqrt(masses), 3)
+    return full * weights[:, None] * weights[None, :]
+
+def HarmonicFrequencies(hessian: np.ndarray, coordinates: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """Calculates the harmonic frequencies of a molecule from its Cartesian Hessian
+
+    Translations and rotations are projected out of the mass-weighted Hessian before it is diagonalized, so 3N-6 frequencies are given, or 3N-5 for linear molecules
+
+    Args:
+        hessian (np.ndarray): The lower triangle of the Hessian in Hartree/bohr^2, row by row
+        coordinates (np.ndarray): The coordinates of the atoms in bohr, of shape (N, 3)
+        masses (np.ndarray): The masses of the atoms in electron masses
+
+    Returns:
+        (np.ndarray): The frequencies in atomic units in ascending order. Imaginary frequencies are given as negative frequencies
+    """
+    coordinates = coordinates - masses @ coordinates / masses.sum()
+    weights = np.sqrt(masses)[:, None]
+    # Mass-weighted displacements of the translations and of the rotations around the center of mass
+    external = [(np.eye(3)[axis] * weights).ravel() for axis in range(3)]
+    external += [(np.cross(np.eye(3)[axis], coordinates) * weights).ravel() for axis in range(3)]
+    vectors, values, _ = np.linalg.svd(np.array(external).T)
+    # Linear molecules only have two rotations
+    basis = vectors[:, np.count_nonzero(values > 1E-6 * values.max()):]
+    eigenvalues = np.linalg.eigvalsh(basis.T @ MassWeightedHessian(hessian, masses) @ basis)
+    return np.sign(eigenvalues) * np.sqrt(np.abs(eigenvalues))
+
+def RotationalConstantsFromGeometry(coordinates: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """Calculates the rotational constants of a molecule from its geometry
+
+    Args:
+        coordinates (np.ndarray): The coordinates of the atoms in bohr, of shape (N, 3)
+        masses (np.ndarray): The masses of the atoms in electron masses
+
+    Returns:
+        (np.ndarray): The rotational constants in GHz in descending order. Linear molecules only have one
+    """
+    coordinates = coordinates - masses @ coordinates / masses.sum()
+    second_moments = np.einsum('i,ij,ik->jk', masses, coordinates, coordinates)
+    moments = np.linalg.eigvalsh(np.trace(second_moments) * np.eye(3) - second_moments)
+    moments = moments[moments > 1E-6 * moments.max()]
+    return Constants().au_to_ghz / (2 * moments)
+
+
+def Requires(*methods: str):
+    """Declares which methods of an extraction class a method always uses the values of. When the method is run, these are run first by Resolve
+
+    Methods only needed in some cases are resolved inside the method instead, e.g. Resolve(self, ['_Mass'])
+
+    Args:
+        methods (str): Names of the required methods, e.g. '_Frequencies'
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self) -> None:
+            Resolve(self, methods)
+            method(self)
+        wrapper.requires = methods
+        return wrapper
+    return decorator
+
+def Resolve(extract, methods: Iterable[str]) -> List[str]:
+    """Runs [methods] of [extract] together with the methods they require, see Requires
+
+    Every method is only run once for each instance of the extraction class, no matter how many other methods require it. Methods described by extraction specs are extracted together in a single pass through the file
+
+    Args:
+        extract: Extraction class, e.g. GaussianExtract
+        methods (Iterable[str]): Methods to run, e.g. ['_Gibbs', '_Dipole_moments']
+
+    Returns:
+        (List[str]): The methods of [methods] that have not been implemented for [extract]
+    """
+    resolved = extract.__dict__.setdefault('resolved', set())
+
+    # The methods are ordered so every method comes after those it requires
+    order = []
+    def Visit(method: str) -> None:
+        if method in resolved or method in order or not hasattr(extract, method):
+            return
+        for required in getattr(getattr(type(extract), method), 'requires', ()):
+            Visit(required)
+        order.append(method)
+    for method in methods:
+        Visit(method)
+
+    resolved.update(RunExtractionSpecs(extract, order))
+    for method in order:
+        if method not in resolved:
+            getattr(extract, method)()
+            resolved.add(method)
+
+    return [method for method in methods if not hasattr(extract, method)]
+
+def Plan(extract: type, methods: Iterable[str]) -> Dict[str, List[str]]:
+    """Decides which region of an output file [methods] are read from, using the regions of the extraction class
+
+    A method is only read from a region if all the methods it requires are printed in the same region
+
+    Args:
+        extract (type): Extraction class, e.g. GaussianExtract
+        methods (Iterable[str]): Methods to run, e.g. ['_Energy', '_CPUS']
+
+    Returns:
+        (Dict[str, List[str]]): The methods read from each of REGIONS, and from the whole file under 'full'. Methods that have not been implemented are left out
+    """
+    regions = getattr(extract, 'regions', dict())
+
+    def Region(method: str) -> str:
+        region = regions.get(method, 'full')
+        for required in getattr(getattr(extract, method), 'requires', ()):
+            if Region(required) != region:
+                return 'full'
+        return region
+
+    plan = {region: [] for region in REGIONS + ('full',)}
+    for method in dict.fromkeys(methods):
+        if hasattr(extract, method):
+            plan[Region(method)].append(method)
+    return plan
+
+def Found(extract, method: str, values: Dict[str, object]) -> bool:
+    """Checks whether the values extracted by [method] were found, or are the values given when they could not be found
+
+    Args:
+        extract: Extraction class, e.g. GaussianExtract
+        method (str): The method that extracted the values
+        values (Dict[str, object]): The extracted values by attribute name
+
+    Returns:
+        (bool): False if any of the values is 'NaN', ['NaN'] or the default of the specs of [method]
+    """
+    missing = ['NaN', ['NaN']]
+    specs = getattr(extract, 'specs', dict())
+    if method in specs:
+        missing += [spec.default for spec in specs[method]]
+    return not any(type(value) is type(default) and value == default for value in values.values() for default in missing)
+
+def JobSegments(file: OutputFile, anchor: str) -> List[Tuple[int, int]]:
+    """Splits an output file of chained jobs into the line ranges of the jobs
+
+    Args:
+        file (OutputFile): The output file. If [anchor] is in its index the file is not searched again
+        anchor (str): Line starting every job after the first. If None the whole file is one job
+
+    Returns:
+        (List[Tuple[int, int]]): First linenumber and the linenumber after the last line of every job
+    """
+    starts = [0]
+    if anchor is not None:
+        starts += [linenumber for linenumber in file.FindAll(anchor) if linenumber > 0]
+    return list(zip(starts, starts[1:] + [len(file)]))
+
+def SplitJobs(extract) -> list:
+    """Gives an extraction class for every job in the output file of [extract], using the job_anchor of the extraction class
+
+    Every job is extracted independently of the others, as if it had been written to a file of its own. The file is not read again
+
+    Args:
+        extract: Extraction class, e.g. OrcaExtract. Values already extracted with it are not given to the jobs
+
+    Returns:
+        (list): One extraction class of the same type as [extract] per job, in the order the jobs were run
+    """
+    if not hasattr(extract, 'file'):
+        return [extract]
+    jobs = []
+    for start, stop in JobSegments(extract.file, getattr(extract, 'job_anchor', None)):
+        # Every job starts from the attributes set when the extraction class was created, so no extracted values are carried over
+        job = copy.copy(extract)
+        job.__dict__ = dict(extract.initial)
+        job.file = extract.file.Segment(start, stop)
+        job.lines = job.file.lines
+        job.end = len(job.lines)
+        job.initial = dict(job.__dict__)
+        jobs.append(job)
+    return jobs
+
+
+# The program that wrote an output file is determined from at most this many lines at its start
+FORMAT_DETECTION_LINES = 100
+
+# and at most this many bytes, so only the start of the file is read to determine it
+FORMAT_DETECTION_BYTES = 32 * 1024
+
+class OutputFormat:
+    """Signature identifying the program that wrote an output file
+
+    Args:
+        name (str): Name of the program
+        extract (type): Extraction class for output files of the program
+        text (str): Text printed in the header of the output files
+        linenumber (int, optional): Line the text is printed on. Defaults to None, which means any of the first FORMAT_DETECTION_LINES lines.
+    """
+    def __init__(self, name: str, extract: type, text: str, linenumber: int = None) -> None:
+        self.name = name
+        self.extract = extract
+        self.text = text
+        self.linenumber = linenumber
+
+    def Matches(self, lines: List[str]) -> bool:
+        if self.linenumber is None:
+            return any(self.text in line for line in lines)
+        return self.linenumber < len(lines) and self.text in lines[self.linenumber]
+
+def DetectOutputFormat(lines: List[str]) -> Tuple[type, str]:
+    """Determines which program wrote an output file from the first lines of the file, using the signatures in OUTPUT_FORMATS
+
+    Args:
+        lines (List[str]): The first FORMAT_DETECTION_LINES lines of the output file
+
+    Returns:
+        (Tuple[type, str]): The extraction class for the output file and the name of the program. (UnknownExtract, 'Unknown') if the program could not be determined
+    """
+    for signature in OUTPUT_FORMATS:
+        if signature.Matches(lines):
+            return signature.extract, signature.name
+    return UnknownExtract, 'Unknown'
+
+# Statuses of jobs. A job without a termination line is running if its output file has changed recently, and incomplete, e.g. killed by the queueing system, if not
+JOB_STATUSES = ('normal', 'error', 'running', 'incomplete', 'unknown')
+
+# Extensions of the output files looked for in directories. Compressed output files are found as well
+OUTPUT_EXTENSIONS = ('.out', '.log')
+
+# Amount of lines at the end of an output file searched for the termination lines of the program
+STATUS_LINES = 50
+
+# Amount of bytes read at a time from the end of an output file when its status is determined
+STATUS_BLOCK_SIZE = 16 * 1024
+
+# Jobs without a termination line whose output file has changed within this many seconds are taken to be running
+RUNNING_AGE = 60 * 60
+
+def JobStatus(filename: str, running_age: float = RUNNING_AGE) -> Tuple[str, str, str]:
+    """Determines whether the job of an output file terminated normally, terminated with an error or is still running, using the termination lines of the extraction classes
+
+    Only the start of the file, to determine the program, and its last STATUS_LINES lines are read, so the status of a file is found in the same time no matter its size
+
+    Args:
+        filename (str): The output file
+        running_age (float, optional): Jobs without a termination line whose output file has changed within this many seconds are running. Defaults to RUNNING_AGE.
+
+    Returns:
+        (Tuple[str, str, str]): The name of the program, the status, which is one of JOB_STATUSES, and the termination line. The line is empty if none was found
+    """
+    with OpenBuffered(filename, FORMAT_DETECTION_BYTES) as stream:
+        extract, program = DetectOutputFormat(PeekLines(stream, FORMAT_DETECTION_BYTES, FORMAT_DETECTION_LINES))
+    if extract is UnknownExtract:
+        return program, 'unknown', ''
+
+    # The termination line closest to the end decides the status, e.g. of the last job of chained jobs
+    signatures = [(status, text.encode()) for status, texts in extract.termination.items() for text in texts]
+    for line in islice(ReadLinesBackward(filename, STATUS_BLOCK_SIZE), STATUS_LINES):
+        for status, text in signatures:
+            if text in line:
+                return program, status, line.decode('utf-8', errors='replace').strip()
+    if time.time() - os.path.getmtime(filename) < running_age:
+        return program, 'running', ''
+    return program, 'incomplete', ''
+
+
+class OutputType:
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Methods: Iterable[str] = None, Fchk: bool = True, Properties: bool = True):
+        self.filename = filename
+
+        # The file is opened once. Only its start is read here, and the extraction class reads the rest from the same stream
+        stream = OpenBuffered(self.filename, FORMAT_DETECTION_BYTES)
+
+        extract, self.input = DetectOutputFormat(PeekLines(stream, FORMAT_DETECTION_BYTES, FORMAT_DETECTION_LINES))
+
+        if extract is UnknownExtract:
+            stream.close()
             self.extract = UnknownExtract()
-            self.input = 'Unknown'
             if not Quiet:
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"The output file {self.filename} is not of a known format\n")
+                Log(f"The output file {self.filename} is not of a known format", UNKNOWN_FORMAT, file=self.filename)
+        elif extract is GaussianExtract and Fchk and SiblingFchk(self.filename) is not None:
+            # The formatted checkpoint file is read instead of the output file where possible, see GaussianFchkExtract
+            self.extract = GaussianFchkExtract(self.filename, Quiet=Quiet, Temperature=Temperature, Stream=stream)
+        elif extract is OrcaExtract and Properties and SiblingPropertyFile(self.filename) is not None:
+            # The property file is read instead of the output file where possible, see OrcaPropertyExtract
+            self.extract = OrcaPropertyExtract(self.filename, Quiet=Quiet, Temperature=Temperature, Stream=stream)
+        elif Methods is not None and Compression(self.filename) is None:
+            self.extract = self._ReadPlanned(extract, Methods, stream, Quiet, Temperature)
+        else:
+            self.extract = extract(self.filename, Quiet=Quiet, Temperature=Temperature, Stream=stream)
+
+    def _ReadPlanned(self, extract: type, methods: Iterable[str], stream: BinaryIO, Quiet: bool, Temperature: float):
+        """Runs [methods] while reading as little of the file as possible, see Plan
+
+        Methods printed near the start or end of the file are run on only that region of the file. If their values are not found there, they are run again on the whole file
+
+        Returns:
+            The extraction class with [methods] run. If the whole file was not needed, it only holds a region of the file, and the whole file is read by _ReadWhole when another method is run
+        """
+        plan = Plan(extract, methods)
+        missing = list(plan['full'])
+        found = dict()
+        resolved = set()
+        partial = None
+        for region in REGIONS:
+            if len(plan[region]) == 0:
+                continue
+            # Values that could not be found in the region are looked for in the whole file, where not finding them is logged
+            partial = extract(self.filename, Quiet=True, Temperature=Temperature, Stream=stream, Region=region)
+            stream = None
+            for method in plan[region]:
+                before = set(partial.__dict__)
+                before_resolved = set(partial.__dict__.get('resolved', ()))
+                Resolve(partial, [method])
+                values = {key: value for key, value in partial.__dict__.items() if key not in before and key != 'resolved'}
+                if partial.file.region is None or Found(partial, method, values):
+                    found.update(values)
+                    resolved |= partial.resolved - before_resolved
+                else:
+                    missing.append(method)
 
-    def getEnergy(self) -> float:
+        if partial is None or len(missing) > 0:
+            whole = extract(self.filename, Quiet=Quiet, Temperature=Temperature, Stream=stream)
+        else:
+            whole = partial
+            whole.quiet = Quiet
+        whole.__dict__.setdefault('resolved', set()).update(resolved)
+        for key, value in found.items():
+            setattr(whole, key, value)
+        Resolve(whole, missing)
+        return whole
+
+    def _ReadWhole(self) -> None:
+        """Reads the whole file if only a region of it has been read, keeping the values already extracted
+        """
+        partial = self.extract
+        if getattr(vars(partial).get('file'), 'region', None) is None:
+            return
+        self.extract = type(partial)(self.filename, Quiet=partial.quiet, Temperature=partial.T)
+        for key, value in partial.__dict__.items():
+            self.extract.__dict__.setdefault(key, value)
+
+    def Jobs(self) -> List['OutputType']:
+        """Splits an output file of chained jobs, e.g. ORCA $new_job or Gaussian --Link1-- jobs, into one OutputType per job, see SplitJobs
+
+        Returns:
+            (List[OutputType]): The jobs in the order they were run. A file of a single job gives a single OutputType
+        """
+        self._ReadWhole()
+        # A formatted checkpoint file only holds the last job, so the jobs are extracted from the output file. The same goes for property files
+        if isinstance(self.extract, GaussianFchkExtract):
+            self.extract = GaussianExtract(self.filename, Quiet=self.extract.quiet, Temperature=self.extract.T)
+        elif isinstance(self.extract, OrcaPropertyExtract):
+            self.extract = OrcaExtract(self.filename, Quiet=self.extract.quiet, Temperature=self.extract.T)
+        jobs = []
+        for extract in SplitJobs(self.extract):
+            job = copy.copy(self)
+            job.extract = extract
+            jobs.append(job)
+        return jobs
+
+    def _Get(self, method: str, *attributes: str):
+        """Runs [method] and the methods it requires, unless this has already been done, and gives the values of [attributes]
+
+        Returns:
+            The value of the attribute, or a list of the values if there are several. None if [method] has not been implemented
+        """
         try:
-            return self.extract.tot_energy
-        except AttributeError:
-            try:
-                self.extract._Energy()
-                return self.extract.tot_energy
-            except AttributeError: ...
+            if method not in self.extract.__dict__.get('resolved', ()):
+                self._ReadWhole()
+            if len(Resolve(self.extract, [method])) > 0:
+                return
+            values = [getattr(self.extract, attribute) for attribute in attributes]
+        except AttributeError: return
+        return values[0] if len(values) == 1 else values
+
+    def getEnergy(self) -> float:
+        return self._Get('_Energy', 'tot_energy')
 
     def getZeroPointVibrationalEnergy(self) -> float:
-        try:
-            return self.extract.zpv
-        except AttributeError:
-            try:
-                self.extract._ZPV()
-                return self.extract.zpv
-            except AttributeError: ...
+        return self._Get('_ZPV', 'zpv')
 
     def getEnthalpy(self) -> float:
-        try:
-            return self.extract.enthalpy
-        except AttributeError:
-            try:
-                self.extract.tot_energy
-            except AttributeError:
-                try:
-                    self.extract._Energy()
-                except AttributeError: return
-            try:
-                self.extract.freq
-            except AttributeError:
-                try:
-                    self.extract._Frequencies()
-                except AttributeError: return
-            try:
-                self.extract._Enthalpy()
-                return self.extract.enthalpy
-            except AttributeError: ...
+        return self._Get('_Enthalpy', 'enthalpy')
 
     def getEntropy(self) -> float:
-        try:
-            return self.entropy
-        except AttributeError:
-            try:
-                self.extract.freq
-            except AttributeError:
-                try:
-                    self.extract._Frequencies()
-                except AttributeError: return
-            try:
-                self.extract._Entropy()
-                return self.extract.entropy
-            except AttributeError: ...
+        return self._Get('_Entropy', 'entropy')
 
     def getGibbsFreeEnergy(self) -> float:
-        try:
-            return self.extract.gibbs
-        except AttributeError:
-            try:
-                self.extract.tot_energy
-            except AttributeError:
-                try:
-                    self.extract._Energy()
-                except AttributeError: return
-            try:
-                self.extract.freq
-            except AttributeError:
-                try:
-                    self.extract._Frequencies()
-                except AttributeError: return
-            try:
-                self.extract.enthalpy
-            except AttributeError:
-                try:
-                    self.extract._Enthalpy()
-                except AttributeError: return
-            try:
-                self.extract.entropy
-            except AttributeError:
-                try:
-                    self.extract._Entropy()
-                except AttributeError: return
-            try:
-                self.extract._Gibbs()
-                return self.extract.gibbs
-            except AttributeError: ...
+        return self._Get('_Gibbs', 'gibbs')
 
     def getDipoleMoment(self) -> List[float]:
-        try:
-            return [self.extract.dipolex, self.extract.dipoley, self.extract.dipolez, self.extract.total_dipole]
-        except AttributeError:
-            try:
-                self.extract._Dipole_moments()
-                return [self.extract.dipolex, self.extract.dipoley, self.extract.dipolez, self.extract.total_dipole]
-            except AttributeError: ...
+        return self._Get('_Dipole_moments', 'dipolex', 'dipoley', 'dipolez', 'total_dipole')
 
     def getPolarizability(self) -> List[float]:
-        try:
-            return [self.extract.polx, self.extract.poly, self.extract.polz, self.extract.iso_polar]
-        except AttributeError:
-            try:
-                self.extract._Polarizabilities()
-                return [self.extract.polx, self.extract.poly, self.extract.polz, self.extract.iso_polar]
-            except AttributeError: ...
+        return self._Get('_Polarizabilities', 'polx', 'poly', 'polz', 'iso_polar')
 
     def getExcitationEnergies(self) -> List[float]:
-        try:
-            return self.extract.exc_energies
-        except AttributeError:
-            try:
-                self.extract._Excitation_energies()
-                return self.extract.exc_energies
-            except AttributeError: ...
+        return self._Get('_Excitation_energies', 'exc_energies')
 
     def getOscillatorStrengths(self) -> List[float]:
-        try:
-            return self.extract.osc_strengths
-        except AttributeError:
-            try:
-                self.extract.exc_energies
-            except AttributeError:
-                try:
-                    self.extract._Excitation_energies()
-                except AttributeError: return
-            try:
-                self.extract._Oscillator_strengths()
-                return self.extract.osc_strengths
-            except AttributeError: ...
+        return self._Get('_Oscillator_strengths', 'osc_strengths')
 
     def getFrequencies(self) -> List[float]:
-        try:
-            return self.extract.freq
-        except AttributeError:
-            try:
-                self.extract._Frequencies()
-                return self.extract.freq
-            except AttributeError: ...
+        return self._Get('_Frequencies', 'freq')
 
     def getPartitionFunction(self) -> float:
-        try:
-            return self.extract.qTotal
-        except AttributeError:
-            try:
-                self.extract.freq
-            except AttributeError:
-                try:
-                    self.extract._Frequencies()
-                except AttributeError: return
-            try:
-                self.extract._PartitionFunctions()
-                return self.extract.qTotal
-            except AttributeError: ...
+        return self._Get('_PartitionFunctions', 'qTotal')
 
     def getCPUTime(self) -> List[float]:
-        try:
-            return [self.extract.total_cpu_time, self.extract.wall_cpu_time]
-        except AttributeError:
-            try:
-                self.extract._CPUS()
-                return [self.extract.total_cpu_time, self.extract.wall_cpu_time]
-            except AttributeError: ...
+        return self._Get('_CPUS', 'total_cpu_time', 'wall_cpu_time')
 
     def getOptimizedGeometry(self) -> None:
+        self._ReadWhole()
         self.extract._Optimized_Geometry()
 
+    def getTrajectory(self) -> List[object]:
+        return self._Get('_Trajectory', *TRAJECTORY_ATTRIBUTES)
+
+    def getSCFConvergence(self) -> List[object]:
+        return self._Get('_SCF_Convergence', *SCF_ATTRIBUTES)
+
+    def getOptimizationConvergence(self) -> List[object]:
+        return self._Get('_Optimization_Convergence', 'opt_convergence', 'opt_steps')
+
+    def getNormalModes(self) -> List[object]:
+        return self._Get('_Normal_Modes', 'normal_modes', 'ir_intensities', 'reduced_masses')
+
+    def getPolarizabilityTensors(self) -> List[object]:
+        return self._Get('_Polarizability_Tensors', *POLARIZABILITY_ATTRIBUTES)
+
+    def getExcitedStates(self) -> List[object]:
+        return self._Get('_Excited_States', *EXCITED_STATE_ATTRIBUTES)
+
+    def getStatus(self) -> str:
+        return JobStatus(self.filename)[1]
+
+    def getSources(self) -> Dict[str, str]:
+        # The file every extracted value was read from, by attribute name. Only recorded by extraction classes reading other files than the output file, e.g. OrcaPropertyExtract
+        return dict(getattr(self.extract, 'sources', dict()))
+
 
 class Constants:
     def __init__(self) -> None:
@@ -406,6 +816,20 @@ class Constants:
         self.au_to_kJmol = 2625.4996394799
         self.bohr_to_ao = 0.529177249
         self.debye_to_au = 0.393456
+        self.amu_to_me = 1822.888486209
+        self.au_to_ghz = 6.579683920502E+06
+
+
+def RotationalConstants(factor: float = 1.0):
+    """Conversion for an ExtractionSpec reading rotational constants, giving the non-zero constants as an array
+
+    Args:
+        factor (float, optional): Factor to convert the constants to GHz. Defaults to 1.0.
+    """
+    def conversion(values: list) -> list:
+        rots = np.array(Floats(values[0])) * factor
+        return [rots[rots != 0.0]]
+    return conversion
 
 
 class UnknownExtract:
@@ -413,51 +837,75 @@ class UnknownExtract:
 
 
 class VeloxExtract:
-    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        'Total Energy',
+        'Ground-State Dipole Moment',
+        'Polarizability (w=0.0000)',
+        'Polarizability (w=',
+        'Molecular Geometry'
+    )
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('**** Critical Error',), 'normal': ('VeloxChem execution completed',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Energy': [ExtractionSpec('Total Energy', ['tot_energy'], [(0, -2)], error='final energy')],
+        '_Dipole_moments': [ExtractionSpec('Ground-State Dipole Moment', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(3, -4), (4, -4), (5, -4), (6, -4)], error='dipole moment')],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_Energy': 'tail'}
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
 
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Total Energy', 'final energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-2])
-            return
-        self.tot_energy = 'NaN'
+        RunExtractionSpecs(self, ['_Energy'])
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Ground-State Dipole Moment', 'dipole moment', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            linenumber += 3
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber].split()[-4]), float(self.lines[linenumber+1].split()[-4]), float(self.lines[linenumber+2].split()[-4]), float(self.lines[linenumber+3].split()[-4])
-            return
-        self.dipolex, self.dipoley, self.dipolez, self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
-    #NB! Only static polarizability considered
     def _Polarizabilities(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Polarizability (w=0.0000)', 'polarizability', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, 'Polarizability (w=0.0000)', 'polarizability', quiet=self.quiet)
         if isinstance(linenumber, int):
             #Need to perform diagonalization
-            PolarizabilityTensor = np.array([[float(self.lines[linenumber+3].split()[1]), float(self.lines[linenumber+3].split()[2]), float(self.lines[linenumber+3].split()[3])],
-                                             [float(self.lines[linenumber+4].split()[1]), float(self.lines[linenumber+4].split()[2]), float(self.lines[linenumber+4].split()[3])],
-                                             [float(self.lines[linenumber+5].split()[1]), float(self.lines[linenumber+5].split()[2]), float(self.lines[linenumber+5].split()[3])]])
+            PolarizabilityTensor = ParseTable(self.file.Block(linenumber+3, linenumber+6), slice(1, 4))
             PolarizabilityEigenvalues = np.linalg.eigh(PolarizabilityTensor)[0]
             self.polx, self.poly, self.polz = PolarizabilityEigenvalues
             self.iso_polar = PolarizabilityEigenvalues.mean()
             return
         self.polx = self.poly = self.polz = self.iso_polar = 'NaN'
 
+    def _Polarizability_Tensors(self) -> None:
+        # The output of a calculation that is still running or was stopped may end in the last tensor, so only complete tensors are used
+        linenumbers = [i for i in self.file.FindAll('Polarizability (w=') if i + 5 < len(self.lines) and self.lines[i + 5].endswith('\n')]
+        if len(linenumbers) == 0:
+            missing = _LogMissing(self.file, 'polarizability tensors', self.quiet)
+            self.polarizability_tensors = self.polarizability_frequencies = missing
+            return
+        self.polarizability_frequencies = np.array([float(self.lines[i].split('w=')[1].split(')')[0]) for i in linenumbers])
+        #Offset for going into the tensors, which are parsed together
+        block = b''.join(self.file.Block(i+3, i+6) for i in linenumbers)
+        self.polarizability_tensors = ParseTable(block, slice(1, 4)).reshape(len(linenumbers), 3, 3)
+
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'Molecular Geometry', 'geometry', quiet=self.quiet)
+        start = Forward_search_last(self.file, 'Molecular Geometry', 'geometry', quiet=self.quiet)
         if start != "NaN":# and end != "NaN":
             start += 5
             for i, line in enumerate(self.lines[start:]):
@@ -467,44 +915,56 @@ class VeloxExtract:
             #Offset for going into actual coordinate list
             #Which position in the line is the atom label / number at
             label_location = 0
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
-            GenerateXYZ(self.lines, OptGeomFilename, start, end, label_location)
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
+            GenerateXYZ(self.file, OptGeomFilename, start, end, label_location)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
 
 
 class AMSExtract:
-    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        'Energy (hartree)',
+        'Dipole Moment',
+        'Formula:'
+    )
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('ABNORMAL TERMINATION', 'ERROR DETECTED'), 'normal': ('NORMAL TERMINATION',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Energy': [ExtractionSpec('Energy (hartree)', ['tot_energy'], [(0, -1)], error='final energy')],
+        '_Dipole_moments': [ExtractionSpec('Dipole Moment', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(3, -3), (3, -2), (3, -1), (4, -1)], conversion=Scaled(Constants().debye_to_au), error='dipole moment')],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_Energy': 'tail'}
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, "Energy (hartree)", "final energy", quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-1])
-            return
-        self.tot_energy = 'NaN'
+        RunExtractionSpecs(self, ['_Energy'])
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Dipole Moment', 'dipole moment', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            linenumber += 3
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber].split()[-3])*self.constants.debye_to_au, float(self.lines[linenumber].split()[-2])*self.constants.debye_to_au, float(self.lines[linenumber].split()[-1])*self.constants.debye_to_au, float(self.lines[linenumber+1].split()[-1])*self.constants.debye_to_au
-            return
-        self.dipolex, self.dipoley, self.dipolez, self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'Formula:', 'geometry', quiet=self.quiet)
+        start = Forward_search_last(self.file, 'Formula:', 'geometry', quiet=self.quiet)
         if start != "NaN":
             start += 3
             #Offset for going into actual coordinate list
@@ -514,30 +974,86 @@ class AMSExtract:
                     break
             #Which position in the line is the atom label / number at
             label_location = 1
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
-            GenerateXYZ(self.lines, OptGeomFilename, start, end, label_location)
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
+            GenerateXYZ(self.file, OptGeomFilename, start, end, label_location)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
 
 
 class GaussianExtract:
-    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        'Job cpu time:',
+        'Sum of electronic and zero-point Energies=',
+        'SCF Done:',
+        'Electric dipole moment (input orientation):',
+        'Dipole polarizability, Alpha (input orientation).',
+        'Frequencies --',
+        'Excitation energies and oscillator strengths:',
+        'Excited State',
+        'Rotational constants (GHZ):',
+        'Molecular mass',
+        'Rotational symmetry number',
+        'Multiplicity',
+        'Standard orientation',
+        'Link1:  Proceeding to internal job step number',
+        'Converged?',
+        'Cycle   1  Pass 1',
+        'EUMP2 =',
+        'E(Corr)=',
+        'CCSD(T)='
+    )
+
+    # Line starting every job after the first in output files of chained jobs, i.e. --Link1-- and compound jobs such as opt freq
+    job_anchor = 'Link1:  Proceeding to internal job step number'
+
+    # Criteria printed at every step of a geometry optimization, in the order they are printed
+    convergence_criteria = ('Maximum Force', 'RMS Force', 'Maximum Displacement', 'RMS Displacement')
+
+    # Anchor and column of the energies printed at every step of a geometry optimization, from the highest level of theory to the lowest
+    step_energies = [('CCSD(T)=', -1), ('E(Corr)=', -1), ('EUMP2 =', -1), ('SCF Done:', 4)]
+
+    # Components of the polarizability tensors by the label they are printed with. Only the lower triangle is printed
+    tensor_components = {'xx': (0, 0), 'yx': (1, 0), 'yy': (1, 1), 'zx': (2, 0), 'zy': (2, 1), 'zz': (2, 2)}
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('Error termination',), 'normal': ('Normal termination of Gaussian',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Energy': [ExtractionSpec('Sum of electronic and zero-point Energies=', ['tot_energy'], [(0, -1), (-4, -2)], conversion=lambda values: [float(values[0]) - float(values[1])], error='final energy'),
+                    ExtractionSpec('SCF Done:', ['tot_energy'], [(0, 4)], error='final energy')],
+        '_ZPV': [ExtractionSpec('Sum of electronic and zero-point Energies=', ['zpv'], [(0, -1)], error='ZPV energy')],
+        '_Dipole_moments': [ExtractionSpec('Electric dipole moment (input orientation):', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(4, 1), (5, 1), (6, 1), (3, 1)], conversion=FortranFloats, error='dipole moments')],
+        '_Frequencies': [ExtractionSpec('Frequencies --', ['freq'], [(0, slice(2, None))], conversion=Columns(Scaled(Constants().inv_cm_to_au)), occurrence='all', error='frequencies', default=['NaN'])],
+        '_RotationalConsts': [ExtractionSpec('Rotational constants (GHZ):', ['rots'], [(0, slice(3, None))], conversion=RotationalConstants(), error='rotational constants')],
+        '_Mass': [ExtractionSpec('Molecular mass', ['mass'], [(0, 2)], error='molecular mass', default=0.0)],
+        '_SymmetryNumber': [ExtractionSpec('Rotational symmetry number', ['symnum'], [(0, -1)], conversion=lambda values: [int(values[0].replace('.', ''))], error='rotational symmetry number', default=0)],
+        '_Multiplicity': [ExtractionSpec('Multiplicity', ['multi'], [(0, -1)], conversion=Integers, occurrence='first', error='multiplicity', default=0)],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_CPUS': 'tail', '_Energy': 'tail', '_ZPV': 'tail', '_Dipole_moments': 'tail', '_Multiplicity': 'head'}
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
 
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _CPUS(self) -> None:
-        linenumber = Backward_search_last(self.filename, 'Job cpu time:', self.end, 'CPU time', quiet=self.quiet)
+        linenumber = Backward_search_last(self.file, 'Job cpu time:', self.end, 'CPU time', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.total_cpu_time = float(self.lines[linenumber].split()[3])*24*60 + float(self.lines[linenumber].split()[5])*60 + float(self.lines[linenumber].split()[7]) + float(self.lines[linenumber].split()[9])/60
             self.wall_cpu_time = float(self.lines[linenumber+1].split()[2])*24*60 + float(self.lines[linenumber+1].split()[4])*60 + float(self.lines[linenumber+1].split()[6]) + float(self.lines[linenumber+1].split()[8])/60
@@ -546,66 +1062,106 @@ class GaussianExtract:
         self.wall_cpu_time = 'NaN'
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Sum of electronic and zero-point Energies=', 'final energy', quiet=True)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-1]) - float(self.lines[linenumber-4].split()[-2])
-            return
-        linenumber = Forward_search_last(self.filename, 'SCF Done:', 'final energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[4])
-            return
-        self.tot_energy = 'NaN'
+        RunExtractionSpecs(self, ['_Energy'])
 
     def _ZPV(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Sum of electronic and zero-point Energies=', 'ZPV energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.zpv = float(self.lines[linenumber].split()[-1])
-            return
-        self.zpv = 'NaN'
+        RunExtractionSpecs(self, ['_ZPV'])
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Electric dipole moment (input orientation):', 'dipole moments', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber+4].split()[1].replace('D','E')), float(self.lines[linenumber+5].split()[1].replace('D','E')), float(self.lines[linenumber+6].split()[1].replace('D','E')), float(self.lines[linenumber+3].split()[1].replace('D','E'))
-            return
-        self.dipolex = self.dipoley = self.dipolez = self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
     def _Polarizabilities(self) -> None:
         linenumber = ['NaN', 'NaN', 'NaN', 'NaN']
         searchwords = [' xx ', ' yy ', ' zz ', ' iso ']
         for i in range(len(searchwords)):
-            linenumber[i] = Forward_search_after_last(self.filename, 'Dipole polarizability, Alpha (input orientation).', searchwords[i], 15, 'polarizabilities', quiet=self.quiet)
+            linenumber[i] = Forward_search_after_last(self.file, 'Dipole polarizability, Alpha (input orientation).', searchwords[i], 15, 'polarizabilities', quiet=self.quiet)
         if linenumber != ['NaN', 'NaN', 'NaN', 'NaN']:
-            self.polx, self.poly, self.polz, self.iso_polar = float(self.lines[linenumber[0]].split()[1].replace('D','E')), float(self.lines[linenumber[1]].split()[1].replace('D','E')), float(self.lines[linenumber[2]].split()[1].replace('D','E')), float(self.lines[linenumber[3]].split()[1].replace('D','E'))
+            block = b''.join(self.file.Block(i, i+1) for i in linenumber)
+            self.polx, self.poly, self.polz, self.iso_polar = ParseTable(block, 1, fortran=True).tolist()
             return
         self.polx = self.poly = self.polz = self.iso_polar = 'NaN'
 
+    def _Polarizability_Tensors(self) -> None:
+        start = Forward_search_last(self.file, 'Dipole polarizability, Alpha (input orientation).', 'polarizability tensors', quiet=self.quiet)
+        if start == 'NaN':
+            self.polarizability_tensors = self.polarizability_frequencies = 'NaN'
+            return
+        # The lower triangle of the tensor of every frequency is printed after a line starting with Alpha, e.g. Alpha(-w;w) w= 532.0nm:
+        tensors = []
+        frequencies = []
+        for line in self.lines[start+1:self.end]:
+            if '----' in line:
+                break
+            words = line.split()
+            if 'Alpha(' in line:
+                tensors.append(np.zeros((3, 3)))
+                frequencies.append(self._Response_Frequency(line))
+            elif len(tensors) > 0 and len(words) > 1 and words[0] in self.tensor_components:
+                i, j = self.tensor_components[words[0]]
+                tensors[-1][i, j] = tensors[-1][j, i] = float(words[1].replace('D', 'E'))
+        self.polarizability_tensors = np.array(tensors).reshape(-1, 3, 3)
+        self.polarizability_frequencies = np.array(frequencies)
+
+    def _Response_Frequency(self, line: str) -> float:
+        # The frequencies are given as a wavelength in nm or in atomic units. Static properties have no frequency
+        if '(0;0)' in line:
+            return 0.0
+        wavelength = re.search(r'w=\s*([\d.]+)\s*nm', line)
+        if wavelength is not None:
+            return 1e7 / float(wavelength.group(1)) * self.constants.inv_cm_to_au
+        values = re.findall(r'\d+\.\d*', line.split(')', 1)[-1])
+        return float(values[-1]) if len(values) > 0 else np.nan
+
     def _Frequencies(self) -> None:
-        self.freq = []
-        linenumbers = Forward_search_all(self.filename, 'Frequencies --', 'frequencies', quiet=self.quiet)
-        if isinstance(linenumbers, list):
-            for i in linenumbers:
-                for j in self.lines[i].split()[2:]:
-                    self.freq.append(float(j)* self.constants.inv_cm_to_au)
-        if len(self.freq) == 0:
-            self.freq = ['NaN']
+        RunExtractionSpecs(self, ['_Frequencies'])
+
+    def _Normal_Modes(self) -> None:
+        # The high precision modes printed with freq=HPModes are left out, as the frequencies are
+        groups = [linenumber for linenumber in self.file.FindAll('Frequencies --') if 'Frequencies ---' not in self.lines[linenumber]]
+        if len(groups) == 0:
+            missing = _LogMissing(self.file, 'normal modes', self.quiet)
+            self.normal_modes = self.ir_intensities = self.reduced_masses = missing
+            return
+        # The labels of the lines are 15 characters wide, so the values of all groups are parsed together
+        self.reduced_masses = np.array(b' '.join(self.file.Block(i+1, i+2)[15:] for i in groups).split()).astype(float)
+        self.ir_intensities = np.array(b' '.join(self.file.Block(i+3, i+4)[15:] for i in groups).split()).astype(float)
+        # The displacements are printed after the 'Atom  AN' header as a line per atom with the displacements of up to 3 modes
+        # More lines come before the header in some jobs, e.g. the Raman activities with polar, so the header is looked for after every group
+        starts = []
+        for i in groups:
+            for start in range(i + 1, self.end):
+                if self.lines[start].split()[:2] == ['Atom', 'AN']:
+                    break
+            starts.append(start + 1)
+        width = len(self.lines[groups[0]].split()) - 2
+        atoms = 0
+        while starts[0] + atoms < self.end and len(self.lines[starts[0] + atoms].split()) == 2 + 3 * width:
+            atoms += 1
+        # The array is filled a group at a time, so only the displacements of a single group are held as text
+        self.normal_modes = np.empty((len(self.reduced_masses), atoms, 3))
+        mode = 0
+        for start in starts:
+            displacements = ParseTable(self.file.Block(start, start+atoms), slice(2, None))
+            modes = displacements.shape[1] // 3
+            self.normal_modes[mode:mode+modes] = displacements.reshape(atoms, modes, 3).transpose(1, 0, 2)
+            mode += modes
 
     def _Excitation_energies(self) -> None:
         self.exc_energies = []
-        linenumber = Forward_search_last(self.filename, 'Excitation energies and oscillator strengths:', 'excitation energies', quiet=True)
+        linenumber = Forward_search_last(self.file, 'Excitation energies and oscillator strengths:', 'excitation energies', quiet=True)
         if isinstance(linenumber, int):
-            linenumbers = Forward_search_all(self.filename, 'Excited State', 'excitation energies', quiet=self.quiet)
+            linenumbers = Forward_search_all(self.file, 'Excited State', 'excitation energies', quiet=self.quiet)
             linenumbers = [i for i in linenumbers if i > linenumber]
-            for i in linenumbers:
-                self.exc_energies.append(float(self.lines[i].split()[4])* self.constants.ev_to_au)
+            block = b''.join(self.file.Block(i, i+1) for i in linenumbers)
+            self.exc_energies = (ParseTable(block, 4) * self.constants.ev_to_au).tolist()
         if len(self.exc_energies) == 0:
             self.exc_energies = ['NaN']
 
     def _Oscillator_strengths(self) -> None:
         self.osc_strengths = []
-        linenumber = Forward_search_last(self.filename, 'Excitation energies and oscillator strengths:', 'oscillator strengths', quiet=True)
+        linenumber = Forward_search_last(self.file, 'Excitation energies and oscillator strengths:', 'oscillator strengths', quiet=True)
         if isinstance(linenumber, int):
-            linenumbers = Forward_search_all(self.filename, 'Excited State', 'oscillator strengths', quiet=self.quiet)
+            linenumbers = Forward_search_all(self.file, 'Excited State', 'oscillator strengths', quiet=self.quiet)
             linenumbers = [i for i in linenumbers if i > linenumber]
             for i in linenumbers:
                 for j in self.lines[i].split():
@@ -615,42 +1171,25 @@ class GaussianExtract:
             self.osc_strengths = ['NaN']
 
     def _RotationalConsts(self) -> None:
-        self.rots = []
-        linenumbers = Forward_search_all(self.filename, 'Rotational constants (GHZ):', 'rotational constants', quiet=self.quiet)
-        for i in self.lines[linenumbers[-1]].split()[3:]:
-            self.rots.append(float(i))
-        self.rots = np.array(self.rots)
-        self.rots = self.rots[self.rots != 0.0]
+        RunExtractionSpecs(self, ['_RotationalConsts'])
 
     def _Mass(self) -> None:
-        self.mass = 0.0
-        linenumber = Forward_search_last(self.filename, 'Molecular mass', 'molecular mass', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.mass = float(self.lines[linenumber].split()[2])
+        RunExtractionSpecs(self, ['_Mass'])
 
-    def _SymmetryNumber(self):
-        self.symnum = 0
-        linenumber = Forward_search_last(self.filename, 'Rotational symmetry number', 'rotational symmetry number', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.symnum = int(self.lines[linenumber].split()[-1].replace('.',''))
+    def _SymmetryNumber(self) -> None:
+        RunExtractionSpecs(self, ['_SymmetryNumber'])
 
     def _Multiplicity(self) -> None:
-        self.multi = 0
-        linenumber = Forward_search_first(self.filename, 'Multiplicity', 'multiplicity', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.multi = int(self.lines[linenumber].split()[-1])
+        RunExtractionSpecs(self, ['_Multiplicity'])
 
+    @Requires('_Frequencies')
     def _PartitionFunctions(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.qTotal = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._SymmetryNumber()
-        self._Multiplicity()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_SymmetryNumber', '_Multiplicity'])
         self.qT = self.constants.trans_const_fac * self.mass ** (1.5) * self.T ** (2.5)
         if len(self.rots) == 1:
             self.qR = self.constants.rot_lin_const * self.T / (self.symnum * self.rots[0])
@@ -662,13 +1201,13 @@ class GaussianExtract:
         self.qE = self.multi #Good approximation for most closed-shell molecules
         self.qTotal = self.qT*self.qR*self.qV*self.qE
 
+    @Requires('_Energy', '_Frequencies')
     def _Enthalpy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.enthalpy = 'NaN'
-        self._RotationalConsts()
+        Resolve(self, ['_RotationalConsts'])
         self.E_T = 3/2 * self.T * self.constants.gas_constant
         if len(self.rots) == 1:
             self.E_R = self.T * self.constants.gas_constant
@@ -680,17 +1219,14 @@ class GaussianExtract:
         self.E_e = 0 #Good approximation for most closed-shell molecules
         self.enthalpy = (self.E_T+self.E_R+self.E_V+self.constants.gas_constant *  self.T ) / self.constants.au_to_kJmol + self.tot_energy
 
+    @Requires('_Frequencies')
     def _Entropy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.entropy = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._SymmetryNumber()
-        self._Multiplicity()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_SymmetryNumber', '_Multiplicity'])
         self.S_T = self.constants.gas_constant * np.log(self.constants.s_trans_const * self.mass ** 1.5 * self.T ** 2.5)
         if len(self.rots) == 1:
             self.S_R = self.constants.gas_constant * np.log(self.constants.rot_lin_const * self.T / (self.symnum * self.rots[0]))
@@ -702,18 +1238,18 @@ class GaussianExtract:
         self.S_E = self.constants.gas_constant * np.log(self.multi) #Good approximation for most closed-shell molecules
         self.entropy = self.S_T+self.S_R+self.S_V+self.S_E
 
+    @Requires('_Frequencies', '_Enthalpy', '_Entropy')
     def _Gibbs(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping free energy energy calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping free energy energy calculation", SKIPPED, 'free energy calculation', self.filename)
             self.gibbs = 'NaN'
             return
         self.gibbs = self.enthalpy - self.T*self.entropy / self.constants.au_to_kJmol
 
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'Standard orientation', 'geometry', quiet=self.quiet)
-        # end = Forward_search_after_last(self.filename, 'Standard orientation', 'Rotational constants', 200, "end of geometry", quiet=self.quiet)
+        start = Forward_search_last(self.file, 'Standard orientation', 'geometry', quiet=self.quiet)
+        # end = Forward_search_after_last(self.file, 'Standard orientation', 'Rotational constants', 200, "end of geometry", quiet=self.quiet)
         if start != "NaN":# and end != "NaN":
             #Offset for going into actual coordinate list
             start += 5
@@ -723,36 +1259,256 @@ class GaussianExtract:
                     break
             #Which position in the line is the atom label / number at
             label_location = 1
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
-            GenerateXYZ(self.lines, OptGeomFilename, start, end, label_location, transform = True)
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
+            GenerateXYZ(self.file, OptGeomFilename, start, end, label_location, transform = True)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
+
+    def _SCF_Convergence(self) -> None:
+        # The iterations are only printed with #P, otherwise only the amount of iterations is found
+        ReadSCFConvergence(self, 'Cycle   1  Pass 1', 'SCF Done:', rb'^ E= *(\S+)', -2)
+
+    def _Optimization_Convergence(self) -> None:
+        # Every step of the optimization ends with the table of the convergence criteria
+        # The output of an optimization that is still running or was stopped may end in the last table, so only the steps with a complete table are used
+        criteria = len(self.convergence_criteria)
+        steps = [step for step in self.file.FindAll('Converged?') if step + criteria < len(self.lines) and self.lines[step + criteria].endswith('\n')]
+        table = ParseTable(b''.join(self.file.Block(step + 1, step + 1 + criteria) for step in steps), [-3, -1], dtype=str)
+        self.opt_convergence = table[:, 0].astype(float).reshape(len(steps), criteria)
+        self.opt_converged = (table[:, 1] == 'YES').reshape(len(steps), criteria)
+        self.opt_steps = len(steps)
+
+    @Requires('_Optimization_Convergence')
+    def _Trajectory(self) -> None:
+        # Every step of the optimization ends with the table of the convergence criteria
+        # Only the steps with a complete table are used, see _Optimization_Convergence
+        steps = self.file.FindAll('Converged?')[:self.opt_steps]
+        geometries = LastBefore(self.file.FindAll('Standard orientation'), steps)
+        if len(steps) == 0 or None in geometries:
+            missing = _LogMissing(self.file, 'optimization trajectory', self.quiet)
+            for attribute in TRAJECTORY_ATTRIBUTES:
+                setattr(self, attribute, missing)
+            return
+        #Offset for going into actual coordinate list
+        start = geometries[0] + 5
+        for i, line in enumerate(self.lines[start:]):
+            if '---------------------------------------------------------------------' in line:
+                atoms = i
+                break
+        # The geometries of all steps are parsed together
+        block = b''.join(self.file.Block(geometry + 5, geometry + 5 + atoms) for geometry in geometries)
+        table = ParseTable(block, [1, -3, -2, -1], dtype=str)
+        self.trajectory_labels = [AtomicInformation(int(number)).atom for number in table[:atoms, 0]]
+        self.trajectory = table[:, 1:].astype(float).reshape(len(steps), atoms, 3)
+        self.trajectory_energies = StepEnergies(self.file, steps, geometries, self.step_energies)
+        self.trajectory_convergence = self.opt_convergence
+        self.trajectory_converged = self.opt_converged
+
+
+class GaussianFchkExtract(GaussianExtract):
+    """Extraction from a Gaussian output file using the formatted checkpoint file (.fchk) of the same calculation
+
+    Quantities stored in the formatted checkpoint file are read from it, and the frequencies are calculated from the Hessian stored in it, so the thermochemistry does not need the output file. Every other quantity is extracted from the output file as by GaussianExtract. The output file is only read the first time one of these is extracted
+
+    Args:
+        filename (str): The Gaussian output file
+        Fchk (str, optional): The formatted checkpoint file. Defaults to the one next to [filename], see SiblingFchk.
+    """
+    # The quantities extracted with specs by GaussianExtract are read from the formatted checkpoint file. If they are not in it, they are extracted from the output file by ExtractFromLog
+    specs = dict()
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None, Fchk: str = None) -> None:
+        self.filename = filename
+        self.quiet = Quiet
+        self.T = Temperature
+        self.constants = Constants()
+
+        self.fchk = FormattedCheckpoint(Fchk if Fchk is not None else SiblingFchk(filename))
+        if Stream is not None:
+            Stream.close()
+
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def __getattr__(self, name: str):
+        # The output file is read when it is first used, i.e. when a quantity that is not in the formatted checkpoint file is extracted
+        if name in ('file', 'lines', 'end') and 'filename' in self.__dict__:
+            self.ReadFile()
+            self.end = len(self.lines)
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def ExtractFromLog(self, method: str) -> None:
+        if method in GaussianExtract.specs:
+            RunExtractionSpecs(self, [method], GaussianExtract.specs)
+        else:
+            getattr(GaussianExtract, method)(self)
+
+    def FchkGeometry(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The coordinates in bohr and the masses in electron masses of the atoms
+        return self.fchk.Get('Current cartesian coordinates').reshape(-1, 3), self.fchk.Get('Real atomic weights') * self.constants.amu_to_me
+
+    def _Energy(self) -> None:
+        if 'Total Energy' not in self.fchk:
+            self.ExtractFromLog('_Energy')
+            return
+        self.tot_energy = self.fchk.Get('Total Energy')
+
+    def _ZPV(self) -> None:
+        if 'Cartesian Force Constants' not in self.fchk:
+            self.ExtractFromLog('_ZPV')
+            return
+        Resolve(self, ['_Energy', '_Frequencies'])
+        realfreq = np.array([x for x in self.freq if x != 'NaN'])
+        self.zpv = self.tot_energy + np.sum(realfreq[realfreq > 0.0]) / 2
+
+    def _Dipole_moments(self) -> None:
+        if 'Dipole Moment' not in self.fchk:
+            self.ExtractFromLog('_Dipole_moments')
+            return
+        dipole = self.fchk.Get('Dipole Moment')
+        self.dipolex, self.dipoley, self.dipolez = dipole.tolist()
+        self.total_dipole = float(np.linalg.norm(dipole))
+
+    def _Polarizabilities(self) -> None:
+        if 'Polarizability' not in self.fchk:
+            self.ExtractFromLog('_Polarizabilities')
+            return
+        # The lower triangle of the tensor is stored, i.e. xx, yx, yy, zx, zy, zz
+        polarizability = self.fchk.Get('Polarizability')
+        self.polx, self.poly, self.polz = polarizability[[0, 2, 5]].tolist()
+        self.iso_polar = (self.polx + self.poly + self.polz) / 3
+
+    def _Polarizability_Tensors(self) -> None:
+        if 'Polarizability' not in self.fchk:
+            self.ExtractFromLog('_Polarizability_Tensors')
+            return
+        tensor = np.zeros((3, 3))
+        tensor[np.tril_indices(3)] = self.fchk.Get('Polarizability')
+        self.polarizability_tensors = (tensor + np.tril(tensor, -1).T)[None]
+        self.polarizability_frequencies = np.zeros(1)
+        # Frequency-dependent polarizabilities are stored as full tensors after the frequencies they were calculated at
+        if 'Alpha(-w,w)' in self.fchk and 'Frequencies for FD properties' in self.fchk:
+            frequencies = self.fchk.Get('Frequencies for FD properties')
+            self.polarizability_tensors = self.fchk.Get('Alpha(-w,w)').reshape(len(frequencies), 3, 3)
+            self.polarizability_frequencies = frequencies
+
+    def _Frequencies(self) -> None:
+        if 'Cartesian Force Constants' not in self.fchk:
+            self.ExtractFromLog('_Frequencies')
+            return
+        coordinates, masses = self.FchkGeometry()
+        self.freq = HarmonicFrequencies(self.fchk.Get('Cartesian Force Constants'), coordinates, masses).tolist()
+
+    def _RotationalConsts(self) -> None:
+        if 'Current cartesian coordinates' not in self.fchk or 'Real atomic weights' not in self.fchk:
+            self.ExtractFromLog('_RotationalConsts')
+            return
+        self.rots = RotationalConstantsFromGeometry(*self.FchkGeometry())
+
+    def _Mass(self) -> None:
+        if 'Real atomic weights' not in self.fchk:
+            self.ExtractFromLog('_Mass')
+            return
+        self.mass = float(self.fchk.Get('Real atomic weights').sum())
+
+    def _Multiplicity(self) -> None:
+        if 'Multiplicity' not in self.fchk:
+            self.ExtractFromLog('_Multiplicity')
+            return
+        self.multi = self.fchk.Get('Multiplicity')
+
+    def _SymmetryNumber(self) -> None:
+        # The rotational symmetry number is not stored in the formatted checkpoint file. It is printed with the thermochemistry at the end of the output file, so only the end of that is read if the whole file has not been read already
+        if 'file' not in self.__dict__ and Compression(self.filename) is None:
+            tail = GaussianExtract(self.filename, Quiet=True, Region='tail')
+            RunExtractionSpecs(tail, ['_SymmetryNumber'])
+            if tail.symnum != 0:
+                self.symnum = tail.symnum
+                return
+        self.ExtractFromLog('_SymmetryNumber')
 
 
 class OrcaExtract:
-    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        'Sum of individual times         ...',
+        '%pal nprocs',
+        'PAL',
+        'Electronic energy',
+        'FINAL SINGLE POINT ENERGY',
+        'Total Dipole Moment',
+        'THE POLARIZABILITY TENSOR',
+        'STATE ',
+        'ABSORPTION SPECTRUM VIA TRANSITION ELECTRIC DIPOLE MOMENTS',
+        'VIBRATIONAL FREQUENCIES',
+        'Rotational constants in MHz',
+        'Total Mass',
+        'Symmetry Number',
+        'Multiplicity',
+        'CARTESIAN COORDINATES (ANGSTROEM)',
+        'JOB NUMBER',
+        'NORMAL MODES',
+        'IR SPECTRUM',
+        'CARTESIAN COORDINATES (A.U.)',
+        '|Geometry convergence|',
+        'SCF ITERATIONS',
+        'SCF CONVERGED AFTER'
+    )
+
+    # Line starting every job after the first in output files of chained jobs, i.e. jobs separated by $new_job in the input
+    job_anchor = 'JOB NUMBER'
+
+    # Criteria printed at every step of a geometry optimization. The energy change is not printed at the first step
+    convergence_criteria = ('Energy change', 'RMS gradient', 'MAX gradient', 'RMS step', 'MAX step')
+
+    # Anchor and column of the energies printed at every step of a geometry optimization
+    step_energies = [('FINAL SINGLE POINT ENERGY', -1)]
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('error termination', 'ABORTING THE RUN'), 'normal': ('ORCA TERMINATED NORMALLY',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Energy': [ExtractionSpec('Electronic energy', ['tot_energy'], [(0, -2)], error='Final energy'),
+                    ExtractionSpec('FINAL SINGLE POINT ENERGY', ['tot_energy'], [(0, -1)], error='Final energy')],
+        '_ZPV': [ExtractionSpec('Electronic energy', ['zpv'], [(0, -2), (1, -4)], conversion=lambda values: [float(values[0]) + float(values[1])], error='ZPV energy')],
+        '_Dipole_moments': [ExtractionSpec('Total Dipole Moment', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(0, -3), (0, -2), (0, -1), (2, -1)], error='dipole moment')],
+        '_Excitation_energies': [ExtractionSpec('STATE ', ['exc_energies'], [(0, 3)], conversion=lambda values: [Floats(values)], occurrence='all', error='excitation energies', default=['NaN'])],
+        '_RotationalConsts': [ExtractionSpec('Rotational constants in MHz', ['rots'], [(0, slice(-3, None))], conversion=RotationalConstants(1E-3), occurrence='first', error='rotational constants')],
+        '_Mass': [ExtractionSpec('Total Mass', ['mass'], [(0, -2)], error='molecular mass', default=0.0)],
+        '_SymmetryNumber': [ExtractionSpec('Symmetry Number', ['symnum'], [(0, -1)], conversion=Integers, error='rotational symmetry number', default=0)],
+        '_Multiplicity': [ExtractionSpec('Multiplicity', ['multi'], [(0, -1)], conversion=Integers, occurrence='first', error='multiplicity', default=0)],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_Energy': 'tail', '_ZPV': 'tail', '_Dipole_moments': 'tail', '_Multiplicity': 'head'}
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
 
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _CPUS(self) -> None:
-        linenumber = Backward_search_last(self.filename, 'Sum of individual times         ...', self.end, 'CPU time', quiet=self.quiet)
+        linenumber = Backward_search_last(self.file, 'Sum of individual times         ...', self.end, 'CPU time', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.wall_cpu_time = float(self.lines[linenumber].split()[-2])
-            linenumber2 = Forward_search_last(self.filename, '%pal nprocs', 'CPU count', quiet=True)
+            linenumber2 = Forward_search_last(self.file, '%pal nprocs', 'CPU count', quiet=True)
             if isinstance(linenumber2, int):
                 self.total_cpu_time = self.wall_cpu_time * int(self.lines[linenumber2].split()[-1])
-            linenumber3 = Forward_search_last(self.filename, 'PAL', 'CPU count', quiet=self.quiet)
+            linenumber3 = Forward_search_last(self.file, 'PAL', 'CPU count', quiet=self.quiet)
             if isinstance(linenumber3, int):
                 self.total_cpu_time = self.wall_cpu_time * int(self.lines[linenumber3].split()[-1][3:])
             return
@@ -760,31 +1516,19 @@ class OrcaExtract:
         self.wall_cpu_time = 'NaN'
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Electronic energy', 'Final energy', quiet=True)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-2])
-            return
-        linenumber = Forward_search_last(self.filename, 'FINAL SINGLE POINT ENERGY', 'Final energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-1])
-            return
-        self.tot_energy = 'NaN'
+        RunExtractionSpecs(self, ['_Energy'])
 
     def _ZPV(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Electronic energy', 'ZPV energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.zpv = float(self.lines[linenumber].split()[-2]) + float(self.lines[linenumber+1].split()[-4])
-            return
-        self.zpv = 'NaN'
+        RunExtractionSpecs(self, ['_ZPV'])
 
+    @Requires('_Energy', '_Frequencies')
     def _Enthalpy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.enthalpy = 'NaN'
             return
-        self._RotationalConsts()
+        Resolve(self, ['_RotationalConsts'])
         self.E_T = 3/2 * self.T * self.constants.gas_constant
         if len(self.rots) == 1:
             self.E_R = self.T * self.constants.gas_constant
@@ -796,41 +1540,42 @@ class OrcaExtract:
         self.E_e = 0 #Good approximation for most closed-shell molecules
         self.enthalpy = (self.E_T+self.E_R+self.E_V+self.constants.gas_constant *  self.T ) / self.constants.au_to_kJmol + self.tot_energy
 
+    @Requires('_Frequencies', '_Enthalpy', '_Entropy')
     def _Gibbs(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping free energy energy calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping free energy energy calculation", SKIPPED, 'free energy calculation', self.filename)
             self.gibbs = 'NaN'
             return
         self.gibbs = self.enthalpy - self.T*self.entropy / self.constants.au_to_kJmol
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Total Dipole Moment', 'dipole moment', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber].split()[-3]), float(self.lines[linenumber].split()[-2]), float(self.lines[linenumber].split()[-1]), float(self.lines[linenumber+2].split()[-1])
-            return
-        self.dipolex, self.dipoley, self.dipolez, self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
     def _Polarizabilities(self) -> None:
-        linenumber = Forward_search_after_last(self.filename, 'THE POLARIZABILITY TENSOR', "'diagonalized tensor:'", 10, 'polarizability', quiet=self.quiet)
+        linenumber = Forward_search_after_last(self.file, 'THE POLARIZABILITY TENSOR', "'diagonalized tensor:'", 10, 'polarizability', quiet=self.quiet)
         if isinstance(linenumber, int):
-            self.polx, self.poly, self.polz, self.iso_polar = float(self.lines[linenumber+1].split()[0]), float(self.lines[linenumber+1].split()[1]), float(self.lines[linenumber+1].split()[2]), float(self.lines[linenumber+7].split()[-1])
+            self.polx, self.poly, self.polz = ParseTable(self.file.Block(linenumber+1, linenumber+2), slice(0, 3))[0].tolist()
+            self.iso_polar = float(self.lines[linenumber+7].split()[-1])
             return
         self.polx = self.poly = self.polz = self.iso_polar = 'NaN'
 
+    def _Polarizability_Tensors(self) -> None:
+        # Only the static polarizability is printed
+        linenumber = Forward_search_after_last(self.file, 'THE POLARIZABILITY TENSOR', 'The raw cartesian tensor', 10, 'polarizability tensors', quiet=self.quiet)
+        if isinstance(linenumber, int):
+            self.polarizability_tensors = ParseTable(self.file.Block(linenumber+1, linenumber+4), slice(0, 3)).reshape(1, 3, 3)
+            self.polarizability_frequencies = np.zeros(1)
+            return
+        self.polarizability_tensors = self.polarizability_frequencies = 'NaN'
+
     def _Excitation_energies(self) -> None:
-        self.exc_energies = []
-        linenumbers = Forward_search_all(self.filename, 'STATE ', 'excitation energies', quiet=self.quiet)
-        if isinstance(linenumbers, list):
-            for i in linenumbers:
-                self.exc_energies.append(float(self.lines[i].split()[3]))
-        if len(self.exc_energies) == 0:
-            self.exc_energies = ['NaN']
+        RunExtractionSpecs(self, ['_Excitation_energies'])
 
+    @Requires('_Excitation_energies')
     def _Oscillator_strengths(self) -> None:
         self.osc_strengths = []
-        linenumber = Forward_search_last(self.filename, 'ABSORPTION SPECTRUM VIA TRANSITION ELECTRIC DIPOLE MOMENTS', 'oscillator strengths', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, 'ABSORPTION SPECTRUM VIA TRANSITION ELECTRIC DIPOLE MOMENTS', 'oscillator strengths', quiet=self.quiet)
         if isinstance(linenumber, int):
             for i in range(len(self.exc_energies)):
                 if len(self.lines[linenumber+5+i].split()) > 6:
@@ -842,7 +1587,7 @@ class OrcaExtract:
 
     def _Frequencies(self) -> None:
         self.freq = []
-        linenumber = Forward_search_last(self.filename, "VIBRATIONAL FREQUENCIES", 'frequencies', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, "VIBRATIONAL FREQUENCIES", 'frequencies', quiet=self.quiet)
         if isinstance(linenumber, int):
             for j in self.lines[linenumber+7: self.end]:
                 if ": " and " 0.00 " in j:
@@ -854,43 +1599,63 @@ class OrcaExtract:
         if len(self.freq) == 0:
             self.freq = ['NaN']
 
+    def _Normal_Modes(self) -> None:
+        linenumber = Forward_search_last(self.file, 'NORMAL MODES', 'normal modes', quiet=self.quiet)
+        coordinates = Forward_search_last(self.file, 'CARTESIAN COORDINATES (A.U.)', 'atomic masses', quiet=self.quiet)
+        if not isinstance(linenumber, int) or not isinstance(coordinates, int):
+            self.normal_modes = self.ir_intensities = self.reduced_masses = 'NaN'
+            return
+        #Offset for going into the table of the atoms, which ends with an empty line
+        start = end = coordinates + 3
+        while end < self.end and len(self.lines[end].split()) > 0:
+            end += 1
+        masses = ParseTable(self.file.Block(start, end), 4)
+        # The modes are printed as a 3N x 3N matrix in blocks of up to 6 columns, each with a line of the column numbers first
+        size = 3 * len(masses)
+        start = linenumber + 7
+        displacements = np.empty((size, size))
+        column = 0
+        while start < self.end and column < size:
+            block = ParseTable(self.file.Block(start+1, start+1+size), slice(1, None))
+            displacements[:, column:column+block.shape[1]] = block
+            column += block.shape[1]
+            start += size + 1
+        # Translations and rotations are printed as modes of only zeros
+        vibrations = np.flatnonzero(np.any(displacements != 0, axis=0))
+        self.normal_modes = displacements[:, vibrations].T.reshape(len(vibrations), len(masses), 3)
+        # The modes are normalized Cartesian displacements, so the reduced masses are the mass-weighted squared displacements
+        self.reduced_masses = np.einsum('ijk,j->i', self.normal_modes**2, masses)
+        self.ir_intensities = np.full(len(vibrations), np.nan)
+        linenumber = Forward_search_last(self.file, 'IR SPECTRUM', 'IR intensities', quiet=self.quiet)
+        if isinstance(linenumber, int):
+            #Offset for going into the table of the modes, which ends with an empty line
+            start = end = linenumber + 6
+            while end < self.end and len(self.lines[end].split()) > 0:
+                end += 1
+            # The transition dipoles at the end of the lines are not always separated from their parentheses, so the lines are split one at a time
+            intensities = {line.split()[0]: float(line.split()[3]) for line in self.lines[start:end]}
+            self.ir_intensities = np.array([intensities.get(f'{mode}:', np.nan) for mode in vibrations])
+
     def _RotationalConsts(self) -> None:
-        self.rots = []
-        linenumbers = Forward_search_first(self.filename, 'Rotational constants in MHz', 'rotational constants', quiet=self.quiet)
-        for i in self.lines[linenumbers].split()[-3:]:
-            self.rots.append(float(i))
-        self.rots = np.array(self.rots) * 1E-3
-        self.rots = self.rots[self.rots != 0.0]
+        RunExtractionSpecs(self, ['_RotationalConsts'])
 
     def _Mass(self) -> None:
-        self.mass = 0.0
-        linenumber = Forward_search_last(self.filename, 'Total Mass', 'molecular mass', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.mass = float(self.lines[linenumber].split()[-2])
+        RunExtractionSpecs(self, ['_Mass'])
 
     def _SymmetryNumber(self) -> None:
-        self.symnum = 0
-        linenumber = Forward_search_last(self.filename, 'Symmetry Number', 'rotational symmetry number', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.symnum = int(self.lines[linenumber].split()[-1])
+        RunExtractionSpecs(self, ['_SymmetryNumber'])
 
     def _Multiplicity(self) -> None:
-        self.multi = 0
-        linenumber = Forward_search_first(self.filename, 'Multiplicity', 'multiplicity', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.multi = int(self.lines[linenumber].split()[-1])
+        RunExtractionSpecs(self, ['_Multiplicity'])
 
+    @Requires('_Frequencies')
     def _PartitionFunctions(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.qTotal = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._Multiplicity()
-        self._SymmetryNumber()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_Multiplicity', '_SymmetryNumber'])
         self.qT = self.constants.trans_const_fac * self.mass ** (1.5) * self.T ** (2.5)
         if len(self.rots) == 1:
             self.qR = self.constants.rot_lin_const * self.T / (self.symnum * self.rots[0])
@@ -902,17 +1667,14 @@ class OrcaExtract:
         self.qE = self.multi #Good approximation for most closed-shell molecules
         self.qTotal = self.qT*self.qR*self.qV*self.qE
 
+    @Requires('_Frequencies')
     def _Entropy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.entropy = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._Multiplicity()
-        self._SymmetryNumber()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_Multiplicity', '_SymmetryNumber'])
         self.S_T = self.constants.gas_constant * np.log(self.constants.s_trans_const * self.mass ** 1.5 * self.T ** 2.5)
         if len(self.rots) == 1:
             self.S_R = self.constants.gas_constant * np.log(self.constants.rot_lin_const * self.T / (self.symnum * self.rots[0]))
@@ -925,7 +1687,7 @@ class OrcaExtract:
         self.entropy = self.S_T+self.S_R+self.S_V+self.S_E
 
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'CARTESIAN COORDINATES (ANGSTROEM)', 'geometry', quiet=self.quiet)
+        start = Forward_search_last(self.file, 'CARTESIAN COORDINATES (ANGSTROEM)', 'geometry', quiet=self.quiet)
         if start != "NaN":
             #Offset for going into actual coordinate list
             start += 2
@@ -935,40 +1697,274 @@ class OrcaExtract:
                     break
             #Which position in the line is the atom label / number at
             label_location = 0
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
-            GenerateXYZ(self.lines, OptGeomFilename, start, end, label_location)
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
+            GenerateXYZ(self.file, OptGeomFilename, start, end, label_location)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
+
+    def _SCF_Convergence(self) -> None:
+        ReadSCFConvergence(self, 'SCF ITERATIONS', 'SCF CONVERGED AFTER', rb'^ *\d+ +(-\d+\.\d+) ', -3)
+
+    def _Optimization_Convergence(self) -> None:
+        # Every step of the optimization ends with the table of the convergence criteria
+        steps = self.file.FindAll('|Geometry convergence|')
+        # Not every criterion is printed at every step, so the criteria are placed by their names
+        self.opt_convergence = np.full((len(steps), len(self.convergence_criteria)), np.nan)
+        self.opt_converged = np.zeros((len(steps), len(self.convergence_criteria)), dtype=bool)
+        for i, step in enumerate(steps):
+            #Offset for going into the table of the criteria, which ends with a dotted line
+            start = step + 3
+            for end, line in enumerate(self.lines[start:], start=start):
+                if not line.strip() or line.strip().startswith('.'):
+                    break
+            for name1, name2, value, _, converged in ParseTable(self.file.Block(start, end), width=5, dtype=str):
+                if f'{name1} {name2}' in self.convergence_criteria:
+                    criterion = self.convergence_criteria.index(f'{name1} {name2}')
+                    self.opt_convergence[i, criterion] = float(value)
+                    self.opt_converged[i, criterion] = converged == 'YES'
+        self.opt_steps = len(steps)
+
+    @Requires('_Optimization_Convergence')
+    def _Trajectory(self) -> None:
+        # Every step of the optimization ends with the table of the convergence criteria
+        steps = self.file.FindAll('|Geometry convergence|')
+        geometries = LastBefore(self.file.FindAll('CARTESIAN COORDINATES (ANGSTROEM)'), steps)
+        if len(steps) == 0 or None in geometries:
+            missing = _LogMissing(self.file, 'optimization trajectory', self.quiet)
+            for attribute in TRAJECTORY_ATTRIBUTES:
+                setattr(self, attribute, missing)
+            return
+        #Offset for going into actual coordinate list
+        start = geometries[0] + 2
+        for i, line in enumerate(self.lines[start:]):
+            if len(line.strip()) == 0:
+                atoms = i
+                break
+        # The geometries of all steps are parsed together
+        block = b''.join(self.file.Block(geometry + 2, geometry + 2 + atoms) for geometry in geometries)
+        table = ParseTable(block, [0, -3, -2, -1], dtype=str)
+        self.trajectory_labels = table[:atoms, 0].tolist()
+        self.trajectory = table[:, 1:].astype(float).reshape(len(steps), atoms, 3)
+        self.trajectory_energies = StepEnergies(self.file, steps, geometries, self.step_energies)
+        self.trajectory_convergence = self.opt_convergence
+        self.trajectory_converged = self.opt_converged
+
+
+class OrcaPropertyExtract(OrcaExtract):
+    """Extraction from an ORCA output file using the property file of the same calculation, e.g. water_property.txt for water.out
+
+    Quantities stored in the property file are read from it. Every other quantity is extracted from the output file as by OrcaExtract, which is only read the first time one of these is extracted. The file every quantity the property file may hold was read from is recorded in sources. Quantities never stored in property files, e.g. the CPU time, are not recorded
+
+    Args:
+        filename (str): The ORCA output file
+        Properties (str, optional): The property file. Defaults to the one next to [filename], see SiblingPropertyFile.
+    """
+    # The quantities extracted with specs by OrcaExtract are read from the property file. If they are not in it, they are extracted from the output file by ExtractFromLog
+    specs = dict()
+
+    # Block and key of the quantities stored in the property file. Alternatives for a quantity are tried in order
+    property_keys = {
+        'tot_energy': [('THERMOCHEMISTRY_Energies', 'Electronic Energy (Hartree)'), ('Single_Point_Data', 'FINAL ENERGY')],
+        'zpe': [('THERMOCHEMISTRY_Energies', 'Zero Point Energy (Hartree)')],
+        'dipole': [('Dipole_Moment', 'Total Dipole moment')],
+        'polarizability': [('Polarizability', 'Raw cartesian tensor')],
+        'iso_polar': [('Polarizability', 'Isotropic polarizability')],
+        'freq': [('THERMOCHEMISTRY_Energies', 'Vibrational frequencies')],
+        'mass': [('THERMOCHEMISTRY_Energies', 'Total Mass (AMU)')],
+        'multi': [('Calculation_Info', 'Multiplicity'), ('THERMOCHEMISTRY_Energies', 'Spin Degeneracy')],
+    }
+
+    def __init__(self, filename: str, *, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None, Properties: str = None) -> None:
+        self.filename = filename
+        self.quiet = Quiet
+        self.T = Temperature
+        self.constants = Constants()
+
+        self.properties = PropertyFile(Properties if Properties is not None else SiblingPropertyFile(filename))
+        # The file every extracted value was read from, by attribute name
+        self.sources = dict()
+        if Stream is not None:
+            Stream.close()
+
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def __getattr__(self, name: str):
+        # The output file is read when it is first used, i.e. when a quantity that is not in the property file is extracted
+        if name in ('file', 'lines', 'end') and 'filename' in self.__dict__:
+            self.ReadFile()
+            self.end = len(self.lines)
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def ExtractFromLog(self, method: str) -> None:
+        before = set(self.__dict__)
+        if method in OrcaExtract.specs:
+            RunExtractionSpecs(self, [method], OrcaExtract.specs)
+        else:
+            getattr(OrcaExtract, method)(self)
+        self.sources.update(dict.fromkeys([key for key in self.__dict__ if key not in before and key not in ('file', 'lines', 'end')], self.filename))
+
+    def Property(self, quantity: str):
+        # The value of a quantity of property_keys. None if it is not in the property file
+        for block, key in self.property_keys[quantity]:
+            value = self.properties.Get(block, key)
+            if value is not None:
+                return value
+        return None
+
+    def Serve(self, **values) -> None:
+        # Sets values read from the property file and records it as their source
+        for attribute, value in values.items():
+            setattr(self, attribute, value)
+            self.sources[attribute] = str(self.properties)
+
+    def _Energy(self) -> None:
+        energy = self.Property('tot_energy')
+        if energy is None:
+            self.ExtractFromLog('_Energy')
+            return
+        self.Serve(tot_energy=float(energy))
+
+    def _ZPV(self) -> None:
+        energy, zpe = self.Property('tot_energy'), self.Property('zpe')
+        if energy is None or zpe is None:
+            self.ExtractFromLog('_ZPV')
+            return
+        self.Serve(zpv=float(energy) + float(zpe))
+
+    def _Dipole_moments(self) -> None:
+        dipole = self.Property('dipole')
+        if dipole is None:
+            self.ExtractFromLog('_Dipole_moments')
+            return
+        dipole = np.ravel(dipole)
+        self.Serve(dipolex=float(dipole[0]), dipoley=float(dipole[1]), dipolez=float(dipole[2]), total_dipole=float(np.linalg.norm(dipole)))
+
+    def _Polarizabilities(self) -> None:
+        tensor = self.Property('polarizability')
+        if tensor is None:
+            self.ExtractFromLog('_Polarizabilities')
+            return
+        # The output file prints the eigenvalues of the tensor in increasing order
+        tensor = np.reshape(tensor, (3, 3))
+        polx, poly, polz = np.linalg.eigvalsh((tensor + tensor.T) / 2).tolist()
+        iso_polar = self.Property('iso_polar')
+        self.Serve(polx=polx, poly=poly, polz=polz, iso_polar=float(iso_polar) if iso_polar is not None else float(np.trace(tensor)) / 3)
+
+    def _Polarizability_Tensors(self) -> None:
+        # Only the static polarizability is stored
+        tensor = self.Property('polarizability')
+        if tensor is None:
+            self.ExtractFromLog('_Polarizability_Tensors')
+            return
+        self.Serve(polarizability_tensors=np.reshape(tensor, (1, 3, 3)), polarizability_frequencies=np.zeros(1))
+
+    def _Frequencies(self) -> None:
+        frequencies = self.Property('freq')
+        if frequencies is None:
+            self.ExtractFromLog('_Frequencies')
+            return
+        # The translations and rotations are stored as frequencies of zero, which are left out as in the output file
+        frequencies = np.ravel(frequencies)
+        self.Serve(freq=(frequencies[frequencies != 0.0] * self.constants.inv_cm_to_au).tolist())
+
+    def _Mass(self) -> None:
+        mass = self.Property('mass')
+        if mass is None:
+            self.ExtractFromLog('_Mass')
+            return
+        self.Serve(mass=float(mass))
+
+    def _Multiplicity(self) -> None:
+        multiplicity = self.Property('multi')
+        if multiplicity is None:
+            self.ExtractFromLog('_Multiplicity')
+            return
+        self.Serve(multi=int(multiplicity))
+
+    def _RotationalConsts(self) -> None:
+        # The rotational constants and the symmetry number are not stored in the property file
+        self.ExtractFromLog('_RotationalConsts')
+
+    def _SymmetryNumber(self) -> None:
+        self.ExtractFromLog('_SymmetryNumber')
 
 
 class DaltonExtract:
-    def __init__(self, filename: str, NeededArguments: dict = None, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        'Averaged value',
+        'Total CPU  time used in DALTON:',
+        'Total .*  energy:',
+        '@    Final .* energy:',
+        '@ Energy at final geometry is',
+        'Total Molecular Energy',
+        'Dipole moment components',
+        'SECOND ORDER PROPERTIES',
+        '@  Oscillator strengths are dimensionless.',
+        '@ Excitation energy',
+        'Vibrational Frequencies and IR Intensities',
+        'Rotational constants',
+        'Total mass:',
+        'Spatial symmetry',
+        'Final geometry (xyz format; angstrom)',
+        'Cartesian Coordinates',
+        'Normal Coordinates (bohrs',
+        'Iter      Total energy',
+        'DIIS converged in',
+        'Norm of gradient'
+    )
+
+    # Criteria printed at every step of a geometry optimization
+    convergence_criteria = ('Norm of gradient', 'Norm of step')
+
+    # Line of a pair of components of a polarizability tensor, capturing the two components
+    dipole_pair = re.compile(r'<<\s*([XYZ])DIPLEN\s*;\s*([XYZ])DIPLEN\s*>>')
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('SEVERE ERROR, PROGRAM WILL BE ABORTED',), 'normal': ('Total wall time used in DALTON',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Complex_propagator': [ExtractionSpec('Averaged value', ['complex_propagator'], [(0, -3), (0, -2), (0, -1)], conversion=lambda values: [[Floats(values)]], occurrence='all', error='polarizability with damping')],
+        '_Energy': [ExtractionSpec('Total .*  energy:', ['tot_energy'], [(0, -1)], error='final energy'),
+                    ExtractionSpec('@    Final .* energy:', ['tot_energy'], [(0, -1)], error='final energy'),
+                    ExtractionSpec('@ Energy at final geometry is', ['tot_energy'], [(0, -2)], error='final energy')],
+        '_ZPV': [ExtractionSpec('Total Molecular Energy', ['zpv'], [(5, 1)], error='zero-point energy')],
+        '_Dipole_moments': [ExtractionSpec('Dipole moment components', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(5, 1), (6, 1), (7, 1), (-3, 0)], error='dipole moment')],
+        '_Polarizabilities': [ExtractionSpec('SECOND ORDER PROPERTIES', ['polx', 'poly', 'polz', 'iso_polar'], [(2, -1), (5, -1), (7, -1)], conversion=lambda values: Floats(values) + [sum(Floats(values)) / 3.], error='polarizabilities')],
+        '_RotationalConsts': [ExtractionSpec('Rotational constants', ['rots'], [(7, slice(None, -1))], conversion=RotationalConstants(1E-3), error='rotational constants')],
+        '_Mass': [ExtractionSpec('Total mass:', ['mass'], [(0, -2)], error='molecular mass', default=0.0)],
+        '_Multiplicity': [ExtractionSpec('Spatial symmetry', ['multi'], [(0, 2)], conversion=Integers, error='multiplicity', default=0)],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_CPUS': 'tail'}
+
+    def __init__(self, filename: str, NeededArguments: dict = None, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.NeededArguments = NeededArguments
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
 
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _Complex_propagator(self) -> None:
-        linenumbers = Forward_search_all(self.filename, 'Averaged value', 'polarizability with damping', quiet=self.quiet)
-        if isinstance(linenumbers, list):
-            self.complex_propagator = []
-            for i in linenumbers:
-                self.complex_propagator.append([float(self.lines[i].split()[-3]), float(self.lines[i].split()[-2]), float(self.lines[i].split()[-1])])
-            return
-        self.complex_propagator = 'NaN'
+        RunExtractionSpecs(self, ['_Complex_propagator'])
 
     def _CPUS(self) -> None:
-        linenumber = Backward_search_last(self.filename, 'Total CPU  time used in DALTON:', self.end, 'CPU time', quiet=self.quiet)
+        linenumber = Backward_search_last(self.file, 'Total CPU  time used in DALTON:', self.end, 'CPU time', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.total_cpu_time = 0.
             self.wall_cpu_time = 0.
@@ -984,10 +1980,9 @@ class DaltonExtract:
                 elif i*2 == 6:
                     self.total_cpu_time += float(time_value) * 60 * 24
                 else:
-                    with open("collect_data.log", "a") as logfile:
-                        logfile.write('''It was not expected that DALTON would print anything larger than days in the total CPU time
+                    Log('''It was not expected that DALTON would print anything larger than days in the total CPU time
 This will not be accounted for when printing the CPU time. The result will therefore not be correct
-Please contact a maintainer of the script ot have this updated\n''')
+Please contact a maintainer of the script ot have this updated''', WARNING, 'CPU time', self.filename)
             for i, time_value in enumerate(pr_time[-2::-2]):
                 if i*2 == 0:
                     self.wall_cpu_time += float(time_value) / 60
@@ -998,118 +1993,161 @@ Please contact a maintainer of the script ot have this updated\n''')
                 elif i*2 == 6:
                     self.wall_cpu_time += float(time_value) * 60 * 24
                 else:
-                    with open("collect_data.log", "a") as logfile:
-                        logfile.write('''It was not expected that DALTON would print anything larger than days in the total CPU time
+                    Log('''It was not expected that DALTON would print anything larger than days in the total CPU time
 This will not be accounted for when printing the CPU time. The result will therefore not be correct
-Please contact a maintainer of the script ot have this updated\n''')
+Please contact a maintainer of the script ot have this updated''', WARNING, 'CPU time', self.filename)
             return
         self.wall_cpu_time = 'NaN'
         self.total_cpu_time = 'NaN'
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Total .*  energy:', 'final energy', quiet=True)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-1])
-            return
-        linenumber = Forward_search_last(self.filename, '@    Final .* energy:', 'final energy', quiet=True)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-1])
-            return
-        linenumber = Forward_search_last(self.filename, '@ Energy at final geometry is', 'final energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.tot_energy = float(self.lines[linenumber].split()[-2])
-            return
-        self.tot_energy = 'NaN'
+        RunExtractionSpecs(self, ['_Energy'])
 
     def _ZPV(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Total Molecular Energy', 'zero-point energy', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.zpv = float(self.lines[linenumber+5].split()[1])
-            return
-        self.zpv = 'NaN'
+        RunExtractionSpecs(self, ['_ZPV'])
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Dipole moment components', 'dipole moment', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber+5].split()[1]), float(self.lines[linenumber+6].split()[1]), float(self.lines[linenumber+7].split()[1]), float(self.lines[linenumber-3].split()[0])
-            return
-        self.dipolex = self.dipoley = self.dipolez = self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
     def _Polarizabilities(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'SECOND ORDER PROPERTIES', 'polarizabilities', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.polx, self.poly, self.polz = float(self.lines[linenumber+2].split()[-1]), float(self.lines[linenumber+5].split()[-1]), float(self.lines[linenumber+7].split()[-1])
-            self.iso_polar = (self.polx + self.poly + self.polz)/3.
+        RunExtractionSpecs(self, ['_Polarizabilities'])
+
+    def _Polarizability_Tensors(self) -> None:
+        tensors = []
+        frequencies = []
+        # Every frequency is printed under an anchor of its own, with each pair of components on a line, e.g. @ -<< XDIPLEN  ; YDIPLEN  >> =  7.85E+00
+        # Pairs which are zero by symmetry are not printed
+        for linenumber in self.file.FindAll('SECOND ORDER PROPERTIES'):
+            tensor = np.zeros((3, 3))
+            found = False
+            for line in self.lines[linenumber+1:linenumber+12]:
+                if 'SECOND ORDER PROPERTIES' in line:
+                    break
+                pair = self.dipole_pair.search(line)
+                if pair is not None:
+                    i, j = 'XYZ'.index(pair.group(1)), 'XYZ'.index(pair.group(2))
+                    tensor[i, j] = tensor[j, i] = float(line.split()[-1].replace('D', 'E'))
+                    found = True
+            if found:
+                tensors.append(tensor)
+                # Static properties are printed without a frequency
+                frequency = re.findall(r'\d+\.\d*', self.lines[linenumber])
+                frequencies.append(float(frequency[-1]) if len(frequency) > 0 else 0.0)
+        if len(tensors) == 0:
+            missing = _LogMissing(self.file, 'polarizability tensors', self.quiet)
+            self.polarizability_tensors = self.polarizability_frequencies = missing
             return
-        self.polx = self.poly = self.polz = self.iso_polar = 'NaN'
-
-    def _Excitation_energies(self) -> None:
-        self.exc_energies = []
-        self.exc_type = None
-        linenumber = Forward_search_last(self.filename, '@  Oscillator strengths are dimensionless.', 'excitation energies', quiet=True)
+        self.polarizability_tensors = np.array(tensors)
+        self.polarizability_frequencies = np.array(frequencies)
+
+    def _Excited_States(self) -> None:
+        energies = []
+        strengths = []
+        self.exc_symmetries = []
+        # Excitation energies and oscillator strengths of response calculations with .EXCITA are printed in a table
+        linenumber = Forward_search_last(self.file, '@  Oscillator strengths are dimensionless.', 'excitation energies', quiet=True)
         if isinstance(linenumber, int):
-            self.exc_type = '.EXCITA'
             for i in self.lines[linenumber+5: self.end]:
-                if "@ "in i:
-                    self.exc_energies.append(float(i.split()[3])* self.constants.ev_to_au)
-                else:
+                if "@ " not in i:
                     break
-        linenumbers = Forward_search_all(self.filename, '@ Excitation energy', 'excitation energies', quiet=self.quiet)
-        if isinstance(linenumbers, list):
-            self.exc_type = 'MCTDHF'
-            for i in linenumbers:
-                self.exc_energies.append(float(self.lines[i].split()[-2]))
-        if len(self.exc_energies) == 0:
-            self.exc_energies = ['NaN']
+                energies.append(float(i.split()[3]) * self.constants.ev_to_au)
+                strengths.append([float(i.split()[-1]), 0.0, 0.0])
+                self.exc_symmetries.append('NaN')
+        moments = [[np.nan] * 3 for _ in energies]
+        # Every excited state is printed with its symmetry, followed by the oscillator strength and transition moment of every dipole component
+        # The states are read in a single pass through the lines from the first state to the last. The symmetry is printed 3 lines before the excitation energy
+        states = self.file.FindAll('@ Excitation energy')
+        if len(states) > 0:
+            component = None
+            for line in self.lines[max(0, states[0]-3): min(self.end, states[-1]+15)]:
+                if '@ Excited state no:' in line:
+                    self.exc_symmetries.append(line.split('(')[-1].split(')')[0].strip())
+                elif '@ Excitation energy' in line:
+                    energies.append(float(line.split()[-2]))
+                    strengths.append([0.0, 0.0, 0.0])
+                    moments.append([np.nan] * 3)
+                    if len(self.exc_symmetries) < len(energies):
+                        self.exc_symmetries.append('NaN')
+                elif '@ Operator type:' in line:
+                    component = 'XYZ'.index(line.split()[-1][0]) if line.split()[-1][1:] == 'DIPLEN' else None
+                elif '@ Oscillator strength' in line and component is not None and len(energies) > 0:
+                    strengths[-1][component] = float(line.split()[5])
+                    moments[-1][component] = float(line.split()[-2])
+        if len(energies) == 0:
+            missing = _LogMissing(self.file, 'excitation energies', self.quiet)
+            self.exc_energies = self.osc_strengths = [missing]
+            self.transition_moments = self.exc_symmetries = missing
+            return
+        self.exc_energies = energies
+        # The oscillator strength of a state is combined from those of the dipole components
+        self.osc_strengths = np.sqrt(np.square(strengths).sum(axis=1)).tolist()
+        self.transition_moments = np.array(moments)
+
+    @Requires('_Excited_States')
+    def _Excitation_energies(self) -> None:
+        # Extracted together with the other properties of the excited states, see _Excited_States
+        pass
 
+    @Requires('_Excited_States')
     def _Oscillator_strengths(self) -> None:
-        self.osc_strengths = []
-        if self.exc_type == '.EXCITA':
-            linenumber = Forward_search_last(self.filename, '@  Oscillator strengths are dimensionless.', 'oscillator strengths', quiet=self.quiet)
-            if isinstance(linenumber, int):
-                for i in self.lines[linenumber+5: self.end]:
-                    if "@ " in i:
-                        self.osc_strengths.append(float(i.split()[-1]))
-                    else:
-                        break
-        elif self.exc_type == 'MCTDHF':
-            linenumbers = Forward_search_all(self.filename, '@ Excitation energy', 'oscillator strengths', quiet=self.quiet)
-            if isinstance(linenumbers, list):
-                for i in linenumbers:
-                    osc = 0
-                    for j in self.lines[i:i+15]:
-                        if '@ Oscillator strength' in j:
-                            osc += float(j.split()[5])**2
-                    self.osc_strengths.append(osc**0.5)
-        if len(self.osc_strengths) == 0:
-            self.osc_strengths = ['NaN']
+        # Extracted together with the other properties of the excited states, see _Excited_States
+        pass
 
     def _Frequencies(self) -> None:
         self.freq = []
-        linenumber = Forward_search_last(self.filename, 'Vibrational Frequencies and IR Intensities', 'frequencies', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, 'Vibrational Frequencies and IR Intensities', 'frequencies', quiet=self.quiet)
         if isinstance(linenumber, int):
-            for i in self.lines[linenumber+7: self.end]:
-                if len(i.split()) < 1:
-                    break
-                self.freq.append(float(i.split()[3]))
+            start = end = linenumber+7
+            while end < self.end and len(self.lines[end].split()) > 0:
+                end += 1
+            self.freq = ParseTable(self.file.Block(start, end), 3).tolist()
         if len(self.freq) == 0:
             self.freq = ['NaN']
 
+    def _Normal_Modes(self) -> None:
+        linenumber = Forward_search_last(self.file, 'Vibrational Frequencies and IR Intensities', 'IR intensities', quiet=self.quiet)
+        coordinates = Forward_search_last(self.file, 'Normal Coordinates (bohrs', 'normal modes', quiet=self.quiet)
+        if not isinstance(linenumber, int) or not isinstance(coordinates, int):
+            self.normal_modes = self.ir_intensities = self.reduced_masses = 'NaN'
+            return
+        start = end = linenumber+7
+        while end < self.end and len(self.lines[end].split()) > 0:
+            end += 1
+        self.ir_intensities = ParseTable(self.file.Block(start, end), -2)
+        modes = len(self.ir_intensities)
+        # The modes are printed in blocks of up to 5 columns, each starting with a line of the mode numbers underlined by dashes
+        headers = []
+        linenumber = coordinates + 2
+        while linenumber < self.end and len(headers) * 5 < modes:
+            if self.lines[linenumber].strip().startswith('---'):
+                headers.append(linenumber)
+            linenumber += 1
+        coordinates = 0
+        for line in self.lines[headers[0]+1:]:
+            words = line.split()
+            if len(words) > 1 and words[1] in ('x', 'y', 'z'):
+                coordinates += 1
+            elif len(words) > 0:
+                break
+        atoms = coordinates // 3
+        # The array is filled a block at a time, so only the displacements of a single block are held as text
+        self.normal_modes = np.empty((modes, atoms, 3))
+        for i, header in enumerate(headers):
+            width = min(5, modes - 5 * i)
+            # Every atom is printed as a line per coordinate followed by an empty line
+            displacements = ParseTable(self.file.Block(header + 1, header + 1 + 4 * atoms), slice(2, None), width=2 + width)
+            self.normal_modes[5*i:5*i+width] = displacements.reshape(atoms, 3, width).transpose(2, 0, 1)
+        # The displacements are of normalized mass-weighted modes, so the reduced masses are the inverse of their squared norms
+        norms = np.einsum('ijk,ijk->i', self.normal_modes, self.normal_modes)
+        self.reduced_masses = 1 / norms
+        self.normal_modes /= np.sqrt(norms)[:, None, None]
+
     def _RotationalConsts(self) -> None:
-        self.rots = []
-        linenumbers = Forward_search_last(self.filename, 'Rotational constants', 'rotational constants', quiet=self.quiet)
-        for i in self.lines[linenumbers+7].split()[:-1]:
-            self.rots.append(float(i))
-        self.rots = np.array(self.rots) * 1E-3
-        self.rots = self.rots[self.rots != 0.0]
+        RunExtractionSpecs(self, ['_RotationalConsts'])
 
     def _Mass(self) -> None:
-        self.mass = 0.0
-        linenumber = Forward_search_last(self.filename, 'Total mass:', 'molecular mass')
-        if isinstance(linenumber, int):
-            self.mass = float(self.lines[linenumber].split()[-2])
+        RunExtractionSpecs(self, ['_Mass'])
 
-    #Symmetry checking not implemented by default in Dalton
     #def _SymmetryNumber(self):
     #
     #    self.symnum = 0
@@ -1118,21 +2156,16 @@ Please contact a maintainer of the script ot have this updated\n''')
     #        self.symnum = int(self.lines[linenumber].split()[-1])
 
     def _Multiplicity(self) -> None:
-        self.multi = 0
-        linenumber = Forward_search_last(self.filename, 'Spatial symmetry', 'multiplicity', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.multi = int(self.lines[linenumber].split()[2])
+        RunExtractionSpecs(self, ['_Multiplicity'])
 
+    @Requires('_Frequencies')
     def _PartitionFunctions(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.qTotal = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._Multiplicity()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_Multiplicity'])
         self.qT = self.constants.trans_const_fac * self.mass ** (1.5) * self.T ** (2.5)
         #Rotational does not give the same as Dalton, due to a correction from the assymmetric top being applied: 10.1063/1.1748490
         if len(self.rots) == 1:
@@ -1145,16 +2178,14 @@ Please contact a maintainer of the script ot have this updated\n''')
         self.qE = self.multi #Good approximation for most closed-shell molecules
         self.qTotal = self.qT*self.qR*self.qV*self.qE
 
+    @Requires('_Frequencies')
     def _Entropy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.entropy = 'NaN'
             return
-        self._RotationalConsts()
-        self._Mass()
-        self._Multiplicity()
+        Resolve(self, ['_RotationalConsts', '_Mass', '_Multiplicity'])
         self.S_T = self.constants.gas_constant * np.log(self.constants.s_trans_const * self.mass ** 1.5 * self.T ** 2.5)
         if len(self.rots) == 1:
             self.S_R = self.constants.gas_constant * np.log(self.constants.rot_lin_const * self.T / (self.rots[0]))
@@ -1166,14 +2197,14 @@ Please contact a maintainer of the script ot have this updated\n''')
         self.S_E = self.constants.gas_constant * np.log(self.multi) #Good approximation for most closed-shell molecules
         self.entropy = self.S_T+self.S_R+self.S_V+self.S_E
 
+    @Requires('_Energy', '_Frequencies')
     def _Enthalpy(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping partition function calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping partition function calculation", SKIPPED, 'partition function calculation', self.filename)
             self.enthalpy = 'NaN'
             return
-        self._RotationalConsts()
+        Resolve(self, ['_RotationalConsts'])
         self.E_T = 3/2 * self.T * self.constants.gas_constant
         if len(self.rots) == 1:
             self.E_R = self.T * self.constants.gas_constant
@@ -1185,30 +2216,35 @@ Please contact a maintainer of the script ot have this updated\n''')
         self.E_e = 0 #Good approximation for most closed-shell molecules
         self.enthalpy = (self.E_T+self.E_R+self.E_V+self.constants.gas_constant *  self.T ) / self.constants.au_to_kJmol + self.tot_energy
 
+    @Requires('_Frequencies', '_Enthalpy', '_Entropy')
     def _Gibbs(self) -> None:
         if CheckForOnlyNans(np.array(self.freq)):
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f"No frequencies found in {self.filename}, skipping free energy energy calculation\n")
+                Log(f"No frequencies found in {self.filename}, skipping free energy energy calculation", SKIPPED, 'free energy calculation', self.filename)
             self.gibbs = 'NaN'
             return
         self.gibbs = self.enthalpy - self.T*self.entropy / self.constants.au_to_kJmol
 
+    def _SCF_Convergence(self) -> None:
+        ReadSCFConvergence(self, 'Iter      Total energy', 'DIIS converged in', rb'^@ +\d+ +(-\d+\.\d+) ', -3)
+
+    def _Optimization_Convergence(self) -> None:
+        ReadNormConvergence(self)
+
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'Final geometry (xyz format; angstrom)', 'final geometry', quiet=self.quiet)
+        start = Forward_search_last(self.file, 'Final geometry (xyz format; angstrom)', 'final geometry', quiet=self.quiet)
         if start != "NaN":
             #Offset for going into actual coordinate list
             start += 5
             end = start + int(self.lines[start-2])
             #Which position in the line is the atom label / number at
             label_location = 0
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
-            GenerateXYZ(self.lines, OptGeomFilename, start, end, label_location)
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
+            GenerateXYZ(self.file, OptGeomFilename, start, end, label_location)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
         else:
-            start = Forward_search_last(self.filename, 'Cartesian Coordinates', 'initial geometry', quiet=self.quiet)
+            start = Forward_search_last(self.file, 'Cartesian Coordinates', 'initial geometry', quiet=self.quiet)
             if start != "NaN":
                 start += 4
                 end = start + int(int(self.lines[start-1].split(' ')[-1])/3)
@@ -1218,31 +2254,64 @@ Please contact a maintainer of the script ot have this updated\n''')
                 for line in self.lines[start:end]:
                     words = line.split()
                     lines_to_add.append(''.join([words[0].ljust(2),' ',f"{float(words[-7]) * self.constants.bohr_to_ao:.7f}".rjust(20),' ', f"{float(words[-4]) * self.constants.bohr_to_ao:.7f}".rjust(25), ' ',f"{float(words[-1]) * self.constants.bohr_to_ao:.7f}".rjust(25) ,'\n']))
-                OptGeomFilename = self.filename[:-4] + "_opt.xyz"
+                OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
                 WriteToFile(OptGeomFilename,lines_to_add)
                 if not(self.quiet):
-                    with open("collect_data.log", "a") as logfile:
-                        logfile.write("Initial geometry has been saved to " + OptGeomFilename + "\n")
+                    Log("Initial geometry has been saved to " + OptGeomFilename, SAVED, 'initial geometry', self.filename)
 
 
 class LSDaltonExtract:
-    def __init__(self, filename: str, NeededArguments: dict = None, Quiet: bool = False, Temperature: float = 298.15) -> None:
+    # Search strings used by the methods below. All of them are located in a single pass through the file when it is read
+    anchors = (
+        '>>>  CPU Time used in LSDALTON is',
+        'ENERGY SUMMARY',
+        'Final .* energy:',
+        'Permanent dipole moment',
+        '*          POLARIZABILITY TENSOR RESULTS (in a.u.)          *',
+        '*                   ONE-PHOTON ABSORPTION RESULTS (in a.u.)                  *',
+        'excitation energies',
+        'Final geometry',
+        'PRINTING THE MOLECULE.INP FILE',
+        'SCF Convergence criteria for gradient norm',
+        'SCF converged in',
+        'Norm of gradient'
+    )
+
+    # Criteria printed at every step of a geometry optimization
+    convergence_criteria = ('Norm of gradient', 'Norm of step')
+
+    # Lines printed when the program stops, by the status of the job. Error banners are looked for first, see JobStatus
+    termination = {'error': ('SEVERE ERROR, PROGRAM WILL BE ABORTED',), 'normal': ('End simulation',)}
+
+    # Where the quantities extracted by RunExtractionSpecs are printed. Alternatives for a quantity are tried in order
+    specs = {
+        '_Dipole_moments': [ExtractionSpec('Permanent dipole moment', ['dipolex', 'dipoley', 'dipolez', 'total_dipole'], [(9, 1), (10, 1), (11, 1), (3, 0)], error='dipole moment')],
+        '_Polarizabilities': [ExtractionSpec('*          POLARIZABILITY TENSOR RESULTS (in a.u.)          *', ['polx', 'poly', 'polz', 'iso_polar'], [(10, -3), (11, -2), (12, -1), (14, -1)], error='polarizability')],
+    }
+
+    # Quantities printed near the start or the end of the output files. When extraction is planned these are only read from that region of the file, see Plan
+    regions = {'_CPUS': 'tail'}
+
+    def __init__(self, filename: str, NeededArguments: dict = None, Quiet: bool = False, Temperature: float = 298.15, Stream: BinaryIO = None, Region: str = None) -> None:
         self.filename = filename
         self.NeededArguments = NeededArguments
         self.quiet = Quiet
         self.T = Temperature
         self.constants = Constants()
 
-        self.ReadFile()
+        self.ReadFile(Stream, Region)
 
         self.end = len(self.lines)
 
-    def ReadFile(self) -> None:
-        with open(self.filename, "r") as file:
-            self.lines = file.readlines()
+        # The attributes set when the extraction class is created, which every job starts from, see SplitJobs
+        self.initial = dict(self.__dict__)
+
+    def ReadFile(self, stream: BinaryIO = None, region: str = None) -> None:
+        self.file = OutputFile(self.filename, anchors=self.anchors, stream=stream, region=region)
+        self.lines = self.file.lines
 
     def _CPUS(self) -> None:
-        linenumber = Backward_search_last(self.filename, '>>>  CPU Time used in LSDALTON is', self.end, 'CPU time', quiet=self.quiet)
+        linenumber = Backward_search_last(self.file, '>>>  CPU Time used in LSDALTON is', self.end, 'CPU time', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.total_cpu_time = 0.
             self.wall_cpu_time = 0.
@@ -1258,10 +2327,9 @@ class LSDaltonExtract:
                 elif i*2 == 6:
                     self.total_cpu_time += float(time_value) * 60 * 24
                 else:
-                    with open("collect_data.log", "a") as logfile:
-                        logfile.write('''It was not expected that LSDALTON would print anything larger than days in the total CPU time
+                    Log('''It was not expected that LSDALTON would print anything larger than days in the total CPU time
 This will not be accounted for when printing the CPU time. The result will therefore not be correct
-Please contact a maintainer of the script ot have this updated\n''')
+Please contact a maintainer of the script ot have this updated''', WARNING, 'CPU time', self.filename)
             for i, time_value in enumerate(pr_time[-2::-2]):
                 if i*2 == 0:
                     self.wall_cpu_time += float(time_value) / 60
@@ -1272,108 +2340,136 @@ Please contact a maintainer of the script ot have this updated\n''')
                 elif i*2 == 6:
                     self.wall_cpu_time += float(time_value) * 60 * 24
                 else:
-                    with open("collect_data.log", "a") as logfile:
-                        logfile.write('''It was not expected that LSDALTON would print anything larger than days in the total CPU time
+                    Log('''It was not expected that LSDALTON would print anything larger than days in the total CPU time
 This will not be accounted for when printing the CPU time. The result will therefore not be correct
-Please contact a maintainer of the script ot have this updated\n''')
+Please contact a maintainer of the script ot have this updated''', WARNING, 'CPU time', self.filename)
             return
         self.total_cpu_time = 'NaN'
         self.wall_cpu_time = 'NaN'
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Total .*  energy:', 'final energy', quiet=True)
+        linenumber = Forward_search_last(self.file, 'Total .*  energy:', 'final energy', quiet=True)
         if isinstance(linenumber, int):
             self.tot_energy = float(self.lines[linenumber].split()[-1])
             return
-        linenumber = Forward_search_last(self.filename, '@    Final .* energy:', 'final energy', quiet=True)
+        linenumber = Forward_search_last(self.file, '@    Final .* energy:', 'final energy', quiet=True)
         if isinstance(linenumber, int):
             self.tot_energy = float(self.lines[linenumber].split()[-1])
             return
-        linenumber = Forward_search_last(self.filename, '@ Energy at final geometry is', 'final energy', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, '@ Energy at final geometry is', 'final energy', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.tot_energy = float(self.lines[linenumber].split()[-2])
             return
         self.tot_energy = 'NaN'
 
     def _Energy(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'ENERGY SUMMARY', 'final energy', quiet=True)
+        linenumber = Forward_search_last(self.file, 'ENERGY SUMMARY', 'final energy', quiet=True)
         if isinstance(linenumber, int):
             for i in self.lines[linenumber+3:self.end]:
                 if 'E: ' in i:
                     self.tot_energy = float(i.split()[-1])
                 else:
                     return
-        linenumber = Forward_search_last(self.filename, 'Final .* energy:', 'final energy', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, 'Final .* energy:', 'final energy', quiet=self.quiet)
         if isinstance(linenumber, int):
             self.tot_energy = float(self.lines[linenumber].split()[-1])
             return
         self.tot_energy = 'NaN'
 
     def _Dipole_moments(self) -> None:
-        linenumber = Forward_search_last(self.filename, 'Permanent dipole moment', 'dipole moment', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.dipolex, self.dipoley, self.dipolez, self.total_dipole = float(self.lines[linenumber+9].split()[1]), float(self.lines[linenumber+10].split()[1]), float(self.lines[linenumber+11].split()[1]), float(self.lines[linenumber+3].split()[0])
-            return
-        self.dipolex = self.dipoley = self.dipolez = self.total_dipole = 'NaN'
+        RunExtractionSpecs(self, ['_Dipole_moments'])
 
     def _Polarizabilities(self) -> None:
-        linenumber = Forward_search_last(self.filename, '*          POLARIZABILITY TENSOR RESULTS (in a.u.)          *', 'polarizability', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            self.polx, self.poly, self.polz, self.iso_polar = float(self.lines[linenumber+10].split()[-3]), float(self.lines[linenumber+11].split()[-2]), float(self.lines[linenumber+12].split()[-1]), float(self.lines[linenumber+14].split()[-1])
+        RunExtractionSpecs(self, ['_Polarizabilities'])
+
+    def _Polarizability_Tensors(self) -> None:
+        frequencies = []
+        for linenumber in self.file.FindAll('*          POLARIZABILITY TENSOR RESULTS (in a.u.)          *'):
+            for i in range(linenumber+1, self.end):
+                if 'End of polarizability calculation' in self.lines[i]:
+                    break
+                if 'Frequency =' in self.lines[i]:
+                    frequencies.append(i)
+        if len(frequencies) == 0:
+            missing = _LogMissing(self.file, 'polarizability tensors', self.quiet)
+            self.polarizability_tensors = self.polarizability_frequencies = missing
             return
-        self.polx = self.poly = self.polz = self.iso_polar = 'NaN'
+        self.polarizability_frequencies = np.array([float(self.lines[i].split()[-1]) for i in frequencies])
+        #Offset for going into the tensors, which are parsed together
+        block = b''.join(self.file.Block(i+4, i+7) for i in frequencies)
+        self.polarizability_tensors = ParseTable(block, slice(1, 4)).reshape(len(frequencies), 3, 3)
 
-    def _Excitation_energies(self) -> None:
+    def _Excited_States(self) -> None:
+        linenumber = Forward_search_last(self.file, '*                   ONE-PHOTON ABSORPTION RESULTS (in a.u.)                  *', 'excitation energies', quiet=self.quiet)
+        if isinstance(linenumber, int):
+            #Offset for going into the table, which has a row per state of the energy, the transition moment components and the oscillator strength
+            start = end = linenumber+8
+            while end < self.end and len(self.lines[end].split()) > 0:
+                end += 1
+            table = ParseTable(self.file.Block(start, end), width=5)
+            if len(table) > 0:
+                self.exc_energies = table[:, 0].tolist()
+                self.transition_moments = table[:, 1:4]
+                self.osc_strengths = table[:, 4].tolist()
+                # LSDalton does not use symmetry
+                self.exc_symmetries = ['NaN'] * len(table)
+                return
+        # Only the excitation energies are printed when no transition moments are calculated
         self.exc_energies = []
-        linenumber = Forward_search_last(self.filename, '*                   ONE-PHOTON ABSORPTION RESULTS (in a.u.)                  *', 'excitation energies', quiet=self.quiet)
+        linenumber = Forward_search_last(self.file, 'excitation energies', 'excitation energies', quiet=self.quiet)
         if isinstance(linenumber, int):
-            for i in range(linenumber+8,self.end):
+            for i in range(linenumber+4,self.end):
                 if len(self.lines[i].split()) < 1:
                     break
-                self.exc_energies.append(float(self.lines[i].split()[0]))
-        else:
-            linenumber = Forward_search_last(self.filename, 'excitation energies', 'excitation energies', quiet=self.quiet)
-            if isinstance(linenumber, int):
-                for i in range(linenumber+4,self.end):
-                    if len(self.lines[i].split()) < 1:
-                        break
-                    try:
-                        self.exc_energies.append(float(self.lines[i].split()[1]))
-                    except ValueError:
-                        break
+                try:
+                    self.exc_energies.append(float(self.lines[i].split()[1]))
+                except ValueError:
+                    break
         if len(self.exc_energies) == 0:
             self.exc_energies = ['NaN']
+        self.osc_strengths = ['NaN']
+        self.transition_moments = self.exc_symmetries = 'NaN'
 
+    @Requires('_Excited_States')
+    def _Excitation_energies(self) -> None:
+        # Extracted together with the other properties of the excited states, see _Excited_States
+        pass
+
+    @Requires('_Excited_States')
     def _Oscillator_strengths(self) -> None:
-        self.osc_strengths = []
-        linenumber = Forward_search_last(self.filename, '*                   ONE-PHOTON ABSORPTION RESULTS (in a.u.)                  *', 'oscillator strengths', quiet=self.quiet)
-        if isinstance(linenumber, int):
-            for i in range(len(self.exc_energies)):
-                self.osc_strengths.append(float(self.lines[linenumber+8+i].split()[-1]))
-        if len(self.osc_strengths) == 0:
-            self.osc_strengths = ['NaN']
+        # Extracted together with the other properties of the excited states, see _Excited_States
+        pass
+
+    def _SCF_Convergence(self) -> None:
+        # Every iteration is marked with ### at the end of the line
+        ReadSCFConvergence(self, 'SCF Convergence criteria for gradient norm', 'SCF converged in', rb'^ +\d+ +(-\d+\.\d+) .*###', -2)
+
+    def _Optimization_Convergence(self) -> None:
+        ReadNormConvergence(self)
 
     def _Optimized_Geometry(self) -> None:
-        start = Forward_search_last(self.filename, 'Final geometry', 'geometry', quiet=self.quiet)
+        start = Forward_search_last(self.file, 'Final geometry', 'geometry', quiet=self.quiet)
         if start != "NaN":
             #Offset for going into actual coordinate list
             start += 6
             atoms_in_molecule = int(int(self.lines[start-3].split()[-1])/3)
             end = start + atoms_in_molecule*4
+            # Every atom is printed as the lines '1 O x value', '2 y value' and '3 z value' followed by an empty line, which are parsed as rows of 10 values
+            # The last atom is not followed by an empty line
+            block = self.file.Block(start, end-1)
+            labels = ParseTable(block, 1, width=10, dtype=str)
+            coordinates = ParseTable(block, [3, 6, 9], width=10) * self.constants.bohr_to_ao
             lines_to_add = []
             lines_to_add.append(str(atoms_in_molecule)+ '\n')
             lines_to_add.append('\n')
-            for i, _ in enumerate(self.lines[start:end:4]):
-                linenr = start + i*4
-                # print(i, start-end)
-                lines_to_add.append(''.join([self.lines[linenr].split()[1].ljust(2),' ', f"{float(self.lines[linenr].split()[-1]) * self.constants.bohr_to_ao:.7f}".rjust(20),' ', f"{float(self.lines[linenr+1].split()[-1]) * self.constants.bohr_to_ao:.7f}".rjust(25),' ', f"{float(self.lines[linenr+2].split()[-1]) * self.constants.bohr_to_ao:.7f}".rjust(25), '\n']))
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
+            for label, (x, y, z) in zip(labels, coordinates):
+                lines_to_add.append(''.join([label.ljust(2),' ', f"{x:.7f}".rjust(20),' ', f"{y:.7f}".rjust(25),' ', f"{z:.7f}".rjust(25), '\n']))
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
             WriteToFile(OptGeomFilename,lines_to_add)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
         else:
-            start = Forward_search_last(self.filename, 'PRINTING THE MOLECULE.INP FILE', 'initial geometry', quiet=self.quiet)
+            start = Forward_search_last(self.file, 'PRINTING THE MOLECULE.INP FILE', 'initial geometry', quiet=self.quiet)
             if start != "NaN":
                 start += 7
                 current_line = start
@@ -1389,8 +2485,19 @@ Please contact a maintainer of the script ot have this updated\n''')
                         current_line += i+2
                         atoms_in_molecule += i+1
                 lines_to_add[0] = f"{atoms_in_molecule}\n"
-            OptGeomFilename = self.filename[:-4] + "_opt.xyz"
+            OptGeomFilename = StripCompressionExtension(self.filename)[:-4] + "_opt.xyz"
             WriteToFile(OptGeomFilename,lines_to_add)
             if not(self.quiet):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write("Final geometry has been saved to " + OptGeomFilename + "\n")
+                Log("Final geometry has been saved to " + OptGeomFilename, SAVED, 'final geometry', self.filename)
+
+
+# Signatures of the programs output files can be extracted from, checked in order by DetectOutputFormat
+# Support for another program is added by appending its signature
+OUTPUT_FORMATS = [
+    OutputFormat('ORCA', OrcaExtract, '* O   R   C   A *', 4),
+    OutputFormat('DALTON', DaltonExtract, '*************** Dalton - An Electronic Structure Program ***************', 3),
+    OutputFormat('GAUSSIAN', GaussianExtract, 'Gaussian, Inc.  All Rights Reserved.', 6),
+    OutputFormat('LSDALTON', LSDaltonExtract, '**********  LSDalton - An electronic structure program  **********', 2),
+    OutputFormat('VELOXCHEM', VeloxExtract, 'VELOXCHEM', 2),
+    OutputFormat('Amsterdam Modeling Suite', AMSExtract, 'Amsterdam Modeling Suite (AMS)'),
+]
@@ -13,5 +13,6 @@ setup(
     long_description=open('README.md').read(),
     long_description_content_type="text/markdown",
     install_requires=['numpy >= 1.13.0', 'requests >= 2.4', 'ase >= 3.19.0', 'matplotlib'],
+    extras_require={'zstd': ['zstandard']},
     python_requires='>=3.6'
 )
\ No newline at end of file
@@ -3,15 +3,24 @@ import argparse
 import os
 import sys
 import time
+import signal
+import threading
+import traceback
 import numpy as np
 from KurtGroup.Kurt import output_processing as op
+from KurtGroup.Kurt import extraction_cache
+from KurtGroup.Kurt import extraction_log
+from KurtGroup.Kurt import follow
 from functools import partial
+from contextlib import contextmanager
 from multiprocessing import Pool, cpu_count
 import matplotlib.pyplot as plt
 from matplotlib import rc
 from types import FunctionType
+import csv
 import json
 import copy
+import pickle
 
 
 #*************************** INPUT PARSING ****************************
@@ -120,40 +129,254 @@ def Resize(array: list) -> None:
         else:
             array[i] += ['NaN'] * (max_size - len(arr))
 
-def Data_Extraction(infile, Needed_Values: dict, quiet: bool = False, Temperature: float = 298.15) -> dict:
+def Data_Extraction(infile, Needed_Values: dict, quiet: bool = False, Temperature: float = 298.15, Attributes: list = None, Jobs: bool = False, Fchk: bool = True, Properties: bool = True) -> dict:
     Extracted_values = dict()
 
-    infile = op.OutputType(str(infile), Quiet=quiet, Temperature=Temperature)
+    # Only the regions of the file needed for the requested values are read, see op.Plan
+    # Files split into jobs are read whole, as every job needs its own regions
+    # Gaussian output files are read from the formatted checkpoint file next to them where possible, unless Fchk is false
+    # ORCA output files are read from the property file next to them where possible, unless Properties is false
+    infile = op.OutputType(str(infile), Quiet=quiet, Temperature=Temperature, Methods=None if Jobs else Needed_Values, Fchk=Fchk, Properties=Properties)
 
-    # Extracting data
-    Extract_data(quiet, Needed_Values, infile.filename, infile.extract, infile.input)
+    # Output files of chained jobs are split into jobs, which are extracted one at a time and keyed by (filename, job index)
+    if Jobs:
+        extracts = [((infile.filename, index), job.extract) for index, job in enumerate(infile.Jobs())]
+    else:
+        extracts = [(infile.filename, infile.extract)]
+
+    for key, extract in extracts:
+        # Extracting data
+        Extract_data(quiet, Needed_Values, infile.filename, extract, infile.input)
+
+        # List of all dictionary keys for extract
+        dict_keys = [*extract.__dict__.keys()]
+
+        # Only the requested values are collected if these are given
+        # The extraction classes also hold the lines of the file, which should not be sent back from worker processes
+        if Attributes is not None:
+            dict_keys = [None] + [key for key in Attributes if key in extract.__dict__]
 
-    # List of all dictionary keys for infile.extract
-    dict_keys = [*infile.extract.__dict__.keys()]
+        # Dictionary
+        collection_dict = dict()
 
-    # Dictionary
-    collection_dict = dict()
+        # Collecting the data in dictionaries
+        for i in dict_keys[1:]:
+            collection_dict[i] = Plain_Value(extract.__dict__[i])
 
-    # Collecting the data in dictionaries
-    for i in dict_keys[1:]:
-        collection_dict[i] =  infile.extract.__dict__[i]
+        # Assigning to the Extracted_values dictionary with the filename as key so all data can be easily found in the future
+        Extracted_values[key] = collection_dict
 
-    # Assigning to the Extracted_values dictionary with the filename as key so all data can be easily found in the future
-    Extracted_values[infile.filename] = collection_dict
+        # Values read from other files than the output file are logged with the file they were read from
+        if not quiet:
+            sources = dict()
+            for attribute, source in getattr(extract, 'sources', dict()).items():
+                if attribute in collection_dict and source != infile.filename:
+                    sources.setdefault(source, []).append(attribute)
+            for source, attributes in sources.items():
+                extraction_log.Log(f"{', '.join(attributes)} of {infile.filename} were read from {source}", extraction_log.SOURCE, source, infile.filename)
+
+    # Large files are memory-mapped. These are released so long runs do not run out of file handles
+    # Checked in the attributes of the extraction class, as output files only read when needed should not be read here
+    if 'file' in vars(infile.extract):
+        infile.extract.file.close()
 
     return Extracted_values
 
+def Plain_Value(value):
+    # Numpy values are turned into floats and lists, which are smaller when pickled and are what the rest of the script expects
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, list):
+        return [Plain_Value(item) for item in value]
+    return value
+
+def Pickled_Data_Extraction(infile, **kwargs) -> bytes:
+    # Data_Extraction for worker processes. The values are pickled here so the amount of data sent back to the main process can be measured
+    return pickle.dumps(Data_Extraction(infile, **kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+
+@contextmanager
+def Time_Limit(seconds: float):
+    # Raises TimeoutError if the block takes more than [seconds]
+    # This needs SIGALRM, so there is no limit on systems without it or outside the main thread
+    if seconds is None or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def Timeout(signum, frame):
+        raise TimeoutError(f'Extraction took more than {seconds} seconds')
+
+    previous = signal.signal(signal.SIGALRM, Timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def Isolated_Data_Extraction(infile, Timeout: float = None, Pickled: bool = False, **kwargs) -> tuple:
+    """Runs Data_Extraction for a single file, so an error in the file or a file taking too long does not stop the extraction of other files
+
+    Args:
+        infile (str): File to extract from
+        Timeout (float, optional): Seconds the extraction may take. Defaults to None, which is no limit.
+        Pickled (bool, optional): If true the values are pickled, see Pickled_Data_Extraction. Defaults to False.
+        kwargs: Arguments given to Data_Extraction
+
+    Returns:
+        (tuple): The file, the extracted values and None. If the extraction failed the values are None and the failure is given as a dictionary of the file, the error, its traceback and whether it should be retried
+    """
+    try:
+        with Time_Limit(Timeout):
+            if Pickled:
+                return infile, Pickled_Data_Extraction(infile, **kwargs), None
+            return infile, Data_Extraction(infile, **kwargs), None
+    except Exception as error:
+        # Errors reading the file, e.g. from a network file system, may not happen again. Errors parsing the file and timeouts will
+        retry = isinstance(error, OSError) and not isinstance(error, TimeoutError)
+        return infile, None, {'file': str(infile), 'error': f'{type(error).__name__}: {error}', 'traceback': traceback.format_exc(), 'retry': retry, 'attempts': 1}
+
+def Parallel_Data_Extraction(input_files: list, suppressed: bool, Timeout: float = None, Failed: list = None, **kwargs):
+    """Runs Data_Extraction for [input_files] using half of the available CPUS
+
+    Every file is extracted by Isolated_Data_Extraction, so a file that can not be extracted does not stop the others
+
+    Args:
+        input_files (list): Files to extract from
+        suppressed (bool): If true the amount of data sent back from the worker processes is not written to collect_data.log
+        Timeout (float, optional): Seconds the extraction of a file may take. Defaults to None, which is no limit.
+        Failed (list, optional): The failures of files that could not be extracted are added to this, see Isolated_Data_Extraction. Defaults to None.
+        kwargs: Arguments given to Data_Extraction
+
+    Yields:
+        (dict): The values extracted from each file, in the order the files are done. Files that could not be extracted give an empty dictionary
+    """
+    received = 0
+    # The worker processes send what they log to the log writer of this process, so only this process writes to the log file
+    with Pool(max(1, int(cpu_count()/2)), initializer=extraction_log.UseQueue, initargs=(extraction_log.Writer().Queue(),)) as pool:
+        # The results are taken as soon as they are done, so a slow file does not hold back the files after it
+        for infile, result, failure in pool.imap_unordered(partial(Isolated_Data_Extraction, Timeout=Timeout, Pickled=True, **kwargs), input_files):
+            if failure is not None:
+                if Failed is not None:
+                    Failed.append(failure)
+                yield dict()
+                continue
+            received += len(result)
+            yield pickle.loads(result)
+        # The workers are stopped normally, so the records they have logged are sent before they exit
+        pool.close()
+        pool.join()
+    if not(suppressed):
+        extraction_log.Log(f'Received {received} bytes of extracted values from worker processes for {len(input_files)} files ({received / max(1, len(input_files)):.0f} bytes per file)')
+
 def Extract_data(suppressed: bool, Wanted_Values: dict, infile: str, file_text: dict, input_type: str) -> None:
-    # Loops over all requested values and runs the corresponding function
+    # Runs the functions of all requested values together with the functions they depend on, each only once
     # If the function has not been implemented it will print an error message
-    for i in Wanted_Values:
-        try:
-            method = getattr(type(file_text),i)
-            method(file_text)
-        except AttributeError:
-            if not(suppressed):
-                with open("collect_data.log", "a") as logfile:
-                    logfile.write(f'{infile}: {i} has not been implemented for {input_type}\n')
+    for i in op.Resolve(file_text, Wanted_Values):
+        if not(suppressed):
+            extraction_log.Log(f'{infile}: {i} has not been implemented for {input_type}', extraction_log.NOT_IMPLEMENTED, i, infile)
+
+def Retry_Failed_Extraction(Failed: list, Retries: int, Timeout: float = None, **kwargs) -> tuple:
+    """Extracts the files that failed with an error that may not happen again, e.g. from a network file system, once more up to [Retries] times, one at a time
+
+    Args:
+        Failed (list): The failures, see Isolated_Data_Extraction
+        Retries (int): Amount of times a file is tried again
+        Timeout (float, optional): Seconds the extraction of a file may take. Defaults to None, which is no limit.
+        kwargs: Arguments given to Data_Extraction
+
+    Returns:
+        (tuple): The failures of the files that still could not be extracted, and the values extracted from the others
+    """
+    ExtractedValues = dict()
+    for Attempt in range(2, Retries + 2):
+        Retry = [failure for failure in Failed if failure['retry']]
+        if len(Retry) == 0:
+            break
+        Failed = [failure for failure in Failed if not failure['retry']]
+        for failure in Retry:
+            _, result, newfailure = Isolated_Data_Extraction(failure['file'], Timeout, **kwargs)
+            if newfailure is None:
+                ExtractedValues.update(result)
+                continue
+            newfailure['attempts'] = Attempt
+            Failed.append(newfailure)
+    return Failed, ExtractedValues
+
+def Quarantine_Failed_Extraction(Failed: list, suppressed: bool, QuarantineFile: str) -> None:
+    # Logs the files that could not be extracted and lists them with their tracebacks in [QuarantineFile]
+    if len(Failed) == 0:
+        return
+    for failure in Failed:
+        if not(suppressed):
+            extraction_log.Log(f"{failure['file']} could not be extracted: {failure['error']}", extraction_log.FAILED, failure['error'].split(':')[0], failure['file'])
+    with open(QuarantineFile, 'w') as outfile:
+        json.dump(Failed, outfile, indent=4)
+    print(f'{len(Failed)} file(s) could not be extracted and have been listed in {QuarantineFile}')
+
+def Spectra_Data_Extraction(input_files: list, Multiprocessing: bool, suppressed: bool, Timeout: float = None, Retries: int = 1, QuarantineFile: str = 'collect_data_quarantine.json', **kwargs) -> dict:
+    """Extracts the values for spectra from [input_files]. Files that can not be extracted are quarantined and left out, see Isolated_Data_Extraction
+
+    Args:
+        input_files (list): Files to extract from
+        Multiprocessing (bool): If true the files are extracted by Parallel_Data_Extraction
+        suppressed (bool): If true nothing is written to collect_data.log
+        Timeout (float, optional): Seconds the extraction of a file may take. Defaults to None, which is no limit.
+        Retries (int, optional): Amount of times files that could not be read are tried again. Defaults to 1.
+        QuarantineFile (str, optional): File the files that could not be extracted are listed in. Defaults to 'collect_data_quarantine.json'.
+        kwargs: Arguments given to Data_Extraction
+
+    Returns:
+        (dict): The values of every file that could be extracted
+    """
+    ExtractedValues = dict()
+    Failed = []
+    if Multiprocessing:
+        for result in Parallel_Data_Extraction(input_files, suppressed, Timeout=Timeout, Failed=Failed, **kwargs):
+            ExtractedValues.update(result)
+    else:
+        for infile in input_files:
+            _, result, failure = Isolated_Data_Extraction(infile, Timeout, **kwargs)
+            if failure is not None:
+                Failed.append(failure)
+                continue
+            ExtractedValues.update(result)
+    Failed, Retried = Retry_Failed_Extraction(Failed, Retries, Timeout, **kwargs)
+    ExtractedValues.update(Retried)
+    Quarantine_Failed_Extraction(Failed, suppressed, QuarantineFile)
+    return ExtractedValues
+
+def Save_Trajectories(Extracted_values: dict, Format: str, suppressed: bool) -> None:
+    # Writes the optimization trajectory of every file to [file]_traj.[Format], or [file]_[job index]_traj.[Format] for jobs
+    for key, Values in Extracted_values.items():
+        if not isinstance(Values.get('trajectory'), list):
+            continue
+        filename, job = key if isinstance(key, tuple) else (key, None)
+        if job is not None:
+            root, extension = os.path.splitext(op.StripCompressionExtension(filename))
+            filename = f'{root}_{job}{extension}'
+        TrajectoryFilename = op.WriteTrajectory(filename, Values, Format)
+        if not(suppressed):
+            extraction_log.Log(f'Optimization trajectory of {len(Values["trajectory"])} steps has been saved to {TrajectoryFilename}', extraction_log.SAVED, 'optimization trajectory', filename)
+
+def Save_Polarizability_Tensors(Extracted_values: dict, suppressed: bool) -> None:
+    # Diagonalizes the polarizability tensors of every frequency of all files together and saves them to polarizability_tensors.npz
+    Files = [file for file, Values in Extracted_values.items() if isinstance(Values.get('polarizability_tensors'), list)]
+    if len(Files) == 0:
+        if not(suppressed):
+            print('No polarizability tensors were found in any of the files')
+        return
+    Tensors = [Extracted_values[file]['polarizability_tensors'] for file in Files]
+    Save_Dict = dict()
+    for file, tensors, (eigenvalues, eigenvectors) in zip(Files, Tensors, op.DiagonalizeTensors(Tensors)):
+        Save_Dict[f'{file} frequencies'] = np.array(Extracted_values[file]['polarizability_frequencies'])
+        Save_Dict[f'{file} tensors'] = np.array(tensors)
+        Save_Dict[f'{file} eigenvalues'] = eigenvalues
+        Save_Dict[f'{file} eigenvectors'] = eigenvectors
+    np.savez('polarizability_tensors.npz', **Save_Dict)
+    if not(suppressed):
+        print(f'Polarizability tensors of {len(Files)} files have been saved in polarizability_tensors.npz')
 
 def Check_if_Implemented(input_file: dict, Set_of_values: dict, Extracted_values: dict) -> None:
     # Checks to see if the keys of a double dictionary exists
@@ -348,19 +571,17 @@ def Spectra(args):
     Save = args.save
     Quiet = args.quiet
     Multiprocessing = args.multiprocessing
+    # Files that can not be extracted are quarantined and left out of the spectra, see Spectra_Data_Extraction
+    Isolation = dict(Timeout=getattr(args, 'timeout', None), Retries=getattr(args, 'retries', 1), QuarantineFile=getattr(args, 'quarantine', 'collect_data_quarantine.json'))
 
     if UVVis:
         NeededArguments = {'_Excitation_energies': -1, '_Oscillator_strengths': -1}
         ArgumentsToValues = {'_Excitation_energies': ['exc_energies'], '_Oscillator_strengths': ['osc_strengths']}
 
-        if Multiprocessing:
-            with Pool(int(cpu_count()/2)) as pool:
-                ExtractedValues = pool.map(partial(Data_Extraction, Needed_Values=NeededArguments, quiet=Quiet), InputFiles)
-                ExtractedValues = {key: value for dictionary in ExtractedValues for key, value in dictionary.items()} # Reformatting Extracted_values
-        else:
-            ExtractedValues = dict()
-            for infile in InputFiles:
-                ExtractedValues[infile] = Data_Extraction(infile, NeededArguments, Quiet)[infile]
+        Attributes = [value for values in ArgumentsToValues.values() for value in values]
+
+        ExtractedValues = Spectra_Data_Extraction(InputFiles, Multiprocessing, Quiet, **Isolation, Needed_Values=NeededArguments, quiet=Quiet, Attributes=Attributes)
+        InputFiles = [infile for infile in InputFiles if infile in ExtractedValues]
 
         Check_if_Implemented(InputFiles, ArgumentsToValues, ExtractedValues)   # Finding functions not implemented
 
@@ -376,14 +597,10 @@ def Spectra(args):
         NeededArguments = {'_Complex_propagator': True}
         ArgumentsToValues = {'_Complex_propagator': ['complex_propagator']}
 
-        if Multiprocessing:
-            with Pool(int(cpu_count()/2)) as pool:
-                ExtractedValues = pool.map(partial(Data_Extraction, Needed_Values=NeededArguments, quiet=Quiet), InputFiles)
-                ExtractedValues = {key: value for dictionary in ExtractedValues for key, value in dictionary.items()} # Reformatting Extracted_values
-        else:
-            ExtractedValues = dict()
-            for infile in InputFiles:
-                ExtractedValues[infile] = Data_Extraction(infile, NeededArguments, Quiet)[infile]
+        Attributes = [value for values in ArgumentsToValues.values() for value in values]
+
+        ExtractedValues = Spectra_Data_Extraction(InputFiles, Multiprocessing, Quiet, **Isolation, Needed_Values=NeededArguments, quiet=Quiet, Attributes=Attributes)
+        InputFiles = [infile for infile in InputFiles if infile in ExtractedValues]
 
         Check_if_Implemented(InputFiles, ArgumentsToValues, ExtractedValues)   #Finding functions not implemented
 
@@ -422,7 +639,11 @@ def Extract(args):
         '_Gibbs': args.gibbs,
         '_PartitionFunctions': args.partfunc,
         '_CPUS': args.cpu_time,
-        '_Optimized_Geometry': args.optgeom
+        '_Optimized_Geometry': args.optgeom,
+        '_Trajectory': getattr(args, 'trajectory', None),
+        '_SCF_Convergence': getattr(args, 'convergence', False),
+        '_Optimization_Convergence': getattr(args, 'convergence', False),
+        '_Polarizability_Tensors': getattr(args, 'polarizability_tensors', False)
     }
 
     # These are the datapoints that will be extracted per argument
@@ -440,6 +661,8 @@ def Extract(args):
         '_Frequencies': ['freq'],
         '_PartitionFunctions': ['qTotal'],
         '_CPUS': ['total_cpu_time', 'wall_cpu_time'],
+        '_SCF_Convergence': ['scf_cycles'],
+        '_Optimization_Convergence': ['opt_steps'],
     }
 
     # These are what will be written in the header for each data-point
@@ -464,7 +687,9 @@ def Extract(args):
         'freq': 'Frequency',
         'qTotal': 'Total molar partition function',
         'total_cpu_time': f'Total CPU time ({args.cpu_time})',
-        'wall_cpu_time': f'Wall CPU time ({args.cpu_time})'
+        'wall_cpu_time': f'Wall CPU time ({args.cpu_time})',
+        'scf_cycles': 'SCF cycles',
+        'opt_steps': 'Optimization steps'
     }
 
     # Remainder of arguments
@@ -475,6 +700,14 @@ def Extract(args):
     ProgressBar = args.progressbar
     UnitTesting = args.unittest
     SaveName = args.savename
+    CacheFile = getattr(args, 'cache', None)
+    CacheHash = getattr(args, 'cache_hash', False)
+    Jobs = getattr(args, 'jobs', False)
+    Fchk = not getattr(args, 'no_fchk', False)
+    Properties = not getattr(args, 'no_property_file', False)
+    Timeout = getattr(args, 'timeout', None)
+    Retries = getattr(args, 'retries', 1)
+    QuarantineFile = getattr(args, 'quarantine', 'collect_data_quarantine.json')
 
     # Making a copy of RequestedArguments
     # This is so arguments that are dependent on others can be called independently
@@ -525,26 +758,89 @@ def Extract(args):
     # How many files to run the script on
     Count = len(InputFiles)
 
+    # Files that have not changed since they were extracted in an earlier run are taken from the cache
+    # Optimized geometries are saved to xyz files while being extracted, so these are never taken from the cache
+    # The cache holds the values of whole files, so it is not used when files are split into jobs
+    # Values read from a formatted checkpoint file or a property file are only taken from the cache if the same file is used again, see extraction_cache.SourceFiles
+    ExtractedValues = dict()
+    Cache = None
+    if CacheFile is not None and '_Optimized_Geometry' not in NeededValues and not Jobs:
+        Cache = extraction_cache.ExtractionCache(CacheFile, Hash=CacheHash)
+        Sources = {file: extraction_cache.SourceFiles([op.SiblingFchk(file) if Fchk else None, op.SiblingPropertyFile(file) if Properties else None]) for file in InputFiles}
+        for file in InputFiles:
+            Cached = Cache.Get(file, NeededValues, T, Sources[file])
+            if Cached is not None:
+                ExtractedValues[file] = Cached
+    FilesToExtract = [file for file in InputFiles if file not in ExtractedValues]
+
     # If multiprocessing is enabled it will be run using half of the available CPUS
     # Else they will be run in a linear fashion
-    if ProgressBar:
-        max_filename_length = len(max(InputFiles, key=len))
-        TerminalOutput = TerminalInformation(Count, max_filename_length)
+    if ProgressBar and len(FilesToExtract) > 0:
+        max_filename_length = len(max(FilesToExtract, key=len))
+        TerminalOutput = TerminalInformation(len(FilesToExtract), max_filename_length)
         TerminalOutput.start_timer()
+    # Only the values of the needed methods are sent back from the extraction and cached, not everything the extraction classes hold
+    NeededAttributes = []
+    flatten_list([Outputs[key] for key in NeededValues if key in Outputs], NeededAttributes)
+    if '_Trajectory' in NeededValues:
+        NeededAttributes += op.TRAJECTORY_ATTRIBUTES
+    if '_Polarizability_Tensors' in NeededValues:
+        NeededAttributes += op.POLARIZABILITY_ATTRIBUTES
+
+    # Files that can not be extracted, e.g. because of an error or the timeout, are collected in Failed instead of stopping the extraction
+    ExtractionArguments = dict(Needed_Values=NeededValues, quiet=Quiet, Temperature=T, Attributes=NeededAttributes, Jobs=Jobs, Fchk=Fchk, Properties=Properties)
+    Failed = []
     if Multiprocessing:
-        with Pool(int(cpu_count()/2)) as pool:
-            ExtractedValues = []
-            for i, result in enumerate(pool.imap(partial(Data_Extraction, Needed_Values=NeededValues, quiet=Quiet, Temperature=T), InputFiles), start=1):
-                if ProgressBar:
-                    TerminalOutput.updateProgressbar(i, False, True)
-                ExtractedValues.append(result)
-            ExtractedValues = {key: value for dictionary in ExtractedValues for key, value in dictionary.items()} # Reformatting Extracted_values
+        for i, result in enumerate(Parallel_Data_Extraction(FilesToExtract, Quiet, Timeout=Timeout, Failed=Failed, **ExtractionArguments), start=1):
+            if ProgressBar:
+                TerminalOutput.updateProgressbar(i, False, True)
+            ExtractedValues.update(result)
     else:
-        ExtractedValues = dict()
-        for i, file in enumerate(InputFiles, start=1):
+        for i, file in enumerate(FilesToExtract, start=1):
             if ProgressBar:
                 TerminalOutput.updateProgressbar(i, True, True, filename=file)
-            ExtractedValues[file] = Data_Extraction(file, NeededValues, Quiet, T)[file]
+            _, result, failure = Isolated_Data_Extraction(file, Timeout, **ExtractionArguments)
+            if failure is not None:
+                Failed.append(failure)
+                continue
+            ExtractedValues.update(result)
+
+    # Files that failed with an error that may not happen again are tried again one at a time
+    Failed, Retried = Retry_Failed_Extraction(Failed, Retries, Timeout, **ExtractionArguments)
+    ExtractedValues.update(Retried)
+
+    FailedFiles = {failure['file'] for failure in Failed}
+    if Cache is not None:
+        for file in FilesToExtract:
+            if file in FailedFiles:
+                continue
+            Cache.Put(file, NeededValues, T, {key: ExtractedValues[file][key] for key in NeededAttributes if key in ExtractedValues[file]}, Sources[file])
+        Cache.close()
+
+    # Files that could not be extracted are listed with their tracebacks in the quarantine file, and all their values are NaN
+    Quarantine_Failed_Extraction(Failed, Quiet, QuarantineFile)
+    for failure in Failed:
+        ExtractedValues[(failure['file'], 0) if Jobs else failure['file']] = {key: 'NaN' for key in NeededAttributes}
+
+    # Optimization trajectories are saved to a file per output file, or per job if these are split
+    if RequestedArguments['_Trajectory']:
+        Save_Trajectories(ExtractedValues, RequestedArguments['_Trajectory'], Quiet)
+
+    # Keeping the order of the files as given
+    if Jobs:
+        # Every job is given a row of its own, named [file][job index]
+        FileJobs = {file: [] for file in InputFiles}
+        for (file, job), Values in ExtractedValues.items():
+            FileJobs[file].append((f'{file}[{job}]', Values))
+        ExtractedValues = {name: Values for file in InputFiles for name, Values in FileJobs[file]}
+        InputFiles = list(ExtractedValues)
+        Count = len(InputFiles)
+    else:
+        ExtractedValues = {file: ExtractedValues[file] for file in InputFiles}
+
+    # The polarizability tensors of all files are diagonalized together once every file has been extracted
+    if RequestedArguments['_Polarizability_Tensors']:
+        Save_Polarizability_Tensors(ExtractedValues, Quiet)
 
     # Creating Input_Array where all values are put in lists
     InputArray = [[i] for i in ExtractedValues]
@@ -653,6 +949,124 @@ def Extract(args):
     print(OutputArray)
 
 
+def Cache(args):
+    """
+    This function is used for any methods related to the cache keyword
+    """
+    if not os.path.isfile(args.cache):
+        print(f'There is no cache at {args.cache}')
+        return
+
+    with extraction_cache.ExtractionCache(args.cache) as cache:
+        if args.action == 'stats':
+            for name, value in cache.Statistics().items():
+                print(f'{name:>16}: {value}')
+        elif args.action == 'invalidate':
+            removed = cache.Invalidate(args.infile if len(args.infile) > 0 else None, Stale=args.stale)
+            print(f'{removed} file(s) have been removed from {args.cache}')
+
+
+def Find_Output_Files(paths: list) -> list:
+    # Directories are searched recursively for files with one of op.OUTPUT_EXTENSIONS, which may be compressed. Files are used as given
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, directories, filenames in os.walk(path):
+            directories.sort()
+            files += [os.path.join(root, filename) for filename in sorted(filenames) if op.StripCompressionExtension(filename).endswith(op.OUTPUT_EXTENSIONS)]
+    return files
+
+def Parallel_Job_Status(input_files: list, processes: int, **kwargs):
+    """Determines the status of the jobs of [input_files] using [processes] processes, see op.JobStatus
+
+    Args:
+        input_files (list): Output files of the jobs
+        processes (int): Amount of processes to use
+        kwargs: Arguments given to op.JobStatus
+
+    Yields:
+        (Tuple[str, str, str]): The program, status and termination line of each file, in the order of [input_files]
+    """
+    # Every file only takes a few reads, so the files are sent to the processes in chunks
+    with Pool(processes) as pool:
+        yield from pool.imap(partial(op.JobStatus, **kwargs), input_files, chunksize=max(1, min(256, len(input_files) // (4 * processes))))
+
+def Status(args):
+    """
+    This function is used for any methods related to the status keyword
+    """
+    InputFiles = Find_Output_Files(args.infile)
+    Processes = args.processes if args.processes is not None else max(1, int(cpu_count()/2))
+
+    if Processes > 1 and len(InputFiles) > 1:
+        Statuses = list(Parallel_Job_Status(InputFiles, Processes, running_age=args.running_age))
+    else:
+        Statuses = [op.JobStatus(file, args.running_age) for file in InputFiles]
+
+    # Only the jobs with the requested statuses are written to the table, but all are counted
+    with open(args.output, 'w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['File', 'Program', 'Status', 'Termination line'])
+        for file, (program, status, line) in zip(InputFiles, Statuses):
+            if args.only is None or status in args.only:
+                writer.writerow([file, program, status, line])
+
+    Counts = {status: 0 for status in op.JOB_STATUSES}
+    for _, status, _ in Statuses:
+        Counts[status] += 1
+    for status, count in Counts.items():
+        print(f'{status:>12}: {count}')
+    print(f'The status of {len(InputFiles)} files has been saved in {args.output}')
+    return Statuses
+
+
+def Watch(args):
+    """
+    This function is used for any methods related to the watch keyword
+    """
+    InputFiles = args.infile
+
+    # These are the arguments that can be followed
+    RequestedArguments = {
+        '_Energy': args.energy,
+        '_ZPV': args.zpv,
+        '_Dipole_moments': args.dipole,
+        '_Polarizabilities': args.polar,
+        '_Excitation_energies': args.exc,
+        '_Frequencies': args.freq
+    }
+
+    Quiet = args.quiet
+    Interval = args.interval
+    StateFile = args.state
+    Once = args.once
+
+    NeededValues = [key for key, val in RequestedArguments.items() if val]
+    if len(NeededValues) == 0:
+        NeededValues = ['_Energy']
+
+    # Files followed in an earlier run continue from where they were, unless other values are requested now
+    State = follow.LoadFollowState(StateFile)
+    FollowedFiles = dict()
+    for file in InputFiles:
+        if file in State and State[file].methods == NeededValues:
+            FollowedFiles[file] = State[file]
+        else:
+            FollowedFiles[file] = follow.FollowedFile(file, NeededValues, Quiet=Quiet)
+
+    while True:
+        for file, followed in FollowedFiles.items():
+            if followed.Update():
+                print(f"{file}: " + ", ".join(f"{key} = {value}" for key, value in followed.Values().items()))
+        follow.SaveFollowState(StateFile, FollowedFiles)
+
+        if Once:
+            return
+        time.sleep(Interval)
+
+
 def main():
     #---------------------------
     # Creating main parser
@@ -735,6 +1149,9 @@ For help contact
     SpectraAdditionalCommandsGroup = SpectraSubparser.add_argument_group('Additional commands')
     SpectraAdditionalCommandsGroup.add_argument('-q', '--quiet', action='store_true', help='Include for the script to stay silent - This will not remove error messages or the printing of data')
     SpectraAdditionalCommandsGroup.add_argument('-mp','--multiprocessing', action='store_true', help='Include to use the multiprocessing library for data extraction')
+    SpectraAdditionalCommandsGroup.add_argument('--timeout', type=float, help='Seconds the extraction of a single file may take before it is stopped and the file is quarantined. By default there is no limit')
+    SpectraAdditionalCommandsGroup.add_argument('--retries', default=1, type=int, help='Amount of times files that could not be read, e.g. because of a network file system, are tried again. Files that fail for other reasons are quarantined right away. Default is 1')
+    SpectraAdditionalCommandsGroup.add_argument('--quarantine', default='collect_data_quarantine.json', type=str, help='File the files that could not be extracted are listed in together with their errors. Default is collect_data_quarantine.json')
 
     #---------------------------
     # Creating extract subparser
@@ -757,6 +1174,9 @@ For help contact
                 -  Partition functions at a given temperature
                 -  CPU time used
                 -  Optimized geometries (or last geometry in file)
+                -  Optimization trajectories with the energy and convergence criteria of every step
+                -  Amount of SCF cycles and geometry optimization steps
+                -  Polarizability tensors at every frequency printed
 
     Though not all data types have been implemented for all of the output formats
 
@@ -819,6 +1239,9 @@ For help contact
     ExtractionGroup.add_argument('-T', '--temp', const=298.15, default=298.15, type=float, help='Include to calculate at a different temperature. Default is 298.15 K', nargs='?')
     ExtractionGroup.add_argument('-C', '--cpu_time', const=['m'], help='Include to extract total cpu time and pr. cpu time. You can change the output from being in seconds, minutes and hours, where the default is minutes', nargs='?', choices=['s', 'm', 'h'])
     ExtractionGroup.add_argument('-geom', '--optgeom', action='store_true',help='Include to extract optimized geometries and save to \'filename_opt.xyz\'.')
+    ExtractionGroup.add_argument('-conv', '--convergence', action='store_true', help='Include to extract the total amount of SCF cycles and geometry optimization steps, e.g. to find slowly converging calculations')
+    ExtractionGroup.add_argument('-polt', '--polarizability-tensors', action='store_true', help='Include to extract the full polarizability tensor of every frequency printed, e.g. for frequency-dependent polarizabilities. The tensors of all files are diagonalized together and saved with their eigenvalues and eigenvectors to \'polarizability_tensors.npz\'')
+    ExtractionGroup.add_argument('-traj', '--trajectory', const='xyz', type=str, choices=op.TRAJECTORY_FORMATS, help='Include to extract the geometry, energy and convergence criteria of every step of geometry optimizations and save them to \'filename_traj.xyz\' as a multi-frame xyz file. Use npz to save them as numpy arrays in \'filename_traj.npz\' instead', nargs='?')
 
     ExtractionDataProcessingGroup = ExtractionSubparser.add_argument_group('Data processing commands')
     ExtractionDataProcessingGroup.add_argument('-s', '--save', const='csv', type=str, help='Saves extracted and processed data. The extracted data is by default saved in a csv file', nargs='?', choices=['csv', 'npz', 'json', 'return'])
@@ -826,16 +1249,117 @@ For help contact
 
     ExtractionAdditionalCommandsGroup = ExtractionSubparser.add_argument_group('Additional commands')
     ExtractionAdditionalCommandsGroup.add_argument('-q', '--quiet', '--no-log', action='store_true', help="Include to not print error messages to the 'collect_data.log' file", dest='quiet')
+    ExtractionAdditionalCommandsGroup.add_argument('--log-json', action='store_true', help="Include to write every message to the 'collect_data.log' file as a line of JSON with its kind, subject, file, process and time")
+    ExtractionAdditionalCommandsGroup.add_argument('--log-summary', action='store_true', help="Include to end the 'collect_data.log' file with the amount of files of every kind of message, e.g. 'missing frequencies: 12 files'")
     ExtractionAdditionalCommandsGroup.add_argument('-mp','--multiprocessing', action='store_true', help='Include to use the multiprocessing library for data extraction')
+    ExtractionAdditionalCommandsGroup.add_argument('--no-fchk', action='store_true', help='Include to extract everything from Gaussian output files, even when a formatted checkpoint file (.fchk) with the same name is next to them. By default the energy, dipole moment, polarizability, frequencies and thermochemistry are read from the .fchk file')
+    ExtractionAdditionalCommandsGroup.add_argument('--no-property-file', action='store_true', help='Include to extract everything from ORCA output files, even when a property file (_property.txt) newer than them is next to them. By default the energy, dipole moment, polarizability, frequencies, mass and multiplicity are read from the property file')
+    ExtractionAdditionalCommandsGroup.add_argument('--timeout', type=float, help='Seconds the extraction of a single file may take before it is stopped and the file is quarantined. By default there is no limit')
+    ExtractionAdditionalCommandsGroup.add_argument('--retries', default=1, type=int, help='Amount of times files that could not be read, e.g. because of a network file system, are tried again. Files that fail for other reasons are quarantined right away. Default is 1')
+    ExtractionAdditionalCommandsGroup.add_argument('--quarantine', default='collect_data_quarantine.json', type=str, help='File the files that could not be extracted are listed in together with their errors. Default is collect_data_quarantine.json')
+    ExtractionAdditionalCommandsGroup.add_argument('--jobs', action='store_true', help='Include to extract every job of output files of chained jobs, e.g. ORCA $new_job and Gaussian --Link1--, separately. Every job is printed as [file][job index]')
     ExtractionAdditionalCommandsGroup.add_argument('--no-progressbar', action='store_false', help='Include to deactivate progress bar', dest='progressbar')
     ExtractionAdditionalCommandsGroup.add_argument('--unittest', action='store_true', help=argparse.SUPPRESS)
+    ExtractionAdditionalCommandsGroup.add_argument('--cache', const=extraction_cache.DEFAULT_CACHE_FILE, type=str, help=f'Include to keep the extracted values in a cache, so only new or changed files are parsed when run again. Add a filename to change the cache database. Default is {extraction_cache.DEFAULT_CACHE_FILE}', nargs='?')
+    ExtractionAdditionalCommandsGroup.add_argument('--cache-hash', action='store_true', help='Include to also compare files to the cache by the hash of their content, so files that have only been copied or touched are not parsed again', dest='cache_hash')
+
+    #---------------------------
+    # Creating cache subparser
+    #---------------------------
+    CacheSubparser = subparser.add_parser('cache', formatter_class=argparse.RawDescriptionHelpFormatter, description=f'''
+    This part of the script is for managing the cache of extracted values used by extract --cache
+
+        stats       Prints statistics of the cache
+        invalidate  Removes the given files from the cache, or all files if none are given
+''', help='Use to see statistics of or invalidate the cache of extracted values')
+
+    # Setting the Cache function to be run if cache is used
+    CacheSubparser.set_defaults(func=Cache)
+
+    # Adding arguments
+    CacheSubparser.add_argument('action', type=str, choices=['stats', 'invalidate'], help='What to do with the cache')
+    CacheSubparser.add_argument('infile', type=str, nargs='*', help='The file(s) to invalidate', metavar='File')
+    CacheSubparser.add_argument('--cache', default=extraction_cache.DEFAULT_CACHE_FILE, type=str, help=f'The cache database. Default is {extraction_cache.DEFAULT_CACHE_FILE}')
+    CacheSubparser.add_argument('--stale', action='store_true', help='Include to only invalidate files that no longer exist or have changed since they were cached')
+
+    #---------------------------
+    # Creating status subparser
+    #---------------------------
+    StatusSubparser = subparser.add_parser('status', formatter_class=argparse.RawDescriptionHelpFormatter, description=f'''
+    This part of the script is for finding out which jobs have finished before extracting anything from them
+
+    Only the end of every output file is read, and the job is classified by the lines the program prints when it stops
+    Directories are searched for output files ({', '.join(op.OUTPUT_EXTENSIONS)}, also when compressed)
+
+            The statuses are
+            ----------------
+                -  normal       The program terminated normally
+                -  error        The program printed an error termination
+                -  running      No termination line, and the file has changed recently
+                -  incomplete   No termination line, e.g. the job was killed by the queueing system
+                -  unknown      The output format is not known
+''', help='Use to find which jobs terminated normally, failed or are still running')
+
+    # Setting the Status function to be run if status is used
+    StatusSubparser.set_defaults(func=Status)
+
+    # Adding arguments
+    StatusSubparser.add_argument('infile', type=str, nargs='+', help='The file(s) or directories to classify', metavar='File')
+    StatusSubparser.add_argument('-o', '--output', default='job_status.csv', type=str, help='File the status table is saved in. Default is job_status.csv')
+    StatusSubparser.add_argument('--only', type=str, nargs='+', choices=op.JOB_STATUSES, help='Only write the files with these statuses to the table, e.g. --only error incomplete')
+    StatusSubparser.add_argument('--running-age', default=op.RUNNING_AGE, type=float, help=f'Seconds since a file without a termination line was changed for its job to be taken as running. Default is {op.RUNNING_AGE} seconds', dest='running_age')
+    StatusSubparser.add_argument('-np', '--processes', type=int, help='Amount of processes to use. Default is half of the available CPUS')
+
+    #---------------------------
+    # Creating watch subparser
+    #---------------------------
+    WatchSubparser = subparser.add_parser('watch', formatter_class=argparse.RawDescriptionHelpFormatter, description=f'''
+    This part of the script is for following output files of calculations that are still running
+
+    Every few minutes only the output written since the last time is parsed, and the values found so far are printed for every file that has changed
+    The progress is saved, so a later run with the same values requested continues where the last one stopped
+
+            The values that can be followed are
+            -----------------------------------
+                -  Total energies
+                -  Zero-Point Vibrational energies
+                -  Dipole moments
+                -  Polarizability
+                -  Excitation energies
+                -  Frequencies
+
+    Though not all data types can be followed for all of the output formats
+    If no values are requested the total energies are followed
+''', help='Use to follow output files of running calculations')
+
+    # Setting the Watch function to be run if watch is used
+    WatchSubparser.set_defaults(func=Watch)
+
+    # Adding arguments
+    WatchSubparser.add_argument('infile', type=str, nargs='+', help='The file(s) to follow', metavar='File')
+
+    WatchGroup = WatchSubparser.add_argument_group('Data extraction commands')
+    WatchGroup.add_argument('-E', '--energy', action='store_true', help='Include to follow the Total Energy')
+    WatchGroup.add_argument('-Z', '--zpv', action='store_true', help='Include to follow the Zero-Point Vibrational Energy')
+    WatchGroup.add_argument('-D', '--dipole', action='store_true', help='Include to follow the Dipole Moment')
+    WatchGroup.add_argument('-P', '--polar', action='store_true', help='Include to follow the Polarizability')
+    WatchGroup.add_argument('-X', '--exc', action='store_true', help='Include to follow the Excitation Energies')
+    WatchGroup.add_argument('-F', '--freq', action='store_true', help='Include to follow the Frequencies')
+
+    WatchAdditionalCommandsGroup = WatchSubparser.add_argument_group('Additional commands')
+    WatchAdditionalCommandsGroup.add_argument('--interval', default=300, type=float, help='Seconds between checking the files for new output. Default is 300 seconds')
+    WatchAdditionalCommandsGroup.add_argument('--state', default='collect_data_watch.pkl', type=str, help='File where the progress is saved between runs. Default is collect_data_watch.pkl')
+    WatchAdditionalCommandsGroup.add_argument('--once', action='store_true', help='Include to check the files once and stop, e.g. when run from cron')
+    WatchAdditionalCommandsGroup.add_argument('-q', '--quiet', '--no-log', action='store_true', help="Include to not print error messages to the 'collect_data.log' file", dest='quiet')
 
     # Parses the arguments
     args = Parser.parse_args()
 
     # The arguments are sent to the correct function
     # The function may be one of Spectra, Extract, ...
-    args.func(args)
+    # Everything logged is written to collect_data.log in batches by a single writer, also when extracting with multiprocessing
+    with extraction_log.LogWriter(Json=getattr(args, 'log_json', False), Summary=getattr(args, 'log_summary', False)):
+        args.func(args)
 
 
 if __name__ == "__main__":
@@ -2,8 +2,16 @@
 from argparse import Namespace
 import unittest
 import json
+import pickle
+import gzip
+import lzma
+import bz2
 import os
+import tempfile
+import time
+import multiprocessing
 import sys
+import numpy as np
 
 current = os.path.dirname(os.path.realpath(__file__))
 
@@ -11,6 +19,11 @@ parent = os.path.dirname(current)
 
 sys.path.append(parent)
 
+import KurtGroup.Kurt.output_file as of
+import KurtGroup.Kurt.extraction_cache as ec
+import KurtGroup.Kurt.extraction_log as el
+import KurtGroup.Kurt.extraction_specs as es
+import KurtGroup.Kurt.follow as fo
 import KurtGroup.Kurt.output_processing as op
 import collect_data as cd
 
@@ -123,6 +136,300 @@ class Test_output_processing(unittest.TestCase):
         for infile in DATA_FILE:
             self.assertEqual(Extracted_Values[infile]['test'], DATA_FILE[infile]['qTotal'])
 
+    def test_Memoized_Dependencies(self):
+        infile = op.OutputType('test_systems/CCSD_Water_orca.out', Quiet=True)
+        calls = []
+        frequencies = infile.extract._Frequencies
+        infile.extract._Frequencies = lambda: calls.append(frequencies())
+
+        gibbs = infile.getGibbsFreeEnergy()
+        enthalpy = infile.getEnthalpy()
+        partition_function = infile.getPartitionFunction()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(gibbs, op.OutputType('test_systems/CCSD_Water_orca.out', Quiet=True).getGibbsFreeEnergy())
+        self.assertEqual(enthalpy, op.OutputType('test_systems/CCSD_Water_orca.out', Quiet=True).getEnthalpy())
+        self.assertEqual(partition_function, op.OutputType('test_systems/CCSD_Water_orca.out', Quiet=True).getPartitionFunction())
+
+    def test_Format_Detection(self):
+        expected = {'CCSD_Water_orca.out': 'ORCA', 'CCSD_Water_dal.out': 'DALTON', 'HF_Water_gaus.out': 'GAUSSIAN', 'HF_Water_lsdal.out': 'LSDALTON', 'DFT_Water_pol_velox.out': 'VELOXCHEM'}
+        for filename, program in expected.items():
+            with of.OpenBuffered(f'test_systems/{filename}', op.FORMAT_DETECTION_BYTES) as stream:
+                lines = of.PeekLines(stream, op.FORMAT_DETECTION_BYTES, op.FORMAT_DETECTION_LINES)
+                self.assertEqual(op.DetectOutputFormat(lines)[1], program)
+                # Nothing has been read from the stream
+                self.assertEqual(stream.tell(), 0)
+        self.assertEqual(op.DetectOutputFormat(['Not an output file\n']), (op.UnknownExtract, 'Unknown'))
+
+    def test_Read_Planner(self):
+        filename = 'test_systems/CCSD_Water_gaus.out'
+        self.assertEqual(op.Plan(op.GaussianExtract, ['_Energy', '_Multiplicity', '_Gibbs', '_Not_implemented']), {'head': ['_Multiplicity'], 'tail': ['_Energy'], 'full': ['_Gibbs']})
+
+        whole = op.OutputType(filename, Quiet=True)
+        planned = op.OutputType(filename, Quiet=True, Methods=['_Energy', '_CPUS', '_Multiplicity'])
+        # Only the end of the file is kept
+        self.assertEqual(planned.extract.file.region, 'tail')
+        self.assertEqual(planned.extract.lines, whole.extract.lines[-len(planned.extract.lines):])
+        self.assertEqual(planned.getEnergy(), whole.getEnergy())
+        self.assertEqual(planned.getCPUTime(), whole.getCPUTime())
+        whole.extract._Multiplicity()
+        self.assertEqual(planned.extract.multi, whole.extract.multi)
+
+        # Not found in the regions, so the whole file is read
+        self.assertEqual(op.OutputType('test_systems/CCSD_Methane_exci_gaus.out', Quiet=True, Methods=['_ZPV']).extract.file.region, None)
+        # Other values are extracted from the whole file
+        self.assertEqual(planned.getFrequencies(), whole.getFrequencies())
+        self.assertEqual(planned.extract.file.region, None)
+
+        # The energy of a single point after a frequency job is only read from the end if the zero-point energy is not printed before it
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'DFT_Water_gaus.out')
+            with open('test_systems/DFT_Water_gaus.out') as file, open(filename, 'w') as copy:
+                copy.write(file.read())
+                copy.write(' Padding\n' * 50000)
+                copy.write(' SCF Done:  E(RB3LYP) =  -76.4206270699     A.U. after    1 cycles\n')
+            whole = op.OutputType(filename, Quiet=True)
+            planned = op.OutputType(filename, Quiet=True, Methods=['_Energy'])
+            self.assertEqual(planned.getEnergy(), whole.getEnergy())
+            self.assertEqual(planned.extract.file.region, None)
+
+    def test_Job_Segments(self):
+        # Gaussian opt freq runs the frequencies as a second internal job
+        filename = 'test_systems/CCSD_Water_gaus.out'
+        jobs = op.OutputType(filename, Quiet=True).Jobs()
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(jobs[-1].getEnergy(), op.OutputType(filename, Quiet=True).getEnergy())
+
+        # Values extracted before the file is split are not given to the jobs, however they were set
+        extract = op.GaussianExtract(filename, Quiet=True)
+        extract.freq = [0.0]
+        op.Resolve(extract, ['_Energy'])
+        for job in op.SplitJobs(extract):
+            self.assertNotIn('freq', vars(job))
+            self.assertNotIn('tot_energy', vars(job))
+            self.assertEqual(job.quiet, True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            chained = os.path.join(directory, 'chained_orca.out')
+            with open(chained, 'w') as outfile:
+                for i, infile in enumerate(['DFT_Water_orca.out', 'DFT_Methane_orca.out']):
+                    if i > 0:
+                        outfile.write(f'\n                         $$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$\n                         $$$$$$$$$$$$$$$$  JOB NUMBER  {i + 1} $$$$$$$$$$$$$$\n                         $$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$\n')
+                    with open(f'test_systems/{infile}') as file:
+                        outfile.write(file.read())
+
+            jobs = op.OutputType(chained, Quiet=True).Jobs()
+            self.assertEqual([job.getEnergy() for job in jobs], [DATA_FILE[infile]['tot_energy'] for infile in ['DFT_Water_orca.out', 'DFT_Methane_orca.out']])
+
+            Extracted_values = cd.Data_Extraction(chained, {'_Energy': ['tot_energy']}, True, Jobs=True)
+            self.assertEqual(list(Extracted_values), [(chained, 0), (chained, 1)])
+
+    def test_Trajectory_Extraction(self):
+        for infile in ['CCSD_Water_gaus.out', 'DFT_Water_orca.out']:
+            outfile = op.OutputType(f'test_systems/{infile}', Quiet=True)
+            trajectory, labels, energies, convergence, converged = outfile.getTrajectory()
+
+            self.assertEqual(labels, ['O', 'H', 'H'])
+            self.assertEqual(trajectory.shape, (4, 3, 3))
+            self.assertEqual(convergence.shape, converged.shape)
+            self.assertAlmostEqual(energies[-1], DATA_FILE[infile]['tot_energy'], places=6)
+            # The optimization has converged at the last step, but not at the first
+            self.assertTrue(converged[-1].all())
+            self.assertFalse(converged[0].any())
+
+            with tempfile.TemporaryDirectory() as directory:
+                values = dict(zip(op.TRAJECTORY_ATTRIBUTES, outfile.getTrajectory()))
+                filename = op.WriteTrajectory(os.path.join(directory, infile), values)
+                with open(filename) as file:
+                    lines = file.readlines()
+                self.assertEqual(len(lines), 4 * (3 + 2))
+                self.assertEqual([float(value) for value in lines[-1].split()[1:]], np.round(trajectory[-1, -1], 7).tolist())
+
+                saved = np.load(op.WriteTrajectory(os.path.join(directory, infile), values, 'npz'))
+                self.assertTrue(np.array_equal(saved['trajectory'], trajectory))
+
+        self.assertEqual(op.OutputType('test_systems/DFT_Methane_exci_orca.out', Quiet=True).getTrajectory(), ['NaN'] * 5)
+
+        # The last step of an optimization that is still running is left out if its table of the convergence criteria is incomplete
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'HF_Ethanol_gaus.out')
+            with open('test_systems/HF_Ethanol_gaus.out') as file, open(filename, 'w') as copy:
+                lines = file.readlines()
+                steps = [i for i, line in enumerate(lines) if 'Converged?' in line]
+                copy.writelines(lines[:steps[-1] + 3])
+            trajectory, labels, energies, convergence, converged = op.OutputType(filename, Quiet=True).getTrajectory()
+            self.assertEqual(trajectory.shape, (len(steps) - 1, 9, 3))
+            self.assertEqual(len(energies), len(steps) - 1)
+            self.assertEqual(len(convergence), len(steps) - 1)
+
+    def test_Convergence_Extraction(self):
+        for infile, steps in [('HF_Water_gaus.out', 4), ('DFT_Water_orca.out', 4), ('HF_Water_opt_dal.out', 5), ('DFT_Water_opt_lsdal.out', 6), ('HF_Water_lsdal.out', 0)]:
+            outfile = op.OutputType(f'test_systems/{infile}', Quiet=True)
+            energies, deltas, iterations, cycles = outfile.getSCFConvergence()
+
+            # Every iteration of every SCF is found
+            self.assertEqual([len(scf) for scf in energies], iterations.tolist())
+            self.assertEqual(cycles, sum(iterations))
+            self.assertTrue(np.isnan(deltas[0][0]))
+            self.assertTrue(np.allclose(deltas[0][1:], np.diff(energies[0])))
+
+            convergence, opt_steps = outfile.getOptimizationConvergence()
+            self.assertEqual(opt_steps, steps)
+            self.assertEqual(convergence.shape, (steps, len(outfile.extract.convergence_criteria)))
+
+        # An optimization that is still running may end in the middle of the table of a step, which is left out
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'HF_Ethanol_gaus.out')
+            with open('test_systems/HF_Ethanol_gaus.out') as file, open(filename, 'w') as copy:
+                lines = file.readlines()
+                steps = [i for i, line in enumerate(lines) if 'Converged?' in line]
+                copy.writelines(lines[:steps[-1] + 3])
+                copy.write(lines[steps[-1] + 3][:30])
+            outfile = op.OutputType(filename, Quiet=True)
+            convergence, opt_steps = outfile.getOptimizationConvergence()
+            self.assertEqual(opt_steps, len(steps) - 1)
+            self.assertEqual(convergence.shape, (len(steps) - 1, len(outfile.extract.convergence_criteria)))
+            self.assertIsInstance(outfile.getEnergy(), float)
+
+    def test_Normal_Modes_Extraction(self):
+        gaussian = op.OutputType('test_systems/DFT_Ethanol_gaus.out', Quiet=True)
+        modes, intensities, masses = gaussian.getNormalModes()
+        self.assertEqual(modes.shape, (3 * 9 - 6, 9, 3))
+        self.assertEqual(intensities[:3].tolist(), [2.7465, 104.1264, 16.6039])
+        self.assertEqual(masses[:3].tolist(), [1.09, 1.1091, 2.67])
+
+        # With polar the Raman activities are printed before the displacements
+        modes, intensities, masses = op.OutputType('test_systems/HF_Water_gaus.out', Quiet=True).getNormalModes()
+        self.assertEqual(modes.shape, (3, 3, 3))
+        self.assertEqual(intensities.tolist(), [80.8644, 21.1749, 60.8692])
+        self.assertEqual(modes[0, 0].tolist(), [-0.0, -0.07, 0.0])
+
+        for infile in ['DFT_Ethanol_orca.out', 'DFT_Ethanol_vib_dal.out']:
+            outfile = op.OutputType(f'test_systems/{infile}', Quiet=True)
+            modes, intensities, masses = outfile.getNormalModes()
+            self.assertEqual(modes.shape, (len(outfile.getFrequencies()), 9, 3))
+            self.assertEqual(intensities.shape, masses.shape)
+            # Every mode is given as normalized Cartesian displacements
+            self.assertTrue(np.allclose(np.einsum('ijk,ijk->i', modes, modes), 1.0, atol=1E-5))
+
+        # The reduced masses are computed from the displacements for ORCA
+        _, _, masses = op.OutputType('test_systems/DFT_Ethanol_orca.out', Quiet=True).getNormalModes()
+        self.assertTrue(np.allclose(masses, gaussian.getNormalModes()[2], atol=0.05))
+
+    def test_Polarizability_Tensor_Extraction(self):
+        velox = op.OutputType('test_systems/DFT_Water_pol_velox.out', Quiet=True)
+        tensors, frequencies = velox.getPolarizabilityTensors()
+        self.assertEqual(tensors.shape, (6, 3, 3))
+        self.assertEqual(frequencies.tolist(), [0.0, 0.05, 0.1, 0.15, 0.2, 0.25])
+
+        # A calculation that is still running may end in the middle of a tensor, which is left out
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'DFT_Water_pol_velox.out')
+            with open('test_systems/DFT_Water_pol_velox.out') as file, open(filename, 'w') as copy:
+                lines = file.readlines()
+                last = [i for i, line in enumerate(lines) if 'Polarizability (w=' in line][-1]
+                copy.writelines(lines[:last + 4])
+                copy.write(lines[last + 4][:30])
+            truncated, truncated_frequencies = op.OutputType(filename, Quiet=True).getPolarizabilityTensors()
+            self.assertEqual(truncated.shape, (5, 3, 3))
+            self.assertEqual(truncated_frequencies.tolist(), frequencies.tolist()[:5])
+            self.assertTrue(np.array_equal(truncated, tensors[:5]))
+
+        gaussian = op.OutputType('test_systems/DFT_Water_gaus.out', Quiet=True)
+        self.assertEqual(gaussian.getPolarizabilityTensors()[0][0].diagonal().tolist(), gaussian.getPolarizability()[:3])
+        lsdalton = op.OutputType('test_systems/DFT_Water_pol_lsdal.out', Quiet=True)
+        self.assertEqual(lsdalton.getPolarizabilityTensors()[0][0].diagonal().tolist(), lsdalton.getPolarizability()[:3])
+
+        # The tensors of all frequencies and files are diagonalized together, giving the same eigenvalues as one at a time
+        stacks = [tensors, gaussian.getPolarizabilityTensors()[0]]
+        for stack, (eigenvalues, _) in zip(stacks, op.DiagonalizeTensors(stacks)):
+            self.assertTrue(np.allclose(eigenvalues, [np.linalg.eigh(tensor)[0] for tensor in stack]))
+        self.assertTrue(np.allclose(op.DiagonalizeTensors([tensors])[0][0][0], velox.getPolarizability()[:3]))
+
+    def test_Fchk_Extraction(self):
+        # The fchk file holds the values of the archive entry of the frequency job in DFT_Water_gaus.out
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'DFT_Water_gaus.out')
+            for infile, outfile in [('test_systems/DFT_Water_gaus.out', filename), ('test_systems/fchk/DFT_Water_gaus.fchk', os.path.join(directory, 'DFT_Water_gaus.fchk'))]:
+                with open(infile, 'rb') as file, open(outfile, 'wb') as copy:
+                    copy.write(file.read())
+
+            fchk = op.OutputType(filename, Quiet=True)
+            log = op.OutputType(filename, Quiet=True, Fchk=False)
+            self.assertIsInstance(fchk.extract, op.GaussianFchkExtract)
+            self.assertEqual(fchk.extract.fchk.Get('Atomic numbers').tolist(), [8, 1, 1])
+
+            # The frequencies and thermochemistry are calculated from the Hessian without reading the output file
+            self.assertTrue(np.allclose(fchk.getFrequencies(), log.getFrequencies(), rtol=1E-6))
+            for getter in ['getEnergy', 'getZeroPointVibrationalEnergy', 'getEnthalpy', 'getGibbsFreeEnergy']:
+                self.assertAlmostEqual(getattr(fchk, getter)(), getattr(log, getter)(), places=5)
+            self.assertAlmostEqual(fchk.getEntropy(), log.getEntropy(), places=6)
+            self.assertTrue(np.allclose(fchk.getPolarizability(), log.getPolarizability(), atol=1E-5))
+            self.assertNotIn('file', vars(fchk.extract))
+
+            # Quantities not in the fchk file are extracted from the output file
+            self.assertEqual(fchk.getCPUTime(), log.getCPUTime())
+            self.assertEqual(len(fchk.Jobs()), len(log.Jobs()))
+
+    def test_Property_File_Extraction(self):
+        # The property file holds the values printed in DFT_Water_orca.out
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'DFT_Water_orca.out')
+            properties = os.path.join(directory, 'DFT_Water_orca_property.txt')
+            for infile, outfile in [('test_systems/DFT_Water_orca.out', filename), ('test_systems/property/DFT_Water_orca_property.txt', properties)]:
+                with open(infile, 'rb') as file, open(outfile, 'wb') as copy:
+                    copy.write(file.read())
+
+            orca = op.OutputType(filename, Quiet=True)
+            log = op.OutputType(filename, Quiet=True, Properties=False)
+            self.assertIsInstance(orca.extract, op.OrcaPropertyExtract)
+            for getter in ['getEnergy', 'getZeroPointVibrationalEnergy', 'getFrequencies']:
+                self.assertEqual(getattr(orca, getter)(), getattr(log, getter)())
+            self.assertTrue(np.allclose(orca.getDipoleMoment(), log.getDipoleMoment(), atol=1E-5))
+            self.assertNotIn('file', vars(orca.extract))
+
+            # The polarizability is not in the property file, and the thermochemistry needs the rotational constants of the output file
+            self.assertEqual(orca.getPolarizability(), log.getPolarizability())
+            self.assertAlmostEqual(orca.getGibbsFreeEnergy(), log.getGibbsFreeEnergy(), places=10)
+            sources = orca.getSources()
+            self.assertEqual(sources['tot_energy'], properties)
+            self.assertEqual(sources['freq'], properties)
+            self.assertEqual(sources['polx'], filename)
+            self.assertEqual(sources['rots'], filename)
+
+            # Property files older than the output file are left by an earlier calculation
+            os.utime(properties, (0, 0))
+            self.assertNotIsInstance(op.OutputType(filename, Quiet=True).extract, op.OrcaPropertyExtract)
+
+    def test_Job_Status(self):
+        self.assertEqual(op.JobStatus('test_systems/DFT_Water_orca.out'), ('ORCA', 'normal', '****ORCA TERMINATED NORMALLY****'))
+        self.assertEqual(op.JobStatus('test_systems/CCSD_Water_exci_gaus.out')[1], 'error')
+        self.assertEqual(op.OutputType('test_systems/HF_Water_lsdal.out', Quiet=True).getStatus(), 'normal')
+
+        # A job cut off before its end is running while its output file changes, and incomplete after that
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'HF_Water_gaus.out')
+            with open('test_systems/HF_Water_gaus.out') as file, open(filename, 'w') as copy:
+                copy.writelines(file.readlines()[:-100])
+            self.assertEqual(op.JobStatus(filename), ('GAUSSIAN', 'running', ''))
+            os.utime(filename, (0, 0))
+            self.assertEqual(op.JobStatus(filename), ('GAUSSIAN', 'incomplete', ''))
+            self.assertEqual(cd.Find_Output_Files([directory]), [filename])
+
+    def test_Excited_States_Extraction(self):
+        for infile in ['DFT_Water_exci_dal.out', 'DFT_Water_exci_lsdal.out']:
+            outfile = op.OutputType(f'test_systems/{infile}', Quiet=True)
+            energies, strengths, moments, symmetries = outfile.getExcitedStates()
+            self.assertEqual(energies, DATA_FILE[infile]['exc_energies'])
+            self.assertEqual(strengths, DATA_FILE[infile]['osc_strengths'])
+            self.assertEqual(moments.shape, (len(energies), 3))
+            self.assertEqual(len(symmetries), len(energies))
+
+        # The transition moments are printed with the oscillator strengths of every dipole component
+        _, _, moments, symmetries = op.OutputType('test_systems/DFT_Water_exci_dal.out', Quiet=True).getExcitedStates()
+        self.assertEqual(moments[0].tolist(), [-1.87296081E-08, 0.30885242, 0.15981856])
+        self.assertEqual(symmetries[0], 'A')
+
     def test_CPUtime_Extraction(self):
 
         Extracted_Values = Extraction(DATA_FILE, "getCPUTime")
@@ -132,6 +439,244 @@ class Test_output_processing(unittest.TestCase):
             self.assertEqual(Extracted_Values[infile]['test'][1], DATA_FILE[infile]['wall_cpu_time'])
 
 
+class Test_output_file(unittest.TestCase):
+
+    def test_Literal_Pattern(self):
+        matcher = of.CompilePattern('Rotational constants (GHZ):')
+
+        self.assertTrue(matcher(' Rotational constants (GHZ):    825.4   434.3   284.6\n'))
+        self.assertFalse(matcher(' Rotational constants (MHZ):    825.4   434.3   284.6\n'))
+
+    def test_Regex_Pattern(self):
+        matcher = of.CompilePattern('Total .*  energy:')
+
+        self.assertTrue(matcher('     Total CCSD  energy:    -76.2\n'))
+        self.assertFalse(matcher('     Total CCSD energy:    -76.2\n'))
+
+    def test_Leading_Star_Pattern(self):
+        matcher = of.CompilePattern('*          POLARIZABILITY TENSOR')
+
+        self.assertTrue(matcher('*          POLARIZABILITY TENSOR RESULTS\n'))
+        self.assertFalse(matcher('          POLARIZABILITY TENSOR RESULTS\n'))
+
+    def test_Search_Linenumbers(self):
+        file = of.OutputFile('test_systems/HF_Water_gaus.out')
+
+        self.assertEqual(op.Forward_search_first(file, 'SCF Done:', 'final energy', quiet=True), 372)
+        self.assertEqual(op.Forward_search_last(file, 'SCF Done:', 'final energy', quiet=True), 1353)
+        self.assertEqual(op.Forward_search_all(file, 'Job cpu time:', 'CPU time', quiet=True), [1181, 1907])
+        self.assertEqual(op.Backward_search_last(file, 'Job cpu time:', len(file), 'CPU time', quiet=True), 1907)
+        self.assertEqual(op.Forward_search_after_last(file, 'SCF Done:', 'cycles', 2, 'final energy', quiet=True), 1353)
+        self.assertEqual(op.Forward_search_last(file, 'Not in the file', 'nothing', quiet=True), 'NaN')
+
+    def test_Anchor_Index(self):
+        file = of.OutputFile('test_systems/HF_Water_gaus.out', anchors=['SCF Done:', 'Job cpu time:', 'Not in the file'])
+        unindexed = of.OutputFile('test_systems/HF_Water_gaus.out')
+
+        self.assertEqual(file.index['SCF Done:'], [372, 717, 983, 1353])
+        self.assertEqual(file.index['Not in the file'], [])
+        for anchor in file.index:
+            self.assertEqual(file.FindAll(anchor), unindexed.FindAll(anchor))
+            self.assertEqual(file.FindLast(anchor), unindexed.FindLast(anchor))
+
+    def test_Lazy_Reading(self):
+        for infile in ['DFT_Ethanol_orca.out', 'HF_Water_opt_dal.out', 'DFT_Water_opt_lsdal.out']:
+            anchors = op.OrcaExtract.anchors + op.DaltonExtract.anchors + op.LSDaltonExtract.anchors
+            file = of.OutputFile(f'test_systems/{infile}', anchors=anchors)
+            lazy = of.OutputFile(f'test_systems/{infile}', anchors=anchors, lazy=True)
+
+            self.assertIsInstance(lazy.lines, of.MappedLines)
+            self.assertEqual(lazy.index, file.index)
+            self.assertEqual(len(lazy), len(file))
+            self.assertEqual(list(lazy.lines[10:20]), file.lines[10:20])
+            self.assertEqual(lazy.lines[-1], file.lines[-1])
+            self.assertEqual(lazy.FindAll('energy'), file.FindAll('energy'))
+            lazy.close()
+
+    def test_Parallel_Scanning(self):
+        anchors = ['SCF Done:', 'Frequencies --', 'Standard orientation', 'Dipole moment']
+        serial = of.OutputFile('test_systems/HF_Water_gaus.out', anchors, lazy=True, parallel=False)
+        parallel = of.OutputFile('test_systems/HF_Water_gaus.out', lazy=True, parallel=True)
+        regex = '|'.join(of.TranslatePattern(anchor) for anchor in anchors)
+        self.assertEqual(parallel.lines.ParallelScan(regex, processes=3), list(serial.lines.Scan(of.CompileBytesPattern(regex))))
+        parallel.BuildIndex(anchors)
+        self.assertEqual(parallel.index, serial.index)
+        serial.close()
+        parallel.close()
+
+    def test_Search_Backward(self):
+        file = of.OutputFile('test_systems/HF_Water_gaus.out')
+        lazy = of.OutputFile('test_systems/HF_Water_gaus.out', lazy=True)
+
+        self.assertEqual(of.SearchBackward(file.filename, 'SCF Done:', block_size=100), (len(file) - 1353, file.lines[1353]))
+        self.assertEqual(of.SearchBackward(file.filename, 'Not in the file'), None)
+        self.assertEqual(op.Backward_search_last(file.filename, 'Job cpu time:', len(file), 'CPU time', quiet=True), 1907)
+        self.assertEqual(list(lazy.lines.ScanBackward(of.CompileBytesPattern('SCF Done:'), block_size=100)), [1353, 983, 717, 372])
+        self.assertEqual(lazy.FindLast('SCF Done:'), 1353)
+        lazy.close()
+
+    def test_Lazy_Reading_Pickle(self):
+        lazy = of.OutputFile('test_systems/HF_Water_gaus.out', lazy=True)
+        lazy.lines[0]
+
+        unpickled = pickle.loads(pickle.dumps(lazy))
+
+        self.assertEqual(unpickled.lines[1353], lazy.lines[1353])
+        lazy.close()
+        unpickled.close()
+
+    def test_Compressed_Reading(self):
+        plain = of.OutputFile('test_systems/HF_Water_gaus.out')
+        with open('test_systems/HF_Water_gaus.out', 'rb') as file:
+            content = file.read()
+
+        with tempfile.TemporaryDirectory() as directory:
+            for extension, compress in [('gz', gzip.compress), ('xz', lzma.compress), ('bz2', bz2.compress)]:
+                filename = os.path.join(directory, f'HF_Water_gaus.out.{extension}')
+                with open(filename, 'wb') as file:
+                    file.write(compress(content))
+
+                eager = of.OutputFile(filename, lazy=False)
+                lazy = of.OutputFile(filename, lazy=True)
+
+                self.assertEqual(eager.lines, plain.lines)
+                self.assertEqual(lazy.FindLast('SCF Done:'), 1353)
+                self.assertEqual(of.SearchBackward(filename, 'Job cpu time:'), of.SearchBackward('test_systems/HF_Water_gaus.out', 'Job cpu time:'))
+                lazy.close()
+
+    def test_Extraction_Specs(self):
+        file = of.OutputFile('test_systems/HF_Water_gaus.out')
+        specs = [es.ExtractionSpec('SCF Done:', ['energy'], [(0, 4)]),
+                 es.ExtractionSpec('SCF Done:', ['energies'], [(0, 4)], conversion=lambda values: [es.Floats(values)], occurrence='all')]
+
+        parser = es.SpecParser(specs)
+        lines = list(enumerate(file.lines))
+        parser.Feed(lines[:1000])
+        parser.Feed(lines[1000:])
+
+        self.assertEqual(parser.Values(specs[0]), [float(file.lines[1353].split()[4])])
+        self.assertEqual(parser.Values(specs[1]), [[float(file.lines[i].split()[4]) for i in [372, 717, 983, 1353]]])
+
+    def test_Parse_Table(self):
+        table = of.ParseTable(b'   iso   0.509289D+02   0.754688D+01\n   xx   -0.625029d+02   0.926198D+01\n', slice(1, None), fortran=True)
+        self.assertEqual(table.tolist(), [[50.9289, 7.54688], [-62.5029, 9.26198]])
+        self.assertEqual(of.ParseTable('1 O x 1.5\n2 y -2.0\n3 z 0.25\n \n', [3, 6, 9], width=10).tolist(), [[1.5, -2.0, 0.25]])
+        self.assertEqual(of.ParseTable('O 1 2 3\nH 4 5 6\n', 0, dtype=str).tolist(), ['O', 'H'])
+        self.assertRaises(ValueError, of.ParseTable, 'O 1 2 3\nH 4 5\n')
+
+        for lazy in [False, True]:
+            file = of.OutputFile('test_systems/HF_Water_gaus.out', lazy=lazy)
+            self.assertEqual(file.Block(1353, 1355), ''.join(file.lines[1353:1355]).encode())
+            file.close()
+
+
+class Test_follow(unittest.TestCase):
+
+    def test_Follow_Growing_File(self):
+        with open('test_systems/DFT_Water_orca.out', 'rb') as file:
+            content = file.read()
+        expected = op.OutputType('test_systems/DFT_Water_orca.out', Quiet=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'running.out')
+            followed = fo.FollowedFile(filename, ['_Energy', '_Dipole_moments'], Quiet=True)
+            self.assertFalse(followed.Update())
+
+            # Written in portions that end in the middle of lines
+            start = 0
+            for end in [100, 5003, len(content) // 2, len(content)]:
+                with open(filename, 'ab') as file:
+                    file.write(content[start:end])
+                start = end
+                followed.Update()
+                followed = pickle.loads(pickle.dumps(followed))
+
+            self.assertEqual(followed.offset, len(content))
+            self.assertEqual(followed.Values()['tot_energy'], expected.getEnergy())
+            self.assertEqual([followed.Values()[key] for key in ['dipolex', 'dipoley', 'dipolez', 'total_dipole']], expected.getDipoleMoment())
+
+    def test_Follow_Replaced_File(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'running.out')
+            with open('test_systems/HF_Water_gaus.out', 'rb') as file:
+                content = file.read()
+            with open(filename, 'wb') as file:
+                file.write(content)
+            followed = fo.FollowedFile(filename, ['_Energy'], Quiet=True)
+            followed.Update()
+
+            with open(filename, 'wb') as file:
+                file.write(content[:len(content) // 3])
+
+            self.assertTrue(followed.Update())
+            self.assertEqual(followed.offset, content[:len(content) // 3].rfind(b'\n') + 1)
+
+
+class Test_extraction_cache(unittest.TestCase):
+
+    def test_Cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'water.out')
+            with open('test_systems/HF_Water_gaus.out', 'rb') as file:
+                content = file.read()
+            with open(filename, 'wb') as file:
+                file.write(content)
+
+            with ec.ExtractionCache(os.path.join(directory, 'cache.sqlite'), Hash=True) as cache:
+                self.assertIsNone(cache.Get(filename, ['_Energy'], 298.15))
+                cache.Put(filename, ['_Energy'], 298.15, {'tot_energy': -76.027053})
+                cache.Put(filename, ['_Frequencies'], 298.15, {'freq': [0.1, 0.2]})
+
+                self.assertEqual(cache.Get(filename, ['_Energy', '_Frequencies'], 298.15), {'tot_energy': -76.027053, 'freq': [0.1, 0.2]})
+                self.assertIsNone(cache.Get(filename, ['_Dipole_moments'], 298.15))
+                self.assertIsNone(cache.Get(filename, ['_Energy'], 300.0))
+
+                # Same content with a new modification time is recognised by the hash
+                os.utime(filename, ns=(0, 0))
+                self.assertEqual(cache.Get(filename, ['_Energy'], 298.15), {'tot_energy': -76.027053, 'freq': [0.1, 0.2]})
+
+                with open(filename, 'ab') as file:
+                    file.write(b'\n')
+                self.assertIsNone(cache.Get(filename, ['_Energy'], 298.15))
+                self.assertEqual(cache.Statistics()['hits'], 2)
+
+                self.assertEqual(cache.Invalidate(Stale=True), 1)
+                self.assertEqual(cache.Statistics()['files'], 0)
+
+                # Values read from a formatted checkpoint file are only used while the same file is used
+                fchk = os.path.join(directory, 'water.fchk')
+                with open('test_systems/fchk/DFT_Water_gaus.fchk', 'rb') as file, open(fchk, 'wb') as copy:
+                    copy.write(file.read())
+                sources = ec.SourceFiles([fchk])
+                cache.Put(filename, ['_Energy'], 298.15, {'tot_energy': -76.4}, sources)
+                self.assertEqual(cache.Get(filename, ['_Energy'], 298.15, sources), {'tot_energy': -76.4})
+                self.assertIsNone(cache.Get(filename, ['_Energy'], 298.15))
+                os.utime(fchk, ns=(0, 0))
+                self.assertIsNone(cache.Get(filename, ['_Energy'], 298.15, ec.SourceFiles([fchk])))
+                self.assertEqual(ec.SourceFiles([None]), '')
+
+
+class Test_extraction_log(unittest.TestCase):
+
+    def test_Log_Writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'collect_data.log')
+            with el.LogWriter(filename, Json=True, Summary=True) as writer:
+                op.OutputType('test_systems/HF_Water_lsdal.out').getPolarizability()
+                # Records logged by worker processes are written by this process
+                with multiprocessing.Pool(2, initializer=el.UseQueue, initargs=(writer.Queue(),)) as pool:
+                    pool.starmap(el.Log, [(f'No polarizability could be found in {file}', el.MISSING, 'polarizability', file) for file in ['b.out', 'c.out']])
+                    pool.close()
+                    pool.join()
+                self.assertFalse(os.path.isfile(filename))
+
+            with open(filename) as file:
+                records = [json.loads(line) for line in file]
+            self.assertEqual(records[0]['message'], 'No polarizability could be found in test_systems/HF_Water_lsdal.out')
+            self.assertEqual(sorted(record['file'] for record in records[1:3]), ['b.out', 'c.out'])
+            self.assertEqual(records[-1]['message'], 'missing polarizability: 3 files')
+
+
 class Test_collect_data(unittest.TestCase):
 
     def test_Extract(self):
@@ -162,6 +707,64 @@ class Test_collect_data(unittest.TestCase):
 
         self.assertTrue(Values)
 
+    def test_Slim_Results(self):
+        infile = 'test_systems/HF_Water_gaus.out'
+        everything = cd.Data_Extraction(infile, ['_Energy', '_CPUS'], quiet=True)[infile]
+        slim = cd.Data_Extraction(infile, ['_Energy', '_CPUS'], quiet=True, Attributes=['tot_energy', 'total_cpu_time', 'wall_cpu_time', 'freq'])[infile]
+
+        # Values of methods that were not run are left out
+        self.assertEqual(list(slim), ['tot_energy', 'total_cpu_time', 'wall_cpu_time'])
+        for key, value in slim.items():
+            self.assertEqual(value, everything[key])
+        # The lines of the file are not sent back from worker processes
+        self.assertNotIn('lines', slim)
+        self.assertLess(len(cd.Pickled_Data_Extraction(infile, Needed_Values=['_Energy', '_CPUS'], quiet=True, Attributes=list(slim))), 1000)
+
+    def test_Extract_cache_sources(self):
+        # Values read from a property file are not taken from the cache for runs reading the output file, or when the property file changes
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'DFT_Water_orca.out')
+            properties = os.path.join(directory, 'DFT_Water_orca_property.txt')
+            for infile, outfile in [('test_systems/DFT_Water_orca.out', filename), ('test_systems/property/DFT_Water_orca_property.txt', properties)]:
+                with open(infile, 'rb') as file, open(outfile, 'wb') as copy:
+                    copy.write(file.read())
+            cache = os.path.join(directory, 'cache.sqlite')
+
+            hits = []
+            for no_property_file in [False, False, True, True, False]:
+                if len(hits) == 4:
+                    os.utime(properties, ns=(os.stat(properties).st_mtime_ns + 10**9,) * 2)
+                args = Namespace(cpu_time=None, dipole=False, energy=True, enthalpy=False, entropy=False, exc=None, freq=None, gibbs=False, infile=[filename], multiprocessing=False, optgeom=False, osc=False, partfunc=False, polar=False, quiet=True, save='return', temp=298.15, zpv=False, progressbar=False, unittest=True, savename=os.path.join(directory, 'values'), cache=cache, no_property_file=no_property_file)
+                Values = cd.Extract(args)
+                self.assertEqual(Values[filename]['tot_energy'], DATA_FILE['DFT_Water_orca.out']['tot_energy'])
+                with ec.ExtractionCache(cache) as statistics:
+                    hits.append(statistics.Statistics()['hits'])
+            self.assertEqual(hits, [0, 1, 1, 2, 2])
+
+    def test_Failed_Extraction(self):
+        with self.assertRaises(TimeoutError):
+            with cd.Time_Limit(0.1):
+                time.sleep(1)
+
+        # A file that can not be extracted is quarantined with NaN values and does not stop the other files
+        with tempfile.TemporaryDirectory() as directory:
+            quarantine = os.path.join(directory, 'quarantine.json')
+            args = Namespace(cpu_time=None, dipole=False, energy=True, enthalpy=False, entropy=False, exc=None, freq=None, gibbs=False, infile=['test_systems/HF_Water_gaus.out', 'test_systems/missing.out'], multiprocessing=False, optgeom=False, osc=False, partfunc=False, polar=False, quiet=True, save='return', temp=298.15, zpv=False, progressbar=False, unittest=True, savename=os.path.join(directory, 'values'), retries=2, quarantine=quarantine)
+            Values = cd.Extract(args)
+            self.assertEqual(Values['test_systems/HF_Water_gaus.out']['tot_energy'], DATA_FILE['HF_Water_gaus.out']['tot_energy'])
+            self.assertEqual(Values['test_systems/missing.out']['tot_energy'], 'NaN')
+            with open(quarantine) as file:
+                failed, = json.load(file)
+            self.assertEqual(failed['file'], 'test_systems/missing.out')
+            self.assertTrue(failed['error'].startswith('FileNotFoundError'))
+            self.assertEqual(failed['attempts'], 3)
+
+            # Files that could not be extracted are left out of spectra
+            Values = cd.Spectra_Data_Extraction(['test_systems/DFT_Water_exci_gaus.out', 'test_systems/missing.out'], False, True, QuarantineFile=quarantine, Needed_Values={'_Excitation_energies': -1}, quiet=True, Attributes=['exc_energies'])
+            self.assertEqual(list(Values), ['test_systems/DFT_Water_exci_gaus.out'])
+            with open(quarantine) as file:
+                self.assertEqual([failed['file'] for failed in json.load(file)], ['test_systems/missing.out'])
+
     def test_Extract_multiprocessing(self):
         files = ['CCSD_Ethanol_dal.out', 'CCSD_Ethanol_exci_gaus.out', 'CCSD_Ethanol_gaus.out', 'CCSD_Ethanol_lsdal.out', 'CCSD_Ethanol_orca.out', 'CCSD_Methane_dal.out', 'CCSD_Methane_exci_gaus.out', 'CCSD_Methane_gaus.out', 'CCSD_Methane_lsdal.out', 'CCSD_Methane_orca.out', 'CCSD_Water_dal.out', 'CCSD_Water_exci_gaus.out', 'CCSD_Water_gaus.out', 'CCSD_Water_lsdal.out', 'CCSD_Water_orca.out', 'DFT_Ethanol_exci_dal.out', 'DFT_Ethanol_exci_gaus.out', 'DFT_Ethanol_exci_lsdal.out', 'DFT_Ethanol_exci_orca.out', 'DFT_Ethanol_gaus.out', 'DFT_Ethanol_lsdal.out', 'DFT_Ethanol_opt_lsdal.out', 'DFT_Ethanol_opt_velox.out', 'DFT_Ethanol_orca.out', 'DFT_Ethanol_pol_lsdal.out', 'DFT_Ethanol_pol_velox.out', 'DFT_Ethanol_vib_dal.out', 'DFT_Methane_exci_dal.out', 'DFT_Methane_exci_gaus.out', 'DFT_Methane_exci_lsdal.out', 'DFT_Methane_exci_orca.out', 'DFT_Methane_gaus.out', 'DFT_Methane_lsdal.out', 'DFT_Methane_opt_lsdal.out', 'DFT_Methane_opt_velox.out', 'DFT_Methane_orca.out', 'DFT_Methane_pol_lsdal.out', 'DFT_Methane_pol_velox.out', 'DFT_Methane_vib_dal.out', 'DFT_Water_exci_dal.out', 'DFT_Water_exci_gaus.out', 'DFT_Water_exci_lsdal.out', 'DFT_Water_exci_orca.out', 'DFT_Water_gaus.out', 'DFT_Water_lsdal.out', 'DFT_Water_opt_lsdal.out', 'DFT_Water_opt_velox.out', 'DFT_Water_orca.out', 'DFT_Water_pol_lsdal.out', 'DFT_Water_pol_velox.out', 'DFT_Water_vib_dal.out', 'HF_Ethanol_dal.out', 'HF_Ethanol_gaus.out', 'HF_Ethanol_lsdal.out', 'HF_Ethanol_opt_dal.out', 'HF_Methane_dal.out', 'HF_Methane_gaus.out', 'HF_Methane_lsdal.out', 'HF_Methane_opt_dal.out', 'HF_Water_dal.out', 'HF_Water_gaus.out', 'HF_Water_lsdal.out', 'HF_Water_opt_dal.out', 'MP2_Ethanol_dal.out', 'MP2_Ethanol_gaus.out', 'MP2_Ethanol_lsdal.out', 'MP2_Methane_dal.out', 'MP2_Methane_gaus.out', 'MP2_Methane_lsdal.out', 'MP2_Water_dal.out', 'MP2_Water_gaus.out', 'MP2_Water_lsdal.out', 'RIMP2_Ethanol_lsdal.out', 'RIMP2_Methane_lsdal.out', 'RIMP2_Water_lsdal.out']
 